@@ -0,0 +1,216 @@
+"""
+CreditGuard AI - Yapılandırılmış Loglama
+Seviye kontrollü, kuyruk tabanlı (bloklamayan) loglama ve istek bazlı trace id.
+
+- Log kayıtları çağıran iş parçacığında biçimlendirilmez: sınırlı bir kuyruğa
+  eklenir ve ayrı bir dinleyici iş parçacığı tarafından biçimlendirilip
+  stderr'e yazılır. Kuyruk doluysa kayıt düşürülür (istek beklemez) ve
+  düşürülen kayıt sayısı tutulur.
+- Kayıtlar tek satırlık JSON (varsayılan) veya okunabilir metin olarak
+  yazılır; ek alanlar extra={"fields": {...}} ile verilir.
+- Her HTTP isteğine bir trace id atanır (X-Request-ID başlığı varsa o
+  kullanılır) ve yanıtta X-Trace-ID olarak döner. Trace id contextvars ile
+  taşınır; aynı isteğin encode, predict_proba ve açıklama adımlarının logları
+  bu id ile birleştirilebilir.
+- Hata ayıklama (DEBUG) içerikleri yalnızca bu seviye açıkken üretilmelidir:
+  if logger.isEnabledFor(logging.DEBUG): ...
+
+Ayarlar: CREDITGUARD_LOG_LEVEL (varsayılan INFO), CREDITGUARD_LOG_FORMAT
+(json / text), CREDITGUARD_LOG_QUEUE_SIZE (varsayılan 10000).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_LEVEL = os.getenv("CREDITGUARD_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("CREDITGUARD_LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("CREDITGUARD_LOG_QUEUE_SIZE", "10000"))
+
+# Tüm servis logları bu logger'ın altındadır (creditguard.ml_service, creditguard.api, ...)
+ROOT_LOGGER_NAME = "creditguard"
+
+# Aktif isteğin trace id'si; istek dışında (eğitim, CLI) None
+trace_id_var: ContextVar[Optional[str]] = ContextVar("creditguard_trace_id", default=None)
+
+TRACE_HEADER = b"x-request-id"
+TRACE_RESPONSE_HEADER = b"x-trace-id"
+
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> Optional[str]:
+    return trace_id_var.get()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Kaydı biçimlendirmeden sınırlı kuyruğa ekleyen handler.
+
+    Standart QueueHandler mesajı çağıran iş parçacığında biçimlendirir;
+    burada yalnızca trace id eklenir, biçimlendirme dinleyicide yapılır.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.trace_id = trace_id_var.get()
+        if record.exc_info:
+            # Traceback nesneleri kuyruğa taşınmaz; metin burada bir kez üretilir
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satırlık JSON: ts, level, logger, message, trace_id ve ek alanlar."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Okunabilir tek satır: zaman, seviye, logger, [trace id], mesaj ve anahtar=değer alanlar."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [
+            datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3],
+            f"{record.levelname:<7}",
+            record.name,
+        ]
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            parts.append(f"[{trace_id}]")
+        parts.append(record.getMessage())
+        fields = getattr(record, "fields", None)
+        if fields:
+            parts.append(" ".join(f"{key}={value}" for key, value in fields.items()))
+        line = " ".join(parts)
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        return line
+
+
+def setup_logging(level: str = None, log_format: str = None) -> None:
+    """
+    creditguard logger'ını kuyruk tabanlı handler ile yapılandırır (bir kez).
+
+    Kök logger'a dokunulmaz; uvicorn ve diğer kütüphanelerin logları etkilenmez.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+        log_format = log_format or LOG_FORMAT
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(TextFormatter() if log_format == "text" else JsonFormatter())
+
+        log_queue: queue.Queue = queue.Queue(maxsize=max(1, LOG_QUEUE_SIZE))
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+        _listener.start()
+
+        logger = logging.getLogger(ROOT_LOGGER_NAME)
+        logger.setLevel(level or LOG_LEVEL)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Kuyrukta bekleyen kayıtları yazar ve dinleyiciyi durdurur."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            logger = logging.getLogger(ROOT_LOGGER_NAME)
+            logger.removeHandler(_queue_handler)
+
+
+def dropped_records() -> int:
+    """Kuyruk dolu olduğu için düşürülen log kaydı sayısı."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """creditguard.<name> logger'ını döndürür; loglama henüz kurulmadıysa kurar."""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class TraceIdMiddleware:
+    """
+    Her HTTP isteği için trace id atayan ASGI middleware'i.
+
+    İstemci X-Request-ID gönderirse o kullanılır; yanıt X-Trace-ID başlığını içerir.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = None
+        for name, value in scope.get("headers", ()):
+            if name == TRACE_HEADER:
+                trace_id = value.decode("latin-1")[:64]
+                break
+        trace_id = trace_id or new_trace_id()
+        token = trace_id_var.set(trace_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(TRACE_RESPONSE_HEADER, trace_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace_id_var.reset(token)
+
+
+def log_fields(**values) -> dict:
+    """logger.info("mesaj", extra=log_fields(anahtar=değer)) için ek alanlar."""
+    return {"fields": values}
@@ -0,0 +1,65 @@
+"""
+Başvuru bazlı yerel katkı (Saabas) benchmark'ı.
+
+Önce katkıların toplamsallığını doğrular: base_value + satır katkıları,
+predict_proba ile aynı olasılığı vermelidir. Ardından 1-1000 satırlık
+batch'lerde düz skorlama (sklearn ve flat predict_proba) ile katkı hesabının
+p50/p99 gecikmelerini ve katkıların skorlamaya göre ek maliyetini raporlar.
+
+Gecikme bütçesi (200 ağaç): tek satır için p99 < 1 ms, 256 satır için p99 < 40 ms.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_attributions.py --iterations 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+from bench_forest import measure  # noqa: E402
+from bench_predict import sample_inputs  # noqa: E402
+
+# Satır sayısı -> p99 gecikme bütçesi (ms)
+LATENCY_BUDGET_MS = {1: 1.0, 256: 40.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 256, 1000])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.ensure_model()
+    snapshot = ml_service.get_snapshot()
+    model, forest = snapshot.model, snapshot.forest
+    X, _ = snapshot.feature_plan.encode_batch(sample_inputs(2000))
+
+    # Toplamsallık: base_value + katkılar = riskli olasılığı
+    contributions = forest.contributions(X)
+    error = float(np.abs(forest.bias + contributions.sum(axis=1) - model.predict_proba(X)[:, 1]).max())
+    if error > 1e-9:
+        raise SystemExit(f"Toplamsallık hatası: en büyük fark {error:.3e}")
+    print(f"Toplamsallık: {len(X)} satır, en büyük fark {error:.1e}")
+
+    print(f"{'Satır':>6} {'sklearn p50':>12} {'flat p50':>10} {'katkı p50':>10} {'katkı p99':>10} {'ek maliyet':>11}  bütçe")
+    for size in args.batch_sizes:
+        rows = X[:size]
+        sk_p50, _ = measure(model.predict_proba, rows, args.iterations)
+        flat_p50, _ = measure(lambda r: forest.predict_proba(r), rows, args.iterations)
+        attr_p50, attr_p99 = measure(lambda r: ml_service.compute_local_attributions(snapshot, r), rows, args.iterations)
+        budget = LATENCY_BUDGET_MS.get(size)
+        verdict = "-" if budget is None else ("OK" if attr_p99 <= budget else f"AŞILDI (> {budget} ms)")
+        print(f"{size:>6} {sk_p50:>12.3f} {flat_p50:>10.3f} {attr_p50:>10.3f} {attr_p99:>10.3f} "
+              f"{attr_p50 / flat_p50:>10.1f}x  {verdict}")
+
+
+if __name__ == "__main__":
+    main()
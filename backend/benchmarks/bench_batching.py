@@ -0,0 +1,94 @@
+"""
+Mikro-batch yük testi.
+
+/predict endpoint'ine uygulama içinde (ASGI, ağ olmadan) 50-500 eşzamanlı
+istemciyle istek gönderir; biriktirme kapalıyken (her istek ayrı
+predict_proba) ve açıkken (MicroBatcher) saniyedeki istek sayısını,
+p50/p99 gecikmeyi ve ortalama batch boyutunu raporlar.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_batching.py --clients 50 100 250 500 --requests 2000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import main as api  # noqa: E402
+import ml_service  # noqa: E402
+from bench_predict import sample_inputs  # noqa: E402
+from inference_pool import BoundedExecutor, MicroBatcher  # noqa: E402
+
+
+async def load_test(clients, total_requests, payloads):
+    """clients kadar eşzamanlı istemci ile toplam total_requests istek gönderir."""
+    latencies = []
+    statuses = {}
+    counter = iter(range(total_requests))
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.post("/predict", json=payloads[i % len(payloads)])
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    values = np.array(latencies) * 1000.0
+    return {
+        "rps": total_requests / elapsed,
+        "p50": np.percentile(values, 50),
+        "p99": np.percentile(values, 99),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[50, 100, 250, 500])
+    parser.add_argument('--requests', type=int, default=2000, help="Her ölçümdeki toplam istek sayısı")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.ensure_model()
+    payloads = [
+        {**data, 'credit_amount': int(data['credit_amount'])}
+        for data in sample_inputs(500)
+    ]
+
+    print(f"{'İstemci':>8} {'Mod':<10} {'istek/sn':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'ort. batch':>11}  durumlar")
+    for clients in args.clients:
+        for mode, max_batch_size in (("tekil", 1), ("mikro", args.max_batch_size)):
+            # Kuyruk sınırı yük testinde reddetmeye yol açmasın
+            api.inference_executor = BoundedExecutor(max_queue=clients)
+            api.prediction_batcher = MicroBatcher(ml_service.predict_risk_batch, api.inference_executor,
+                                                  max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(load_test(clients, args.requests, payloads))
+            batch_stats = api.prediction_batcher.stats()
+            avg_batch = batch_stats["avg_batch_size"] if batch_stats["batches"] else 1.0
+            print(f"{clients:>8} {mode:<10} {result['rps']:>10.1f} {result['p50']:>10.2f} "
+                  f"{result['p99']:>10.2f} {avg_batch:>11.1f}  {result['statuses']}")
+            api.prediction_batcher.shutdown()
+            api.inference_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Veri seti yükleme benchmark'ı.
+
+Kaynak dosyanın (ARFF / CSV) ayrıştırılması ile sütun bazlı .npz önbelleğinden
+yüklemeyi karşılaştırır. Önbellek yoksa önce load_credit_dataset ile üretilir.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_dataset.py --repeats 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset  # noqa: E402
+
+
+def measure(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(timings, 50), np.max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    df = dataset.load_credit_dataset()
+    print(f"Veri seti: {len(df)} satır, {len(df.columns)} sütun")
+
+    cases = []
+    if os.path.exists(dataset.DATASET_SOURCE_PATH):
+        cases.append((f"kaynak ({os.path.basename(dataset.DATASET_SOURCE_PATH)})",
+                      lambda: dataset.read_dataset_source(dataset.DATASET_SOURCE_PATH)))
+    else:
+        print(f"Kaynak dosya yok ({dataset.DATASET_SOURCE_PATH}), yalnızca önbellek ölçülüyor")
+    cases.append(("önbellek (.npz)", lambda: dataset.read_dataset_cache(dataset.DATASET_CACHE_PATH)))
+
+    print(f"{'Yol':<30} {'p50 (ms)':>10} {'max (ms)':>10}")
+    for name, func in cases:
+        p50, worst = measure(func, args.repeats)
+        print(f"{name:<30} {p50:>10.2f} {worst:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
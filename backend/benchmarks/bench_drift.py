@@ -0,0 +1,128 @@
+"""
+Drift izleme benchmark'ı.
+
+Tek satırlık tahmin yolunun (predict_risk) gecikmesini drift izleme kapalı
+ve açıkken (arka plan kovalama thread'i çalışırken) karşılaştırır, istek
+yolundaki observe() maliyetini ve arka planda kovalama hızını (satır/sn)
+raporlar.
+
+Parite: vektörel kovalama her feature için np.searchsorted referansı ile
+aynı kovaları vermeli; eğitim satırlarının kendisi izlendiğinde PSI ~0 olmalı.
+
+Tahmin önbelleği ölçüm süresince kapatılır (model yolu ölçülür).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_drift.py --iterations 5000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drift  # noqa: E402
+import ml_service  # noqa: E402
+
+# Eğitim satırları ile baseline arasında izin verilen en büyük PSI (örnekleme/kova sınırı farkı)
+SELF_PSI_TOLERANCE = 1e-3
+
+
+def percentiles(timings):
+    values = np.array(timings) * 1e6
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def check_parity(snapshot):
+    """Vektörel kovalamayı searchsorted referansı ile, PSI'yı eğitim satırlarının kendisi ile doğrular."""
+    baseline = snapshot.drift_baseline
+    X = snapshot.training_state.X_train.astype(np.float64)
+    indices = baseline.bin_indices(X)
+    for j, name in enumerate(baseline.feature_names):
+        edges = baseline.edges[j, :baseline.n_bins[j] - 1]
+        if not np.array_equal(np.searchsorted(edges, X[:, j], side='right'), indices[:, j]):
+            raise SystemExit(f"Parite hatası: kovalar ({name})")
+
+    monitor = drift.DriftMonitor(queue_size=len(X))
+    monitor.reset(baseline, snapshot.feature_plan, snapshot.model_version)
+    monitor.observe(baseline, snapshot.training_state.X_train, [{}] * len(X))
+    report = monitor.report()
+    worst = max(entry['psi'] for entry in report['features'].values())
+    if worst > SELF_PSI_TOLERANCE:
+        raise SystemExit(f"Parite hatası: eğitim satırlarında PSI {worst:.2e}")
+    print(f"Parite: {len(X)} eğitim satırında kovalar aynı, en büyük PSI {worst:.1e}")
+
+
+def measure_predict(records, iterations, rounds=10):
+    """İzleme kapalı/açık turları sırayla çalıştırır (sıra ve ısınma etkisi iki tarafa eşit dağılır)."""
+    monitor = ml_service.drift_monitor
+    timings = {False: [], True: []}
+    per_round = max(1, iterations // rounds)
+    for i in range(rounds * 2):
+        enabled = bool(i % 2)
+        monitor.enabled = enabled
+        for j in range(per_round):
+            data = records[(i * per_round + j) % len(records)]
+            start = time.perf_counter()
+            ml_service.predict_risk(data)
+            timings[enabled].append(time.perf_counter() - start)
+    monitor.enabled = True
+    return percentiles(timings[False]), percentiles(timings[True])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--batch-rows', type=int, nargs='+', default=[1, 64, 1000])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.train_model(save_artifact=False)
+    snapshot = ml_service.get_snapshot()
+    check_parity(snapshot)
+
+    ml_service.prediction_cache.max_size = 0
+    store = snapshot.sample_store
+    records = store.records(np.arange(min(len(store), 1000)))
+    monitor = ml_service.drift_monitor
+
+    # Isınma
+    for data in records[:200]:
+        ml_service.predict_risk(data)
+
+    monitor.start()
+    (off_p50, off_p99), (on_p50, on_p99) = measure_predict(records, args.iterations)
+    monitor.stop()
+    print(f"\n{'predict_risk':<14} {'p50 µs':>9} {'p99 µs':>9}")
+    print(f"{'izleme kapalı':<14} {off_p50:>9.1f} {off_p99:>9.1f}")
+    print(f"{'izleme açık':<14} {on_p50:>9.1f} {on_p99:>9.1f}")
+
+    baseline = snapshot.drift_baseline
+    print(f"\n{'batch satırı':>12} {'observe p50 µs':>15} {'observe p99 µs':>15} {'kovalama satır/sn':>18}")
+    for batch_rows in args.batch_rows:
+        batch = records[:batch_rows]
+        X, _ = snapshot.feature_plan.encode_batch(batch)
+        monitor.drain()
+        observe_timings = []
+        batches = max(1, min(args.iterations, monitor.queue_size // batch_rows))
+        for _ in range(batches):
+            start = time.perf_counter()
+            monitor.observe(baseline, X, batch)
+            observe_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        rows = monitor.drain()
+        drain_seconds = time.perf_counter() - start
+        p50, p99 = percentiles(observe_timings)
+        print(f"{batch_rows:>12} {p50:>15.2f} {p99:>15.2f} {rows / max(drain_seconds, 1e-9):>18.0f}")
+
+    report = monitor.report()
+    print(f"\nİzlenen satır: {report['observed_rows']}, düşürülen: {report['dropped_rows']}, durum: {report['status']}")
+
+
+if __name__ == "__main__":
+    main()
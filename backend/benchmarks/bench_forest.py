@@ -0,0 +1,100 @@
+"""
+Düzleştirilmiş orman motoru (FlatForest) parite ve gecikme benchmark'ı.
+
+Önce FlatForest.predict_proba'nın RandomForestClassifier.predict_proba ile
+aynı olasılıkları ürettiğini doğrular:
+  - veri setinin kendi satırları,
+  - encoder sözlüklerinden rastgele başvurular,
+  - ağaç eşiklerine tam oturan ve eşiklerin hemen iki yanındaki değerler.
+Ardından 1-1000 satırlık batch'lerde iki yolun p50/p99 gecikmelerini raporlar.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_forest.py --iterations 500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+from bench_predict import sample_inputs  # noqa: E402
+from forest_engine import FlatForest  # noqa: E402
+
+# predict_proba ile izin verilen en büyük mutlak fark
+TOLERANCE = 1e-12
+
+
+def threshold_rows(engine, base_row, n, seed=0):
+    """Rastgele seçilen düğüm eşiklerini (ve float32 komşularını) varsayılan satıra yerleştirir."""
+    rng = np.random.default_rng(seed)
+    internal = np.flatnonzero(engine.left != np.arange(len(engine.left)))
+    rows = np.repeat(base_row.reshape(1, -1), n, axis=0).astype(np.float32)
+    for i, node in enumerate(rng.choice(internal, size=n)):
+        value = np.float32(engine.threshold[node])
+        rows[i, engine.feature[node]] = (value, np.nextafter(value, np.float32(-np.inf)),
+                                          np.nextafter(value, np.float32(np.inf)))[i % 3]
+    return rows
+
+
+def check_parity(model, engine, name, X):
+    expected = model.predict_proba(X)
+    actual = engine.predict_proba(X)
+    diff = float(np.abs(expected - actual).max())
+    if diff > TOLERANCE:
+        raise SystemExit(f"Parite hatası ({name}): en büyük fark {diff:.3e}")
+    flips = int((np.floor(expected[:, 1] * 100) != np.floor(actual[:, 1] * 100)).sum())
+    if flips:
+        raise SystemExit(f"Parite hatası ({name}): {flips} satırda risk skoru farklı")
+    print(f"Parite ({name}): {len(X)} satır, en büyük fark {diff:.1e}")
+
+
+def measure(func, X, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(X)
+        timings.append(time.perf_counter() - start)
+    values = np.array(timings) * 1000.0
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 256, 1000])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.ensure_model()
+    snapshot = ml_service.get_snapshot()
+    model = snapshot.model
+    # Parite ve ölçüm için batch boyutu sınırı kapatılır (her zaman dizi motoru çalışsın)
+    engine = FlatForest(model, max_rows=None)
+
+    dataset_records = snapshot.sample_store.records()
+    X_dataset, _ = snapshot.feature_plan.encode_batch(dataset_records)
+    X_random, _ = snapshot.feature_plan.encode_batch(sample_inputs(2000))
+    X_threshold = threshold_rows(engine, snapshot.feature_plan.default_row, 3000)
+
+    check_parity(model, engine, "veri seti", X_dataset)
+    check_parity(model, engine, "rastgele başvurular", X_random)
+    check_parity(model, engine, "eşik sınırları", X_threshold)
+    print(f"Orman: {engine.n_trees} ağaç, {len(engine.feature)} düğüm, derinlik {engine.max_depth}")
+
+    print(f"{'Satır':>6} {'sklearn p50':>12} {'sklearn p99':>12} {'flat p50':>10} {'flat p99':>10} {'hızlanma':>9}")
+    for size in args.batch_sizes:
+        X = X_random[:size]
+        sk_p50, sk_p99 = measure(model.predict_proba, X, args.iterations)
+        flat_p50, flat_p99 = measure(engine.predict_proba, X, args.iterations)
+        print(f"{size:>6} {sk_p50:>12.3f} {sk_p99:>12.3f} {flat_p50:>10.3f} {flat_p99:>10.3f} {sk_p50 / flat_p50:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Artımlı yeniden eğitim (rolling tree replacement) maliyet benchmark'ı.
+
+Farklı sayıda yeni etiketli satır için fit_incremental_snapshot süresini,
+aynı geçmiş + yeni satırlar üzerinde tüm ormanı baştan eğitmenin süresiyle
+karşılaştırır. Her turda artımlı güncellenen holdout olasılıklarının yeni
+modelin predict_proba çıktısıyla aynı olduğu da doğrulanır.
+
+Yeni satırlar veri setinin kendi satırlarından (gerçek etiketleriyle) örneklenir.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_incremental.py --new-rows 50 200 1000 5000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+
+# Artımlı holdout olasılıkları ile predict_proba arasında izin verilen en büyük fark
+TOLERANCE = 1e-9
+
+
+def labeled_rows(snapshot, n, seed=0):
+    """Veri setinden n etiketli başvuru örnekler (gerekirse tekrar ederek)."""
+    rng = np.random.default_rng(seed)
+    store = snapshot.sample_store
+    rows = rng.integers(0, len(store), size=n)
+    return store.records(rows), store.labels[rows].astype(int).tolist()
+
+
+def full_refit_seconds(snapshot, records, labels):
+    """Geçmiş + yeni satırlarla tüm ormanı baştan eğitme süresi."""
+    state = snapshot.training_state
+    X_new, _ = snapshot.feature_plan.encode_batch(records)
+    X = np.concatenate([state.X_train, X_new])
+    y = np.concatenate([state.y_train, np.asarray(labels, dtype=np.int8)])
+    model = ml_service.build_model(snapshot.model_metrics['training_config'])
+    start = time.perf_counter()
+    model.fit(X, y)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--new-rows', type=int, nargs='+', default=[50, 200, 1000, 5000])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.train_model(save_artifact=False)
+    snapshot = ml_service.get_snapshot()
+    print(f"Başlangıç: {snapshot.training_state.n_train} eğitim, {snapshot.training_state.n_holdout} holdout satırı, "
+          f"{len(snapshot.model.estimators_)} ağaç")
+
+    print(f"{'Yeni satır':>10} {'Pencere':>8} {'Ağaç':>5} {'artımlı sn':>11} {'baştan sn':>10} {'hızlanma':>9}")
+    for n_rows in args.new_rows:
+        records, labels = labeled_rows(snapshot, n_rows, seed=n_rows)
+        full_seconds = full_refit_seconds(snapshot, records, labels)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            updated = ml_service.fit_incremental_snapshot(snapshot, records, labels)
+        incremental_seconds = time.perf_counter() - start
+
+        state = updated.training_state
+        expected = updated.model.predict_proba(state.X_holdout)[:, 1]
+        diff = float(np.abs(state.holdout_proba_sum / len(updated.model.estimators_) - expected).max())
+        if diff > TOLERANCE:
+            raise SystemExit(f"Parite hatası: artımlı holdout olasılıkları {diff:.3e} farklı")
+
+        info = updated.model_metrics['incremental']
+        print(f"{n_rows:>10} {info['window_rows']:>8} {info['trees_replaced']:>5} {incremental_seconds:>11.3f} "
+              f"{full_seconds:>10.3f} {full_seconds / incremental_seconds:>8.1f}x")
+        # Sonraki satır bu modelin üzerine eklenir (geçmiş büyür)
+        snapshot = updated
+
+
+if __name__ == "__main__":
+    main()
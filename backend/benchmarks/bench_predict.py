@@ -0,0 +1,107 @@
+"""
+Tek satırlık tahmin yolu benchmark'ı.
+
+pandas DataFrame tabanlı referans yol (encode_input_frame) ile derlenmiş
+FeaturePlan yolunu karşılaştırır; encode ve encode + predict_proba için
+p50/p99 gecikmeleri raporlar ve iki yolun çıktılarının aynı olduğunu doğrular.
+Açıklama üretimini de her çağrıda importance sıralayan generate_risk_explanation
+ile model başına derlenmiş ExplanationEngine arasında karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_predict.py --iterations 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+
+
+def sample_inputs(n, seed=42):
+    """Encoder sözlüklerinden rastgele başvurular üretir."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        data = {
+            'duration': rng.randint(4, 72),
+            'credit_amount': float(rng.randint(250, 18000)),
+            'age': rng.randint(19, 75),
+        }
+        for col, encoder in ml_service.encoders.items():
+            data[col] = rng.choice(list(encoder.classes_))
+        samples.append(data)
+    return samples
+
+
+def percentiles(timings):
+    values = np.array(timings) * 1000.0
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def measure(func, samples, iterations):
+    timings = []
+    for i in range(iterations):
+        data = samples[i % len(samples)]
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.train_model()
+    model = ml_service.trained_model
+    plan = ml_service.feature_plan
+    samples = sample_inputs(200)
+
+    # Parite kontrolü: iki yol aynı satırı ve aynı olasılığı üretmeli
+    for data in samples:
+        X_frame, _ = ml_service.encode_input_frame(data)
+        row, _ = plan.encode(data)
+        if not np.array_equal(X_frame.to_numpy(dtype=np.float32), row):
+            raise SystemExit(f"Parite hatası: {data}")
+        if model.predict_proba(X_frame)[0, 1] != model.predict_proba(row)[0, 1]:
+            raise SystemExit(f"Olasılık paritesi hatası: {data}")
+    print(f"Parite: {len(samples)} örnekte birebir aynı")
+
+    snapshot = ml_service.get_snapshot()
+    encoded = [(data, plan.encode(data)[1]) for data in samples]
+    for data, values in encoded:
+        reference = ml_service.generate_risk_explanation(model, snapshot.feature_names, values, data,
+                                                         snapshot.encoders, 0)
+        if snapshot.explainer.explain(values, data) != reference:
+            raise SystemExit(f"Açıklama paritesi hatası: {data}")
+    print(f"Açıklama paritesi: {len(encoded)} örnekte birebir aynı")
+
+    cases = [
+        ("encode (DataFrame)", lambda d: ml_service.encode_input_frame(d)),
+        ("encode (FeaturePlan)", lambda d: plan.encode(d)),
+        ("encode + predict_proba (DataFrame)", lambda d: model.predict_proba(ml_service.encode_input_frame(d)[0])),
+        ("encode + predict_proba (FeaturePlan)", lambda d: model.predict_proba(plan.encode(d)[0])),
+        ("açıklama (generate_risk_explanation)", lambda d: ml_service.generate_risk_explanation(
+            model, snapshot.feature_names, d[1], d[0], snapshot.encoders, 0)),
+        ("açıklama (ExplanationEngine)", lambda d: snapshot.explainer.explain(d[1], d[0])),
+    ]
+    print(f"{'Yol':<40} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, func in cases:
+        inputs = encoded if name.startswith("açıklama") else samples
+        p50, p99 = measure(func, inputs, args.iterations)
+        print(f"{name:<40} {p50:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Örnek veri deposu benchmark'ı.
+
+Eğitimde tutulan encode edilmemiş DataFrame kopyası ile SampleStore'un
+bellek kullanımını ve /sample-data yolunun (rastgele satır + JSON) gecikmesini
+karşılaştırır. Her satırın depodaki JSON gövdesinin DataFrame satırından
+üretilen yanıtla aynı olduğu doğrulanır.
+
+--scale ile veri seti satırları tekrarlanarak büyütülür; depo en fazla
+SAMPLE_STORE_MAX_ROWS satır tuttuğu için bellek veri seti boyutuyla büyümez.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_sample_store.py --iterations 5000 --scale 1 100
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+from sample_store import SampleStore  # noqa: E402
+
+
+def frame_sample(df, index, include_target=True):
+    """Eski get_sample_data yolu: iloc satırı, anahtar filtreleme ve JSON serileştirme."""
+    sample = df.iloc[index].to_dict()
+    result = {key: value.item() if hasattr(value, 'item') else value
+              for key, value in sample.items() if key not in ['class', 'target']}
+    if include_target and 'class' in sample:
+        result['actual_risk'] = 'bad' if sample['class'] == 'bad' else 'good'
+        result['actual_risk_label'] = 'Riskli' if sample['class'] == 'bad' else 'Güvenli'
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def percentiles(timings):
+    values = np.array(timings) * 1e6
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = ml_service.prepare_training_data()[0]
+
+    print(f"{'Satır':>9} {'DataFrame MB':>13} {'depo MB':>9} {'depo satırı':>12} {'oluşturma sn':>13} "
+          f"{'eski p50 µs':>12} {'eski p99 µs':>12} {'yeni p50 µs':>12} {'yeni p99 µs':>12}")
+    for scale in args.scale:
+        frame = pd.concat([df] * scale, ignore_index=True) if scale > 1 else df
+        started = time.perf_counter()
+        store = SampleStore.from_frame(frame)
+        build_seconds = time.perf_counter() - started
+
+        if scale == 1:
+            # Parite: her satırın hazır gövdesi DataFrame yolunun yanıtı ile aynı
+            for index in range(len(store)):
+                for include_target in (True, False):
+                    if store.row_json(index, include_target) != frame_sample(frame, index, include_target):
+                        raise SystemExit(f"Parite hatası: satır {index}")
+
+        old_timings, new_timings = [], []
+        rng = np.random.default_rng(0)
+        for index in rng.integers(0, len(frame), size=args.iterations):
+            start = time.perf_counter()
+            frame_sample(frame, int(index))
+            old_timings.append(time.perf_counter() - start)
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            store.row_json(store.pick(), include_target=True)
+            new_timings.append(time.perf_counter() - start)
+
+        old_p50, old_p99 = percentiles(old_timings)
+        new_p50, new_p99 = percentiles(new_timings)
+        frame_mb = frame.memory_usage(deep=True).sum() / 1e6
+        print(f"{len(frame):>9} {frame_mb:>13.2f} {store.nbytes / 1e6:>9.2f} {len(store):>12} {build_seconds:>13.2f} "
+              f"{old_p50:>12.1f} {old_p99:>12.1f} {new_p50:>12.1f} {new_p99:>12.1f}")
+    if 1 in args.scale:
+        print("Parite: tüm satırlarda hazır JSON gövdesi birebir aynı")
+
+
+if __name__ == "__main__":
+    main()
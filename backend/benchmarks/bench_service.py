@@ -0,0 +1,202 @@
+"""
+Servis yük testi ve gecikme benchmark'ı.
+
+/predict, /predict/batch ve /model-performance endpoint'lerini farklı
+eşzamanlılık seviyelerinde iki hedef üzerinden ölçer:
+
+- asgi: uygulama içinde (httpx ASGITransport, ağ ve sunucu yok); kod
+  değişikliklerinin etkisini en az gürültüyle gösterir
+- uvicorn: gerçek uvicorn süreci (--uvicorn-workers ile bir veya daha çok
+  worker) ve yerel TCP bağlantıları; HTTP ayrıştırma ve serileştirme dahil
+
+Başvurular modelin encoder kategori sözlüklerinden sentetik olarak üretilir ve
+her ölçüm farklı başvurular kullanır (önbellek isabeti ölçülmez). Her ölçüm için
+throughput (istek/sn; batch için ayrıca satır/sn) ve p50/p95/p99 gecikme
+raporlanır. Sonuçlar JSON olarak yazılır; --baseline ile eski bir sonuç
+dosyasıyla karşılaştırılır.
+
+Not: uvicorn hedefinde yük üreten istemci de aynı makinede çalışır; CPU sayısı
+azsa istemci ve sunucu aynı çekirdekleri paylaşır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_service.py --targets asgi uvicorn --concurrency 1 8 32 --requests 500
+    python benchmarks/bench_service.py --baseline benchmarks/results/service-20250101-120000.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from harness import (BACKEND_DIR, DEFAULT_REGRESSION_TOLERANCE, compare_results, latency_summary,
+                     run_metadata, synthetic_applications, write_results)
+
+import ml_service  # noqa: E402
+
+SCENARIOS = ("predict", "batch", "model-performance")
+
+# uvicorn sürecinin hazır olmasını bekleme süresi (model artifact'tan yüklenir)
+UVICORN_STARTUP_TIMEOUT = 120.0
+
+
+def scenario_requests(scenario, total_requests, batch_size, seed):
+    """Senaryonun istek listesi: (yöntem, yol, gövde, satır sayısı)."""
+    encoders = ml_service.get_snapshot().encoders
+    if scenario == "predict":
+        return [("POST", "/predict", data, 1) for data in synthetic_applications(encoders, total_requests, seed)]
+    if scenario == "batch":
+        applications = synthetic_applications(encoders, total_requests * batch_size, seed)
+        return [("POST", "/predict/batch", applications[i:i + batch_size], batch_size)
+                for i in range(0, len(applications), batch_size)]
+    return [("GET", "/model-performance", None, 1)] * total_requests
+
+
+async def drive(client, requests, concurrency):
+    """İstekleri concurrency kadar eşzamanlı istemciyle gönderir; gecikmeleri ve durum kodlarını toplar."""
+    latencies = []
+    statuses = {}
+    pending = iter(requests)
+
+    async def worker():
+        for method, path, body, _ in pending:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def run_target(target, client, args):
+    """Bir hedefte tüm senaryo ve eşzamanlılık seviyelerini ölçer."""
+    results = []
+    # Isınma: bağlantılar, thread havuzu ve lazy yüklemeler ölçüme girmesin
+    for scenario in args.scenarios:
+        await drive(client, scenario_requests(scenario, args.warmup, args.batch_size, seed=0), 4)
+
+    for scenario in args.scenarios:
+        for level, concurrency in enumerate(args.concurrency):
+            requests = scenario_requests(scenario, args.requests, args.batch_size, seed=1000 * (level + 1))
+            latencies, statuses, elapsed = await drive(client, requests, concurrency)
+            rows = sum(request[3] for request in requests)
+            summary = latency_summary(latencies, elapsed)
+            result = {
+                'name': f"{target}/{scenario}/c{concurrency}",
+                'target': target,
+                'scenario': scenario,
+                'concurrency': concurrency,
+                **summary,
+                'rows_per_sec': round(rows / max(elapsed, 1e-9), 1),
+                'errors': sum(count for status, count in statuses.items() if status >= 400),
+                'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            }
+            results.append(result)
+            print_result(result)
+    return results
+
+
+async def run_asgi(args):
+    # main içe aktarıldığında uygulama kurulur; startup/shutdown olayları lifespan ile çalıştırılır
+    import main as api
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run_target("asgi", client, args)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def uvicorn_server(workers):
+    """main:app'i ayrı bir uvicorn sürecinde başlatır ve hazır olmasını bekler."""
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, "CREDITGUARD_LOG_LEVEL": "WARNING"})
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + UVICORN_STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn başlatılamadı (çıkış kodu {process.returncode})")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1.0).json().get("ready"):
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit("uvicorn zamanında hazır olmadı")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run_uvicorn(args, workers):
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    with uvicorn_server(workers) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+            return await run_target(f"uvicorn-w{workers}", client, args)
+
+
+def print_result(result):
+    print(f"{result['name']:<36} {result['throughput']:>9.1f} {result['rows_per_sec']:>10.1f} "
+          f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}  {result['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=("asgi", "uvicorn"), default=["asgi", "uvicorn"])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=500, help="Her ölçümdeki istek sayısı")
+    parser.add_argument('--warmup', type=int, default=20, help="Senaryo başına ısınma isteği")
+    parser.add_argument('--batch-size', type=int, default=100, help="/predict/batch isteği başına başvuru")
+    parser.add_argument('--uvicorn-workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/service-<zaman>.json)")
+    parser.add_argument('--baseline', help="Karşılaştırılacak eski sonuç dosyası")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_REGRESSION_TOLERANCE)
+    parser.add_argument('--fail-on-regression', action='store_true', help="Gerileme varsa 1 ile çık")
+    args = parser.parse_args()
+
+    # Model bir kez yüklenir/eğitilir; artifact uvicorn worker'ları tarafından eğitimsiz yüklenir
+    snapshot = ml_service.ensure_model()
+    if not os.path.exists(ml_service.MODEL_ARTIFACT_PATH):
+        ml_service.save_model_artifact(snapshot=snapshot)
+
+    print(f"{'Ölçüm':<36} {'istek/sn':>9} {'satır/sn':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}  durumlar")
+    results = []
+    if "asgi" in args.targets:
+        results += asyncio.run(run_asgi(args))
+    if "uvicorn" in args.targets:
+        for workers in args.uvicorn_workers:
+            results += asyncio.run(run_uvicorn(args, workers))
+
+    path = write_results("service", run_metadata("service", vars(args), snapshot), results, args.output)
+    print(f"\nSonuçlar yazıldı: {path}")
+
+    if args.baseline:
+        regressions = compare_results(results, args.baseline, args.tolerance)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
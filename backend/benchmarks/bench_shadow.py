@@ -0,0 +1,149 @@
+"""
+Gölge (shadow) model benchmark'ı.
+
+Tek satırlık tahmin yolunun (predict_risk) gecikmesini gölge model yokken
+ve varken karşılaştırır. İstekler --interval-ms aralıklarla gönderilir;
+0 doygun yük demektir (istekler arasında boşluk yok). Yük sondası API'deki
+gibi bir istek çalışırken meşgul döner, böylece gölge skorlama yalnızca
+istekler arasındaki boşluklarda çalışır ve doygun yükte düşürülür.
+
+Challenger, aynı eğitim satırlarında farklı seed ile eğitilmiş bir ormandır.
+
+Parite: gölge istatistikleri (karar ve threshold uyuşmazlıkları, ortalama ve
+en büyük olasılık farkı) iki modelin doğrudan skorlanmasıyla aynı olmalıdır.
+
+Tahmin önbelleği ölçüm süresince kapatılır (model yolu ölçülür).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_shadow.py --iterations 3000 --interval-ms 5 0
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_service  # noqa: E402
+from forest_engine import FlatForest  # noqa: E402
+
+# Ortalama farkta izin verilen yuvarlama hatası (rapor 6 basamak)
+TOLERANCE = 1e-6
+
+
+def percentiles(timings):
+    values = np.array(timings) * 1e6
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def build_challenger(snapshot, seed):
+    """Aynı eğitim satırlarında farklı seed ile eğitilmiş challenger snapshot'ı."""
+    state = snapshot.training_state
+    model = ml_service.build_model(snapshot.model_metrics['training_config'], random_state=seed)
+    model.fit(state.X_train, state.y_train)
+    forest = FlatForest(model)
+    return dataclasses.replace(snapshot, model=model, forest=forest, scorer=ml_service.build_scorer(forest),
+                               model_version=f"{snapshot.model_version}-seed{seed}")
+
+
+def check_parity(snapshot, challenger, records):
+    """Gölge istatistiklerini iki modelin doğrudan skorlanmasıyla karşılaştırır."""
+    evaluator = ml_service.shadow_evaluator
+    evaluator.set_challenger(challenger, source="benchmark")
+    evaluator.stop()
+    results = ml_service.predict_risk_batch(records)
+    evaluator.process(respect_load=False)
+    report = evaluator.report()
+
+    X, _ = snapshot.feature_plan.encode_batch(records)
+    champion_proba = np.array([result['risk_probability'] for result in results])
+    challenger_proba = challenger.scorer.predict_proba(X)[:, 1]
+    expected_decisions = sum(
+        result['decision'] != ml_service.build_prediction_result(challenger, p, {}, {}, "")['decision']
+        for result, p in zip(results, challenger_proba))
+    expected_threshold = int(np.count_nonzero(
+        (champion_proba >= snapshot.optimal_threshold) != (challenger_proba >= challenger.optimal_threshold)))
+    delta = challenger_proba - champion_proba
+    if (report['scored_rows'] != len(records) or report['decision_disagreements'] != expected_decisions
+            or report['threshold_disagreements'] != expected_threshold
+            or abs(report['score_delta']['mean'] - delta.mean()) > TOLERANCE
+            or abs(report['score_delta']['max_abs'] - np.abs(delta).max()) > TOLERANCE):
+        raise SystemExit(f"Parite hatası: {report}")
+    print(f"Parite: {len(records)} satırda karar uyuşmazlığı {expected_decisions}, "
+          f"threshold uyuşmazlığı {expected_threshold}, ortalama fark {delta.mean():+.4f}")
+
+
+def run_requests(records, count, interval, busy):
+    """count isteği interval aralıklarla gönderir; istek sürerken yük sondası meşgul döner."""
+    timings = []
+    next_at = time.perf_counter()
+    for i in range(count):
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        busy[0] = True
+        start = time.perf_counter()
+        ml_service.predict_risk(records[i % len(records)])
+        timings.append(time.perf_counter() - start)
+        busy[0] = False
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=3000)
+    parser.add_argument('--interval-ms', type=float, nargs='+', default=[5.0, 0.0])
+    parser.add_argument('--rounds', type=int, default=6, help="Gölge kapalı/açık sırayla çalışan tur sayısı")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ml_service.train_model(save_artifact=False)
+    snapshot = ml_service.get_snapshot()
+    challenger = build_challenger(snapshot, seed=7)
+    store = snapshot.sample_store
+    records = store.records(np.arange(min(len(store), 1000)))
+    check_parity(snapshot, challenger, records)
+
+    ml_service.prediction_cache.max_size = 0
+    evaluator = ml_service.shadow_evaluator
+    busy = [False]
+    evaluator.load_probe = lambda: busy[0]
+    for data in records[:200]:
+        ml_service.predict_risk(data)
+
+    print(f"\n{'aralık ms':>9} {'gölge':<6} {'p50 µs':>9} {'p99 µs':>9} {'skorlanan':>10} {'düşürülen':>10}")
+    per_round = max(1, args.iterations // args.rounds)
+    for interval_ms in args.interval_ms:
+        timings = {False: [], True: []}
+        scored = dropped = 0
+        for i in range(args.rounds * 2):
+            shadow = bool(i % 2)
+            if shadow:
+                evaluator.set_challenger(challenger, source="benchmark")
+            else:
+                evaluator.clear_challenger()
+            timings[shadow] += run_requests(records, per_round, interval_ms / 1000, busy)
+            if shadow:
+                # Turun sonunda kuyrukta kalanlar bir sonraki boşlukta skorlanır ya da bayatlar
+                time.sleep(evaluator.max_delay + 0.1)
+                report = evaluator.report()
+                scored += report['scored_rows']
+                dropped += sum(report['dropped_rows'].values())
+        evaluator.clear_challenger()
+        for shadow in (False, True):
+            p50, p99 = percentiles(timings[shadow])
+            extra = f"{scored:>10} {dropped:>10}" if shadow else ""
+            print(f"{interval_ms:>9.1f} {'açık' if shadow else 'kapalı':<6} {p50:>9.1f} {p99:>9.1f} {extra}")
+    evaluator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Tahmin yolu aşamalarının mikro-benchmark'ı.
+
+create_domain_features, encode (FeaturePlan) ve predict_proba (yayındaki
+çıkarım motoru) aşamalarını servisten bağımsız olarak tek satır ve batch
+girdilerle ölçer. Sonuçlar bench_service ile aynı JSON biçiminde yazılır ve
+--baseline ile karşılaştırılabilir.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_stages.py --iterations 2000 --batch-size 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from harness import (DEFAULT_REGRESSION_TOLERANCE, compare_results, latency_summary, run_metadata,
+                     synthetic_applications, write_results)
+
+import ml_service  # noqa: E402
+
+
+def measure(func, inputs, iterations, units_per_call=1):
+    """func'ı girdiler üzerinde döngüyle çağırır; throughput birim (satır) / sn'dir."""
+    latencies = []
+    for i in range(iterations):
+        data = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        func(data)
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies, sum(latencies), units=iterations * units_per_call)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000, help="Tek satırlık ölçümlerdeki çağrı sayısı")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--batch-iterations', type=int, default=50)
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/stages-<zaman>.json)")
+    parser.add_argument('--baseline', help="Karşılaştırılacak eski sonuç dosyası")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_REGRESSION_TOLERANCE)
+    parser.add_argument('--fail-on-regression', action='store_true', help="Gerileme varsa 1 ile çık")
+    args = parser.parse_args()
+
+    snapshot = ml_service.ensure_model()
+    plan = snapshot.feature_plan
+    scorer = snapshot.scorer
+
+    singles = synthetic_applications(snapshot.encoders, 500, seed=1)
+    single_frames = [pd.DataFrame([data]) for data in singles]
+    single_rows = [plan.encode(data)[0] for data in singles]
+
+    batches = [synthetic_applications(snapshot.encoders, args.batch_size, seed=100 + i) for i in range(5)]
+    batch_frames = [pd.DataFrame(batch) for batch in batches]
+    batch_matrices = [plan.encode_batch(batch)[0] for batch in batches]
+
+    # Parite: batch encode, tek satırlık encode ile aynı matrisi üretmeli
+    for data, row in zip(batches[0][:200], batch_matrices[0]):
+        if not np.array_equal(plan.encode(data)[0][0], row):
+            raise SystemExit(f"Encode paritesi hatası: {data}")
+
+    cases = [
+        ("create_domain_features/1", lambda df: ml_service.create_domain_features(df), single_frames, 1),
+        ("encode/1", plan.encode, singles, 1),
+        ("predict_proba/1", scorer.predict_proba, single_rows, 1),
+        (f"create_domain_features/{args.batch_size}", lambda df: ml_service.create_domain_features(df),
+         batch_frames, args.batch_size),
+        (f"encode/{args.batch_size}", plan.encode_batch, batches, args.batch_size),
+        (f"predict_proba/{args.batch_size}", scorer.predict_proba, batch_matrices, args.batch_size),
+    ]
+
+    print(f"Çıkarım motoru: {ml_service.INFERENCE_ENGINE}, {len(snapshot.model.estimators_)} ağaç")
+    print(f"{'Aşama/satır':<32} {'satır/sn':>11} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+    results = []
+    for name, func, inputs, rows in cases:
+        iterations = args.iterations if rows == 1 else args.batch_iterations
+        summary = measure(func, inputs, iterations, units_per_call=rows)
+        result = {'name': f"stage/{name}", 'rows': rows, **summary}
+        results.append(result)
+        print(f"{name:<32} {result['throughput']:>11.1f} {result['p50_ms']:>10.3f} "
+              f"{result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+
+    path = write_results("stages", run_metadata("stages", vars(args), snapshot), results, args.output)
+    print(f"\nSonuçlar yazıldı: {path}")
+
+    if args.baseline:
+        regressions = compare_results(results, args.baseline, args.tolerance)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
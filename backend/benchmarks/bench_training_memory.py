@@ -0,0 +1,204 @@
+"""
+Eğitim verisi hazırlığının bellek benchmark'ı.
+
+credit-g şemasında sentetik, büyük bir veri seti (varsayılan 1M satır) üretir
+ve eğitim yolunu iki şekilde ölçer:
+
+- legacy: önceki hazırlık (DataFrame kopyaları, sütun başına string
+  dönüşümü, int64 kodlu encode edilmiş kopya, DataFrame üzerinden ayrım;
+  DataFrame ve tam matris eğitim boyunca tutulur)
+- lean: ml_service.prepare_training_data (yerinde alan özellikleri,
+  kategori kodlarından encode, float32 matris, int8 hedef; DataFrame ve tam
+  matris ayrımdan sonra bırakılır)
+
+Her yol ayrı bir süreçte çalışır; içe aktarmalardan sonraki ve hazırlık
+(veri seti yükleme dahil) / ayrım / eğitim sonrasındaki en yüksek RSS ile
+süreler raporlanır.
+Sentetik satırlar gerçek veri setinden satır örneklenerek (bootstrap)
+üretilir, credit_amount hafifçe oynatılır; şema ve kategoriler aynıdır.
+
+Parite: gerçek veri seti üzerinde iki yolun feature matrisi, hedefi ve
+encoder sınıfları birebir aynı olmalıdır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_training_memory.py --rows 1000000 --n-estimators 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+from harness import run_metadata, write_results
+
+import dataset  # noqa: E402
+import metrics  # noqa: E402
+import ml_service  # noqa: E402
+from sample_store import SampleStore  # noqa: E402
+
+MODES = ("legacy", "lean")
+
+
+def peak_rss_mb():
+    """Bu sürecin en yüksek RSS'i (MB); /proc varsa VmHWM (exec ile sıfırlanır)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024 / 1e6
+    except OSError:
+        pass
+    peak = metrics.peak_rss_bytes()
+    return peak / 1e6 if peak is not None else float('nan')
+
+
+def legacy_prepare(df):
+    """Önceki prepare_training_data (referans): kopyalar ve string dönüşümü ile encode."""
+    df = ml_service.create_domain_features(df)
+    df['target'] = df['class'].map({'bad': 1, 'good': 0})
+    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    if 'class' in categorical_columns:
+        categorical_columns.remove('class')
+    encoders = {}
+    df_encoded = df.copy()
+    for col in categorical_columns:
+        le = LabelEncoder()
+        df_encoded[col] = le.fit_transform(df[col].astype(str))
+        encoders[col] = le
+    feature_columns = [col for col in df_encoded.columns if col not in ['target', 'class']]
+    return df, df_encoded[feature_columns], df_encoded['target'], encoders, feature_columns
+
+
+def synthetic_frame(rows, seed):
+    """Gerçek veri setinden satır örnekleyerek credit-g şemasında rows satırlık veri seti üretir."""
+    source = dataset.load_credit_dataset()
+    rng = np.random.default_rng(seed)
+    df = source.iloc[rng.integers(0, len(source), size=rows)].reset_index(drop=True)
+    jitter = rng.uniform(0.9, 1.1, size=rows)
+    df['credit_amount'] = np.maximum(1, np.rint(df['credit_amount'].to_numpy() * jitter)).astype(np.int64)
+    return df
+
+
+def generate(path, rows, seed):
+    dataset.write_dataset_cache(synthetic_frame(rows, seed), path)
+
+
+def run_child(mode, n_estimators):
+    """Tek bir hazırlık yolunu bu süreçte çalıştırır ve ölçümleri JSON olarak yazar."""
+    stages = {'import': (0.0, peak_rss_mb())}
+
+    # Veri setinin yüklenmesi iki yolda da hazırlık aşamasına dahildir
+    started = time.perf_counter()
+    if mode == "legacy":
+        df, X, y, _, _ = legacy_prepare(dataset.load_credit_dataset())
+    else:
+        df, X, y, _, _, _ = ml_service.prepare_training_data()
+    stages['prepare'] = (time.perf_counter() - started, peak_rss_mb())
+    rows = len(df)
+
+    started = time.perf_counter()
+    SampleStore.from_frame(df)
+    if mode == "lean":
+        del df
+    X_train, X_test, y_train, y_test = ml_service.split_train_test(X, y)
+    if mode == "lean":
+        del X, y
+    stages['split'] = (time.perf_counter() - started, peak_rss_mb())
+
+    if n_estimators:
+        config = ml_service.load_training_config()
+        started = time.perf_counter()
+        model = ml_service.build_model(config, n_estimators=n_estimators)
+        model.fit(X_train, y_train)
+        model.predict_proba(X_test)
+        stages['fit'] = (time.perf_counter() - started, peak_rss_mb())
+
+    print(json.dumps({'mode': mode, 'rows': rows, 'stages': stages}))
+
+
+def spawn(arguments, cache_path=None):
+    """Bu betiği alt süreçte çalıştırır; cache_path verilirse veri seti yalnızca oradan yüklenir."""
+    env = {**os.environ, "CREDITGUARD_LOG_LEVEL": "WARNING"}
+    if cache_path:
+        # Kaynak yolu olmayan bir dosyayı gösterir; dosyaya bağlı olmayan sentetik önbellek kullanılır
+        env.update(CREDITGUARD_DATASET_CACHE=cache_path, CREDITGUARD_DATASET_OFFLINE="1",
+                   CREDITGUARD_DATASET_PATH=f"{cache_path}.source")
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), *arguments], env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise SystemExit(f"Alt süreç başarısız: {' '.join(arguments)}\n{completed.stderr}")
+    return completed.stdout
+
+
+def check_parity():
+    """Gerçek veri setinde legacy ve lean hazırlığın aynı matris, hedef ve encoder'ları ürettiğini doğrular."""
+    df, X, y, encoders, feature_names, _ = ml_service.prepare_training_data()
+    _, X_old, y_old, encoders_old, feature_names_old = legacy_prepare(dataset.load_credit_dataset())
+    if feature_names != feature_names_old:
+        raise SystemExit("Parite hatası: feature sırası")
+    if not np.array_equal(X, X_old.to_numpy(dtype=np.float32)) or not np.array_equal(y, y_old.to_numpy(dtype=np.int8)):
+        raise SystemExit("Parite hatası: feature matrisi veya hedef")
+    for col, encoder in encoders.items():
+        if list(encoder.classes_) != list(encoders_old[col].classes_):
+            raise SystemExit(f"Parite hatası: encoder sınıfları ({col})")
+    print(f"Parite: {len(df)} satırda feature matrisi, hedef ve encoder sınıfları aynı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--n-estimators', type=int, default=4, help="Eğitilecek ağaç sayısı (0 = eğitim yok)")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/training-memory-<zaman>.json)")
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--generate', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.generate, args.rows, args.seed)
+        return
+    if args.child:
+        run_child(args.child, args.n_estimators)
+        return
+
+    check_parity()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "credit-g-synthetic.npz")
+        # Üretim de ayrı süreçte: ölçülen süreçler büyük veri setini üreten süreçten türemez
+        spawn(['--generate', cache_path, '--rows', str(args.rows), '--seed', str(args.seed)])
+
+        print(f"\n{'Yol':<8} {'satır':>9} {'aşama':<8} {'süre (sn)':>10} {'en yüksek RSS (MB)':>19}")
+        for mode in args.modes:
+            output = spawn(['--child', mode, '--n-estimators', str(args.n_estimators)], cache_path)
+            result = json.loads(output.strip().splitlines()[-1])
+            for stage, (seconds, peak_mb) in result['stages'].items():
+                print(f"{mode:<8} {result['rows']:>9} {stage:<8} {seconds:>10.2f} {peak_mb:>19.1f}")
+            import_peak = result['stages']['import'][1]
+            final_peak = max(peak for _, peak in result['stages'].values())
+            results.append({
+                'name': f"training-memory/{mode}",
+                'rows': result['rows'],
+                'stages': result['stages'],
+                'peak_rss_mb': round(final_peak, 1),
+                'peak_over_import_mb': round(final_peak - import_peak, 1),
+            })
+
+    print(f"\n{'Yol':<8} {'en yüksek RSS (MB)':>19} {'içe aktarma sonrası artış (MB)':>31}")
+    for result in results:
+        print(f"{result['name'].split('/')[1]:<8} {result['peak_rss_mb']:>19.1f} {result['peak_over_import_mb']:>31.1f}")
+
+    path = write_results("training-memory", run_metadata("training-memory", vars(args)), results, args.output)
+    print(f"\nSonuçlar yazıldı: {path}")
+
+
+if __name__ == "__main__":
+    main()
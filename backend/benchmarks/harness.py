@@ -0,0 +1,149 @@
+"""
+Benchmark ortak yardımcıları: sentetik başvurular, gecikme özetleri ve
+regresyon karşılaştırması için JSON sonuç dosyaları.
+
+Sonuç dosyası biçimi:
+    {"meta": {...ortam ve model bilgisi...},
+     "results": [{"name": ..., "throughput": ..., "p50_ms": ..., "p95_ms": ..., "p99_ms": ..., ...}]}
+
+Aynı "name" değerine sahip ölçümler --baseline ile verilen eski bir sonuç
+dosyasıyla karşılaştırılır.
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+sys.path.insert(0, BACKEND_DIR)
+
+# Karşılaştırmada gerileme sayılan göreli değişim (throughput düşüşü veya p99 artışı)
+DEFAULT_REGRESSION_TOLERANCE = 0.10
+
+# Şemadaki opsiyonel numeric alanların aralıkları (schemas.CreditApplication)
+OPTIONAL_NUMERIC_RANGES = {
+    'installment_commitment': (1, 4),
+    'residence_since': (1, 4),
+    'existing_credits': (1, 4),
+    'num_dependents': (1, 2),
+}
+
+
+def synthetic_applications(encoders: Dict[str, Any], n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Encoder kategori sözlüklerinden n geçerli (API şemasına uyan) başvuru üretir.
+
+    credit_amount sürekli olduğu için başvurular pratikte birbirinden farklıdır;
+    ölçümler tahmin önbelleği isabetlerini değil model yolunu yansıtır.
+    """
+    rng = random.Random(seed)
+    vocabularies = {col: list(encoder.classes_) for col, encoder in encoders.items()}
+    applications = []
+    for _ in range(n):
+        data = {
+            'duration': rng.randint(4, 72),
+            'credit_amount': round(rng.uniform(250, 18000), 2),
+            'age': rng.randint(19, 75),
+        }
+        for col, (low, high) in OPTIONAL_NUMERIC_RANGES.items():
+            data[col] = rng.randint(low, high)
+        for col, values in vocabularies.items():
+            data[col] = rng.choice(values)
+        applications.append(data)
+    return applications
+
+
+def latency_summary(latencies: List[float], elapsed: float, units: int = None) -> Dict[str, Any]:
+    """
+    Saniye cinsinden gecikmelerden özet çıkarır.
+
+    throughput: saniyedeki işlem (units verilirse saniyedeki birim, ör. satır) sayısı
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    count = len(values)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if count else (0.0, 0.0, 0.0)
+    return {
+        'count': count,
+        'throughput': round((units if units is not None else count) / max(elapsed, 1e-9), 2),
+        'mean_ms': round(float(values.mean()), 4) if count else 0.0,
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'max_ms': round(float(values.max()), 4) if count else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_metadata(benchmark: str, args: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
+    """Sonuçların hangi kod, ortam ve modelle alındığını kaydeder."""
+    meta = {
+        'benchmark': benchmark,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'args': args,
+        'env': {key: value for key, value in sorted(os.environ.items()) if key.startswith('CREDITGUARD_')},
+    }
+    if snapshot is not None:
+        meta['model_version'] = snapshot.model_version
+        meta['n_estimators'] = len(snapshot.model.estimators_)
+    return meta
+
+
+def write_results(benchmark: str, meta: Dict[str, Any], results: List[Dict[str, Any]],
+                  path: Optional[str] = None) -> str:
+    """Sonuçları JSON olarak yazar; yol verilmezse benchmarks/results/<benchmark>-<zaman>.json."""
+    if path is None:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{benchmark}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_results(results: List[Dict[str, Any]], baseline_path: str,
+                    tolerance: float = DEFAULT_REGRESSION_TOLERANCE) -> int:
+    """
+    Ölçümleri eski bir sonuç dosyasıyla karşılaştırır ve tabloyu yazdırır.
+
+    Returns:
+        Gerileme sayısı (throughput tolerance'tan fazla düşen veya p99'u tolerance'tan fazla artan ölçümler)
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result['name']: result for result in json.load(f)['results']}
+
+    regressions = 0
+    print(f"\nKarşılaştırma: {baseline_path}")
+    print(f"{'Ölçüm':<44} {'throughput':>11} {'değişim':>9} {'p99 (ms)':>10} {'değişim':>9}")
+    for result in results:
+        old = baseline.get(result['name'])
+        if old is None:
+            print(f"{result['name']:<44} {'(yeni ölçüm)':>11}")
+            continue
+        throughput_change = result['throughput'] / old['throughput'] - 1 if old['throughput'] else 0.0
+        p99_change = result['p99_ms'] / old['p99_ms'] - 1 if old['p99_ms'] else 0.0
+        regressed = throughput_change < -tolerance or p99_change > tolerance
+        regressions += regressed
+        print(f"{result['name']:<44} {result['throughput']:>11.1f} {throughput_change:>+8.1%} "
+              f"{result['p99_ms']:>10.3f} {p99_change:>+8.1%}{'  GERİLEME' if regressed else ''}")
+    return regressions
@@ -0,0 +1,437 @@
+"""
+CreditGuard AI - Parça Parça (Out-of-Core) Eğitim
+Belleğe sığmayan büyük başvuru geçmişleriyle (CSV / Parquet) sınırlı bellekte model eğitimi.
+
+- 1. geçiş: dosya parça parça okunur; kategorik sütunların sözlükleri
+  (encoder sınıfları), satır ve sınıf sayıları ile veri seti özeti çıkarılır.
+- 2. geçiş: her parçaya alan özellikleri eklenir, parça encode edilir ve
+  diskteki float32 memory-mapped .npy matrislerine (eğitim / holdout)
+  yazılır. Holdout satırları sınıf bazında %20 olacak şekilde akış sırasında
+  (hipergeometrik örnekleme) seçilir; örnek veri deposu için satırlar
+  reservoir örneklemesiyle toplanır.
+- Eğitim: orman ağaç grupları halinde eğitilir. Her grup eğitim
+  matrisinden örneklenen en fazla TREE_SAMPLE_ROWS satır üzerinde (grup
+  içinde bootstrap ile) eğitilir; bellek veri seti boyutuyla değil parça ve
+  grup örneği boyutuyla sınırlıdır.
+- Değerlendirme: holdout parça parça skorlanır, skorlar sabit kovalara
+  sayılır (thresholds.score_histogram) ve threshold eğrisi kova
+  sayımlarından seçilir; çözünürlük 1 / THRESHOLD_BINS.
+
+Memory-map dosyaları geçici bir klasörde tutulur ve eğitimden sonra silinir.
+Okunan/yazılan memory-map sayfaları RSS'te görünür; bunlar işletim sisteminin
+geri alabildiği dosya önbelleğidir, anonim bellek veri seti boyutuyla büyümez.
+Eğitim durumu saklanmaz (training_state=None): yeni etiketli satırlar için
+artımlı eğitim yerine tam yeniden eğitim gerekir.
+
+Kullanım (backend klasöründen):
+    python -m cli train --source data/applications.csv --chunk-size 100000
+"""
+
+import copy
+import hashlib
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+import metrics
+import ml_service
+from app_logging import get_logger, log_fields
+from dataset import iter_dataset_chunks
+from drift import DriftBaseline
+from explanations import ExplanationEngine
+from forest_engine import FlatForest
+from sample_store import SAMPLE_STORE_MAX_ROWS, SampleStore
+from thresholds import score_histogram, threshold_curve_from_histogram
+
+logger = get_logger("chunked_training")
+
+# Bir seferde okunan / encode edilen / skorlanan satır sayısı
+CHUNK_SIZE = int(os.getenv("CREDITGUARD_TRAIN_CHUNK_SIZE", "100000"))
+
+# Ağaç grubu başına eğitim matrisinden örneklenen en fazla satır ve grup başına ağaç sayısı
+TREE_SAMPLE_ROWS = int(os.getenv("CREDITGUARD_CHUNKED_TREE_SAMPLE_ROWS", "250000"))
+TREES_PER_SAMPLE = int(os.getenv("CREDITGUARD_CHUNKED_TREES_PER_SAMPLE", "10"))
+
+# Holdout skorlarının sayıldığı kova sayısı (threshold çözünürlüğü 1 / THRESHOLD_BINS)
+THRESHOLD_BINS = int(os.getenv("CREDITGUARD_CHUNKED_THRESHOLD_BINS", "1000"))
+
+# Memory-map dosyalarının klasörü (varsayılan: sistemin geçici klasörü)
+WORK_DIR = os.getenv("CREDITGUARD_CHUNKED_WORK_DIR")
+
+# split_train_test ile aynı oran
+HOLDOUT_FRACTION = 0.2
+
+TARGET_COLUMN = 'class'
+
+# Eksik kategorik değerlerin sınıfı
+MISSING_CATEGORY = 'nan'
+
+
+@dataclass
+class SourceScan:
+    """1. geçişin sonucu: şema, kategori sözlükleri ve sayımlar."""
+    columns: List[str]
+    vocabularies: Dict[str, Set[str]]  # kategorik sütun -> görülen değerler
+    rows: int
+    class_counts: np.ndarray  # [güvenli, riskli]
+    fingerprint: str
+    chunks: int
+
+
+def _peak_rss_mb() -> Optional[float]:
+    peak = metrics.peak_rss_bytes()
+    return round(peak / 1e6, 1) if peak is not None else None
+
+
+def _category_strings(series: pd.Series) -> np.ndarray:
+    """Kategorik sütun değerlerinin string halleri; eksik değerler MISSING_CATEGORY."""
+    values = series.astype(str).to_numpy(dtype=object)
+    missing = series.isna().to_numpy()
+    if missing.any():
+        values[missing] = MISSING_CATEGORY
+    return values
+
+
+def _labels(chunk: pd.DataFrame) -> np.ndarray:
+    """Hedef: 'bad' -> 1 (Riskli), diğerleri 0 (prepare_training_data ile aynı)."""
+    return (chunk[TARGET_COLUMN] == 'bad').to_numpy(dtype=np.int8)
+
+
+def scan_source(path: str, chunk_size: int) -> SourceScan:
+    """
+    1. geçiş: sütunları, kategori sözlüklerini, sınıf sayılarını ve veri seti özetini çıkarır.
+
+    Sütun tipleri ilk parçadan belirlenir; numeric olmayan sütunlar kategoriktir.
+    Özet, dosya tek seferde yüklendiğindeki compute_dataset_fingerprint ile
+    aynı yöntemle (satır hash'leri) parça parça hesaplanır.
+
+    Raises:
+        ValueError: Dosya boşsa, hedef sütunu yoksa veya parçaların sütunları farklıysa
+    """
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    columns: Optional[List[str]] = None
+    vocabularies: Dict[str, Set[str]] = {}
+    class_counts = np.zeros(2, dtype=np.int64)
+    rows = chunks = 0
+
+    for chunk in iter_dataset_chunks(path, chunk_size):
+        chunk_columns = [str(col) for col in chunk.columns]
+        if columns is None:
+            columns = chunk_columns
+            if TARGET_COLUMN not in columns:
+                raise ValueError(f"Eğitim dosyasında '{TARGET_COLUMN}' sütunu yok: {path}")
+            vocabularies = {
+                col: set() for col in columns
+                if col != TARGET_COLUMN and not pd.api.types.is_numeric_dtype(chunk[col])
+            }
+            digest.update(",".join(columns).encode("utf-8"))
+        elif chunk_columns != columns:
+            raise ValueError(f"Parça sütunları ilk parçadakilerle aynı değil: {path}")
+
+        digest.update(pd.util.hash_pandas_object(chunk, index=False).values.tobytes())
+        for col, vocabulary in vocabularies.items():
+            vocabulary.update(pd.unique(_category_strings(chunk[col])).tolist())
+        class_counts += np.bincount(_labels(chunk), minlength=2)
+        rows += len(chunk)
+        chunks += 1
+
+    if not rows:
+        raise ValueError(f"Eğitim dosyası boş: {path}")
+
+    logger.info("Kaynak tarandı", extra=log_fields(
+        rows=rows, chunks=chunks, categorical=len(vocabularies), bad=int(class_counts[1]),
+        seconds=round(time.perf_counter() - started, 2), peak_rss_mb=_peak_rss_mb()))
+    return SourceScan(columns, vocabularies, rows, class_counts, digest.hexdigest(), chunks)
+
+
+def build_encoders(scan: SourceScan) -> Dict[str, LabelEncoder]:
+    """Sözlüklerden LabelEncoder'lar (sınıflar sıralı; fit_transform(astype(str)) ile aynı kodlar)."""
+    encoders = {}
+    for col, vocabulary in scan.vocabularies.items():
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(sorted(vocabulary), dtype=object)
+        encoders[col] = encoder
+    return encoders
+
+
+def encode_chunk(chunk: pd.DataFrame, feature_names: List[str],
+                 categories: Dict[str, pd.Index]) -> np.ndarray:
+    """
+    Alan özellikleri eklenmiş parçayı float32 feature matrisine çevirir.
+
+    Sözlükte olmayan değerler (dosya geçişler arasında değiştiyse) tahmindeki
+    gibi ilk sınıfa (kod 0) düşer.
+
+    Raises:
+        ValueError: Numeric sütunda sayıya çevrilemeyen değer varsa
+    """
+    X = np.empty((len(chunk), len(feature_names)), dtype=np.float32)
+    for index, col in enumerate(feature_names):
+        if col in categories:
+            codes = categories[col].get_indexer(_category_strings(chunk[col]))
+            X[:, index] = np.where(codes >= 0, codes, 0)
+        else:
+            X[:, index] = pd.to_numeric(chunk[col]).to_numpy()
+    return X
+
+
+def _holdout_mask(labels: np.ndarray, remaining: np.ndarray, remaining_holdout: np.ndarray,
+                  rng: np.random.Generator) -> np.ndarray:
+    """
+    Parçanın holdout satırlarını seçer; remaining / remaining_holdout yerinde güncellenir.
+
+    Her sınıfta parçaya düşen holdout sayısı hipergeometrik örneklenir; tüm
+    geçiş sonunda sınıf başına tam olarak istenen sayıda satır, eşit olasılıkla seçilmiş olur.
+    """
+    mask = np.zeros(len(labels), dtype=bool)
+    for label in (0, 1):
+        rows = np.flatnonzero(labels == label)
+        if not len(rows):
+            continue
+        if len(rows) > remaining[label]:
+            raise ValueError("Eğitim dosyası geçişler arasında değişti (satır sayısı tutmuyor).")
+        n_holdout = int(rng.hypergeometric(remaining_holdout[label], remaining[label] - remaining_holdout[label],
+                                           len(rows)))
+        mask[rng.choice(rows, size=n_holdout, replace=False)] = True
+        remaining[label] -= len(rows)
+        remaining_holdout[label] -= n_holdout
+    return mask
+
+
+def _update_reservoir(reservoir: Optional[pd.DataFrame], chunk: pd.DataFrame, offset: int,
+                      max_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Tüm satırlar arasından eşit olasılıkla en fazla max_rows satır tutar (rastgele anahtar ile)."""
+    keys = rng.random(len(chunk))
+    if reservoir is not None and len(reservoir) >= max_rows:
+        # Yalnızca mevcut en büyük anahtardan küçük anahtarlı satırlar girebilir
+        keep = keys < reservoir['_key'].max()
+        chunk, keys, rows = chunk[keep], keys[keep], np.flatnonzero(keep) + offset
+    else:
+        rows = np.arange(offset, offset + len(chunk))
+    candidates = chunk.assign(_key=keys, _row=rows)
+    reservoir = candidates if reservoir is None else pd.concat([reservoir, candidates], ignore_index=True)
+    if len(reservoir) > max_rows:
+        reservoir = reservoir.nsmallest(max_rows, '_key')
+    return reservoir
+
+
+def encode_source(path: str, scan: SourceScan, encoders: Dict[str, LabelEncoder], work_dir: str,
+                  chunk_size: int, seed: int = 42) -> Tuple[List[str], Dict[str, np.ndarray], SampleStore]:
+    """
+    2. geçiş: parçaları encode edip eğitim / holdout memory-map matrislerine yazar.
+
+    Returns:
+        (feature_names, arrays, samples): arrays; X_train, y_train, X_holdout,
+        y_holdout memory-map dizileri, samples örnek veri deposu
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n_holdout = np.rint(scan.class_counts * HOLDOUT_FRACTION).astype(np.int64)
+    n_train = scan.class_counts - n_holdout
+    if (n_holdout == 0).any() or (n_train == 0).any():
+        raise ValueError("Eğitim ve holdout için her iki sınıftan da yeterli satır olmalı.")
+
+    categories = {col: pd.Index(encoder.classes_) for col, encoder in encoders.items()}
+    remaining = scan.class_counts.copy()
+    remaining_holdout = n_holdout.copy()
+    arrays: Dict[str, np.ndarray] = {}
+    feature_names: List[str] = []
+    reservoir = None
+    positions = {'train': 0, 'holdout': 0}
+    offset = 0
+
+    for chunk in iter_dataset_chunks(path, chunk_size):
+        ml_service.create_domain_features(chunk, inplace=True)
+        if not arrays:
+            # Feature sırası prepare_training_data ile aynı: kaynak sütunları + alan özellikleri
+            feature_names = [col for col in chunk.columns if col not in ['target', TARGET_COLUMN]]
+            for split, size in (('train', int(n_train.sum())), ('holdout', int(n_holdout.sum()))):
+                arrays[f'X_{split}'] = np.lib.format.open_memmap(
+                    os.path.join(work_dir, f'X_{split}.npy'), mode='w+', dtype=np.float32,
+                    shape=(size, len(feature_names)))
+                arrays[f'y_{split}'] = np.lib.format.open_memmap(
+                    os.path.join(work_dir, f'y_{split}.npy'), mode='w+', dtype=np.int8, shape=(size,))
+
+        X = encode_chunk(chunk, feature_names, categories)
+        labels = _labels(chunk)
+        to_holdout = _holdout_mask(labels, remaining, remaining_holdout, rng)
+        for split, mask in (('train', ~to_holdout), ('holdout', to_holdout)):
+            start, count = positions[split], int(mask.sum())
+            arrays[f'X_{split}'][start:start + count] = X[mask]
+            arrays[f'y_{split}'][start:start + count] = labels[mask]
+            positions[split] += count
+
+        reservoir = _update_reservoir(reservoir, chunk, offset, SAMPLE_STORE_MAX_ROWS, rng)
+        offset += len(chunk)
+
+    if offset != scan.rows:
+        raise ValueError("Eğitim dosyası geçişler arasında değişti (satır sayısı tutmuyor).")
+    for array in arrays.values():
+        array.flush()
+
+    sample = reservoir.sort_values('_row').drop(columns=['_key', '_row']).reset_index(drop=True)
+    samples = SampleStore.from_frame(sample, source_rows=scan.rows)
+    logger.info("Kaynak encode edildi", extra=log_fields(
+        train_rows=positions['train'], holdout_rows=positions['holdout'], features=len(feature_names),
+        matrix_bytes=sum(array.nbytes for array in arrays.values()), sample_rows=len(samples),
+        seconds=round(time.perf_counter() - started, 2), peak_rss_mb=_peak_rss_mb()))
+    return feature_names, arrays, samples
+
+
+def fit_forest(X_train: np.ndarray, y_train: np.ndarray, config: Dict[str, Any],
+               seed: int = 42) -> Tuple[RandomForestClassifier, Dict[str, Any]]:
+    """
+    Ormanı ağaç grupları halinde eğitir; her grup en fazla TREE_SAMPLE_ROWS satırlık örnek kullanır.
+
+    Eğitim seti örnekten küçükse tüm ağaçlar tek seferde tüm set üzerinde
+    eğitilir (tam eğitimle aynı). Gruplar ayrı seed'lerle eğitilip tek
+    ormanda birleştirilir.
+
+    Raises:
+        ValueError: Bir grup örneğinde iki sınıftan biri yoksa
+    """
+    started = time.perf_counter()
+    n_trees = config['n_estimators']
+    n_train = len(y_train)
+    sample_rows = min(TREE_SAMPLE_ROWS, n_train)
+    if sample_rows == n_train:
+        groups = [n_trees]
+    else:
+        groups = [TREES_PER_SAMPLE] * (n_trees // TREES_PER_SAMPLE)
+        if n_trees % TREES_PER_SAMPLE:
+            groups.append(n_trees % TREES_PER_SAMPLE)
+
+    rng = np.random.default_rng(seed)
+    forests = []
+    for group, size in enumerate(groups):
+        if sample_rows == n_train:
+            X_sample, y_sample = np.asarray(X_train), np.asarray(y_train)
+        else:
+            # Sıralı indeksler memory-map'ten ardışık okunur
+            rows = np.sort(rng.choice(n_train, size=sample_rows, replace=False))
+            X_sample, y_sample = X_train[rows], y_train[rows]
+        if len(np.unique(y_sample)) < 2:
+            raise ValueError("Ağaç grubu örneğinde her iki sınıftan da satır olmalı.")
+        forest = ml_service.build_model(config, n_jobs=-1, n_estimators=size, random_state=seed + group)
+        forest.fit(X_sample, y_sample)
+        forests.append(forest)
+        del X_sample, y_sample
+        logger.info("Ağaç grubu eğitildi", extra=log_fields(
+            group=group + 1, groups=len(groups), trees=size, sample_rows=sample_rows, peak_rss_mb=_peak_rss_mb()))
+
+    # Gruplar tek ormanda birleştirilir (ağaçlar eğitimden sonra salt okunur)
+    model = copy.copy(forests[0])
+    model.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    model.n_estimators = len(model.estimators_)
+    info = {
+        'groups': len(groups),
+        'tree_sample_rows': int(sample_rows),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    return model, info
+
+
+def evaluate_streamed_holdout(scorer, X_holdout: np.ndarray, y_holdout: np.ndarray,
+                              config: Dict[str, Any], chunk_size: int):
+    """
+    Holdout'u parça parça skorlar, skorları kovalara sayar ve threshold'u seçer.
+
+    Returns:
+        ml_service.evaluate_holdout ile aynı (optimal_threshold, metrics)
+    """
+    positive_counts = np.zeros(THRESHOLD_BINS + 1, dtype=np.int64)
+    negative_counts = np.zeros(THRESHOLD_BINS + 1, dtype=np.int64)
+    for start in range(0, len(y_holdout), chunk_size):
+        X = np.ascontiguousarray(X_holdout[start:start + chunk_size])
+        positives, negatives = score_histogram(y_holdout[start:start + chunk_size],
+                                               scorer.predict_proba(X)[:, 1], THRESHOLD_BINS)
+        positive_counts += positives
+        negative_counts += negatives
+
+    logger.info("Optimal threshold aranıyor", extra=log_fields(
+        objective=ml_service.THRESHOLD_OBJECTIVE, holdout_rows=len(y_holdout), bins=THRESHOLD_BINS))
+    curve = threshold_curve_from_histogram(positive_counts, negative_counts, risk_weight=ml_service.RISK_WEIGHT)
+    return ml_service.evaluate_curve(curve, config)
+
+
+def fit_chunked_snapshot(path: str, chunk_size: int = None, work_dir: str = None,
+                         seed: int = 42) -> "ml_service.ModelSnapshot":
+    """
+    Büyük bir CSV / Parquet dosyasından sınırlı bellekle model eğitir ve yeni bir ModelSnapshot döndürür.
+
+    fit_model_snapshot gibi global durumu değiştirmez; yayına alma
+    publish_snapshot ile yapılır.
+
+    Args:
+        path: Eğitim dosyası (.csv, .parquet); credit-g şemasında, 'class' sütunu ile
+        chunk_size: Parça boyutu (varsayılan: CHUNK_SIZE)
+        work_dir: Memory-map dosyalarının oluşturulacağı klasör (varsayılan: WORK_DIR / geçici klasör)
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    logger.info("Parça parça eğitim başladı", extra=log_fields(path=path, chunk_size=chunk_size))
+
+    scan = scan_source(path, chunk_size)
+    encoders = build_encoders(scan)
+    config = ml_service.load_training_config()
+
+    with tempfile.TemporaryDirectory(prefix="creditguard-chunked-", dir=work_dir or WORK_DIR) as tmp:
+        feature_names, arrays, samples = encode_source(path, scan, encoders, tmp, chunk_size, seed)
+
+        logger.info("Model eğitiliyor", extra=log_fields(
+            class_weight={0: 1.0, 1: config['risk_weight']}, train_rows=len(arrays['y_train'])))
+        model, forest_info = fit_forest(arrays['X_train'], arrays['y_train'], config, seed)
+        forest = FlatForest(model)
+        scorer = ml_service.build_scorer(forest)
+
+        optimal_threshold, holdout_metrics = evaluate_streamed_holdout(
+            scorer, arrays['X_holdout'], arrays['y_holdout'], config, chunk_size)
+        train_samples = len(arrays['y_train'])
+        # Drift baseline'ı eğitim satırlarından örneklenerek hesaplanır (DRIFT_BASELINE_ROWS)
+        drift_baseline = DriftBaseline.from_training(arrays['X_train'], feature_names, encoders, seed=seed)
+        # Memory-map'ler klasör silinmeden önce kapatılır
+        arrays.clear()
+
+    model_metrics = {
+        **holdout_metrics,
+        'train_samples': int(train_samples),
+        'total_samples': int(scan.rows),
+        'training_config': config,
+        'chunked': {
+            'chunk_size': chunk_size,
+            'chunks': scan.chunks,
+            'threshold_bins': THRESHOLD_BINS,
+            **forest_info,
+        },
+    }
+    peak_rss = _peak_rss_mb()
+    if peak_rss is not None:
+        model_metrics['training_peak_rss_mb'] = peak_rss
+    logger.info("Parça parça eğitim tamamlandı", extra=log_fields(
+        rows=scan.rows, trees=len(model.estimators_), peak_rss_mb=peak_rss))
+
+    return ml_service.ModelSnapshot(
+        model=model,
+        encoders=encoders,
+        feature_names=feature_names,
+        optimal_threshold=optimal_threshold,
+        model_metrics=model_metrics,
+        feature_plan=ml_service.FeaturePlan(feature_names, encoders),
+        sample_store=samples,
+        model_version=f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{scan.fingerprint[:8]}",
+        dataset_fingerprint=scan.fingerprint,
+        forest=forest,
+        scorer=scorer,
+        explainer=ExplanationEngine(feature_names, model.feature_importances_),
+        # Eğitim satırları saklanmaz; artımlı eğitim yerine tam yeniden eğitim yapılır
+        training_state=None,
+        drift_baseline=drift_baseline
+    )
@@ -0,0 +1,155 @@
+"""
+CreditGuard AI - Komut Satırı Arayüzü
+Model eğitimi, dosya skorlama ve hiperparametre aramasını komut satırından çalıştırır.
+
+ml_service burada normal bir modül olarak import edilir. CLI doğrudan
+ml_service.py'den (__main__ olarak) çalıştırılsaydı tuning ve chunked_training'in
+yaptığı `import ml_service` ikinci bir modül örneği yaratır; kilitler, executor,
+drift monitörü ve tahmin cache'i iki kopya olurdu.
+
+Kullanım (backend klasöründen):
+    python -m cli train
+    python -m cli score --input apps.csv --output scored.ndjson
+    python -m cli tune --folds 5 --max-trials 40 --workers 8
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
+import time
+from typing import List
+
+import ml_service
+from app_logging import get_logger, log_fields
+
+logger = get_logger("cli")
+
+
+SCORED_CSV_COLUMNS = ['index', 'status', 'risk_score', 'decision', 'risk_level',
+                      'risk_probability', 'explanation', 'error']
+
+
+def _infer_format(path: str, explicit: str = None) -> str:
+    """Dosya uzantısından csv / ndjson formatını belirler."""
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def _open_stream(path: str, mode: str, standard_stream):
+    """
+    '-' için stdin/stdout'u kapatmayan bir context, aksi halde dosyayı açar.
+    
+    Yalnızca bu fonksiyonun açtığı dosyalar with bloğu sonunda kapanır.
+    """
+    if path == '-':
+        return contextlib.nullcontext(standard_stream)
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def _score_file(args) -> None:
+    """CLI 'score' komutu: dosyayı parça parça skorlar ve sonuçları akıtır."""
+    input_format = _infer_format(args.input, args.input_format)
+    output_format = _infer_format(args.output, args.output_format)
+    
+    # stdout, redirect_stdout'tan önce yakalanır; loglar stderr'e, sonuçlar gerçek çıktıya gider
+    with _open_stream(args.input, 'r', sys.stdin) as input_stream, \
+            _open_stream(args.output, 'w', sys.stdout) as output_stream, \
+            contextlib.redirect_stdout(sys.stderr):
+        ml_service.ensure_model()
+        
+        writer = None
+        if output_format == 'csv':
+            writer = csv.DictWriter(output_stream, fieldnames=SCORED_CSV_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+        
+        total = 0
+        failed = 0
+        started = time.perf_counter()
+        last_report = started
+        records = ml_service.read_application_records(input_stream, input_format)
+        for output in ml_service.score_application_stream(records, chunk_size=args.chunk_size):
+            if writer is not None:
+                writer.writerow(output)
+            else:
+                output_stream.write(json.dumps(output, ensure_ascii=False) + "\n")
+            total += 1
+            failed += output['status'] != 'ok'
+            
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                logger.info("Skorlama sürüyor", extra=log_fields(
+                    rows=total, rows_per_sec=round(total / (now - started))))
+                last_report = now
+        
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        logger.info("Skorlama tamamlandı", extra=log_fields(
+            rows=total, failed=failed, seconds=round(elapsed, 2), rows_per_sec=round(total / elapsed)))
+
+
+def run_cli(argv: List[str] = None) -> None:
+    """
+    Komut satırı arayüzü.
+    
+    Örnekler:
+        python -m cli train
+        python -m cli train --source history.csv --chunk-size 100000
+        python -m cli score --input apps.csv --output scored.ndjson --chunk-size 5000
+        python -m cli tune --folds 5 --max-trials 40 --workers 8
+    """
+    parser = argparse.ArgumentParser(prog="python -m cli", description="CreditGuard AI model servisi")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    train_parser = subparsers.add_parser("train", help="Modeli eğitir ve performans metriklerini yazdırır")
+    train_parser.add_argument("--source", help="Belleğe yüklenmeden parça parça eğitilecek .csv / .parquet dosyası")
+    train_parser.add_argument("--chunk-size", type=int, help="--source ile bir seferde okunan satır sayısı")
+    train_parser.add_argument("--work-dir", help="--source ile memory-map dosyalarının klasörü")
+    
+    score_parser = subparsers.add_parser("score", help="CSV/NDJSON başvuru dosyasını sabit bellekle skorlar")
+    score_parser.add_argument("--input", required=True, help="Girdi dosyası (.csv veya .ndjson, '-' = stdin)")
+    score_parser.add_argument("--output", required=True, help="Çıktı dosyası (.ndjson veya .csv, '-' = stdout)")
+    score_parser.add_argument("--input-format", choices=["csv", "ndjson"], help="Varsayılan: dosya uzantısından")
+    score_parser.add_argument("--output-format", choices=["csv", "ndjson"], help="Varsayılan: dosya uzantısından")
+    score_parser.add_argument("--chunk-size", type=int, default=ml_service.STREAM_CHUNK_SIZE,
+                              help="Bir seferde skorlanan satır sayısı "
+                                   f"(varsayılan: {ml_service.STREAM_CHUNK_SIZE})")
+    
+    tune_parser = subparsers.add_parser("tune", help="RISK_WEIGHT ve hiperparametreleri paralel CV ile arar")
+    tune_parser.add_argument("--folds", type=int, default=5, help="Stratified k-fold sayısı (varsayılan: 5)")
+    tune_parser.add_argument("--max-trials", type=int, default=40, help="En fazla deneme sayısı (varsayılan: 40)")
+    tune_parser.add_argument("--workers", type=int, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    tune_parser.add_argument("--seed", type=int, default=42)
+    tune_parser.add_argument("--objective", help=f"Threshold hedefi (varsayılan: {ml_service.THRESHOLD_OBJECTIVE})")
+    tune_parser.add_argument("--prune-margin", type=float, default=0.05,
+                             help="En iyi skorun bu kadar altında kalan denemeler erken budanır")
+    tune_parser.add_argument("--output-dir", help="Leaderboard klasörü (varsayılan: artifacts/tuning)")
+    tune_parser.add_argument("--config-path",
+                             help=f"En iyi yapılandırma dosyası (varsayılan: {ml_service.TUNED_CONFIG_PATH})")
+    tune_parser.add_argument("--no-write-config", action="store_true",
+                             help="En iyi yapılandırmayı train_model için yazma")
+    
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        if args.chunk_size < 1:
+            parser.error("--chunk-size en az 1 olmalı")
+        _score_file(args)
+    elif args.command == "tune":
+        if args.folds < 2:
+            parser.error("--folds en az 2 olmalı")
+        from tuning import run_tuning
+        run_tuning(
+            folds=args.folds, max_trials=args.max_trials, workers=args.workers, seed=args.seed,
+            objective=args.objective, prune_margin=args.prune_margin, output_dir=args.output_dir,
+            config_path=args.config_path, write_config=not args.no_write_config
+        )
+    else:
+        if getattr(args, "chunk_size", None) is not None and args.chunk_size < 1:
+            parser.error("--chunk-size en az 1 olmalı")
+        ml_service.train_model(source_path=getattr(args, "source", None), chunk_size=getattr(args, "chunk_size", None),
+                    work_dir=getattr(args, "work_dir", None))
+
+
+if __name__ == "__main__":
+    run_cli()
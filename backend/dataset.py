@@ -0,0 +1,262 @@
+"""
+CreditGuard AI - Veri Seti Katmanı
+German Credit Data (credit-g) veri setini yerel kaynaktan ve sıkıştırılmış önbellekten yükler.
+
+Yükleme sırası:
+1. Önbellek (.npz, kategorik kodlar + numeric diziler) varsa ve kaynakla eşleşiyorsa oradan
+2. Yapılandırılmış veya pakete eklenmiş kaynak dosya (.arff / .csv) varsa ondan
+3. Hiçbiri yoksa hemen hata (ağ erişimi olmayan sunucularda zaman aşımı beklenmez);
+   OpenML'den indirme yalnızca CREDITGUARD_DATASET_OFFLINE=0 ile açıkça istenirse yapılır
+İkinci ve üçüncü adımda okunan veri önbelleğe yazılır; sonraki yüklemeler
+ARFF ayrıştırmadan ve ağa çıkmadan yapılır.
+
+Önbellek, üretildiği kaynağın kimliğini (mutlak yol, boyut, mtime) saklar.
+Kaynak yolu değişirse veya dosya düzenlenirse önbellek kullanılmaz, kaynaktan
+yeniden üretilir.
+
+Belleğe sığmayan büyük eğitim dosyaları (CSV / Parquet) iter_dataset_chunks
+ile parça parça okunur (chunked_training).
+"""
+
+import os
+import time
+import json
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from app_logging import get_logger, log_fields
+
+logger = get_logger("dataset")
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Kaynak dosya: ortam değişkeni ile yapılandırılabilir, yoksa pakete eklenmiş kopya aranır
+DATASET_SOURCE_PATH = os.getenv("CREDITGUARD_DATASET_PATH", os.path.join(_BACKEND_DIR, "data", "credit-g.arff"))
+
+# Sütun bazlı önbellek (numpy .npz; pyarrow gerektirmez)
+DATASET_CACHE_PATH = os.getenv("CREDITGUARD_DATASET_CACHE", os.path.join(_BACKEND_DIR, "data", "cache", "credit-g.npz"))
+
+# Çevrimdışı mod (varsayılan): yerel veri yoksa OpenML'e gitmek yerine hemen hata ver.
+# İndirme CREDITGUARD_DATASET_OFFLINE=0 ile açılır; indirilen veri önbelleğe yazılır.
+DATASET_OFFLINE = os.getenv("CREDITGUARD_DATASET_OFFLINE", "1") != "0"
+
+# Önbellek formatı değiştiğinde artırılır; eski önbellekler yeniden üretilir
+CACHE_FORMAT_VERSION = 2
+
+# Dosyadan okunmayan (OpenML'den indirilen) verinin önbellekteki kaynak kimliği
+ONLINE_SOURCE = {"origin": "OpenML"}
+
+
+def load_credit_dataset(source_path: Optional[str] = None, cache_path: Optional[str] = None,
+                        refresh: bool = False) -> pd.DataFrame:
+    """
+    credit-g veri setini DataFrame olarak yükler (kategorik sütunlar 'category' dtype).
+
+    Args:
+        source_path: Kaynak dosya (.arff / .csv); varsayılan DATASET_SOURCE_PATH
+        cache_path: Önbellek dosyası (.npz); varsayılan DATASET_CACHE_PATH
+        refresh: True ise önbellek yok sayılır ve kaynaktan yeniden üretilir
+    """
+    source_path = source_path or DATASET_SOURCE_PATH
+    cache_path = cache_path or DATASET_CACHE_PATH
+    started = time.perf_counter()
+
+    if not refresh and os.path.exists(cache_path):
+        try:
+            if cache_matches_source(read_cache_source(cache_path), source_path):
+                df = read_dataset_cache(cache_path)
+                logger.info("Veri seti önbellekten yüklendi", extra=log_fields(
+                    path=cache_path, rows=len(df), ms=round((time.perf_counter() - started) * 1000, 1)))
+                return df
+            logger.info("Önbellek başka bir kaynaktan üretilmiş, yeniden üretilecek", extra=log_fields(
+                path=cache_path, source=source_path))
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning("Önbellek okunamadı, kaynaktan yeniden üretilecek", extra=log_fields(error=str(e)))
+
+    source = source_identity(source_path)
+    if source is not None:
+        df = read_dataset_source(source_path)
+        origin = source_path
+    elif DATASET_OFFLINE:
+        raise FileNotFoundError(missing_dataset_message(source_path, cache_path))
+    else:
+        df = fetch_credit_dataset_online()
+        source, origin = ONLINE_SOURCE, "OpenML"
+
+    logger.info("Veri seti yüklendi", extra=log_fields(
+        origin=origin, rows=len(df), ms=round((time.perf_counter() - started) * 1000, 1)))
+
+    try:
+        write_dataset_cache(df, cache_path, source=source)
+        logger.info("Veri seti önbelleğe yazıldı", extra=log_fields(path=cache_path))
+    except OSError as e:
+        logger.warning("Veri seti önbelleğe yazılamadı", extra=log_fields(error=str(e)))
+
+    return df
+
+
+def missing_dataset_message(source_path: Optional[str] = None, cache_path: Optional[str] = None) -> str:
+    """Yerel veri seti yokken gösterilen, yapılandırma ipucu veren hata mesajı."""
+    return (f"Veri seti bulunamadı: {source_path or DATASET_SOURCE_PATH} (önbellek: "
+            f"{cache_path or DATASET_CACHE_PATH}). CREDITGUARD_DATASET_PATH ile yerel bir credit-g dosyası "
+            f"(.arff / .csv) belirtin, dosyayı https://www.openml.org/d/31 adresinden indirip bu yola koyun "
+            f"veya OpenML'den bir kez indirmek için CREDITGUARD_DATASET_OFFLINE=0 verin.")
+
+
+def dataset_available(source_path: Optional[str] = None, cache_path: Optional[str] = None) -> bool:
+    """
+    load_credit_dataset'in veri bulabileceğini (ağa çıkmadan) kontrol eder.
+
+    Kaynak dosya, kaynakla eşleşen bir önbellek varsa veya OpenML'den indirme
+    açıksa True.
+    """
+    source_path = source_path or DATASET_SOURCE_PATH
+    cache_path = cache_path or DATASET_CACHE_PATH
+    if source_identity(source_path) is not None or not DATASET_OFFLINE:
+        return True
+    try:
+        return cache_matches_source(read_cache_source(cache_path), source_path)
+    except (OSError, KeyError, ValueError):
+        return False
+
+
+def source_identity(path: str) -> Optional[Dict[str, Any]]:
+    """Kaynak dosyanın kimliği (mutlak yol, boyut, mtime); dosya yoksa None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cache_matches_source(cache_source: Optional[Dict[str, Any]], source_path: str) -> bool:
+    """
+    Önbelleğin bugünkü kaynak için kullanılıp kullanılamayacağı.
+
+    Kaynak dosya varsa kimliği önbellektekiyle aynı olmalıdır. Kaynak dosya
+    yoksa, aynı yoldan üretilmiş (dosyası sonradan kaldırılmış) veya bir dosyaya
+    bağlı olmayan (OpenML, elle yazılmış) önbellek kullanılır.
+    """
+    current = source_identity(source_path)
+    if current is not None:
+        return cache_source == current
+    cached_path = (cache_source or {}).get("path")
+    return cached_path is None or cached_path == os.path.abspath(source_path)
+
+
+def read_dataset_source(path: str) -> pd.DataFrame:
+    """ARFF veya CSV kaynak dosyasını okur; metin sütunları 'category' dtype'a çevrilir."""
+    if path.lower().endswith(".arff"):
+        from scipy.io import arff
+
+        data, meta = arff.loadarff(path)
+        columns = {}
+        for name in meta.names():
+            kind, values = meta[name]
+            if kind == "nominal":
+                decoded = [value.decode("utf-8") for value in data[name]]
+                columns[name] = pd.Categorical(decoded, categories=list(values))
+            else:
+                column = np.asarray(data[name], dtype=np.float64)
+                # Tam sayı olan numeric sütunlar OpenML (pandas parser) ile aynı şekilde int64 tutulur
+                if np.all(np.isfinite(column)) and np.all(column == np.round(column)):
+                    column = column.astype(np.int64)
+                columns[name] = column
+        return pd.DataFrame(columns)
+
+    df = pd.read_csv(path)
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def iter_dataset_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    CSV veya Parquet dosyasını en fazla chunk_size satırlık DataFrame parçaları olarak okur.
+
+    Bellekte aynı anda yalnızca bir parça tutulur. Parquet için pyarrow gerekir.
+    """
+    if path.lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet dosyaları için pyarrow kurulmalıdır (pip install pyarrow).") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(path, chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def fetch_credit_dataset_online() -> pd.DataFrame:
+    """credit-g veri setini OpenML'den indirir (yalnızca CREDITGUARD_DATASET_OFFLINE=0 iken)."""
+    from sklearn.datasets import fetch_openml
+
+    logger.info("Yerel veri seti bulunamadı, OpenML'den indiriliyor")
+    last_error = None
+    for kwargs in ({'data_id': 31}, {'name': 'credit-g'}, {'data_id': 42402}):
+        try:
+            data = fetch_openml(as_frame=True, parser='auto', **kwargs)
+            logger.info("Veri seti indirildi", extra=log_fields(source=kwargs))
+            return data.frame
+        except Exception as e:
+            last_error = e
+            logger.warning("İndirme başarısız", extra=log_fields(source=kwargs, error=str(e)))
+    raise Exception(f"Veri seti yüklenemedi. Tüm yöntemler başarısız oldu. Son hata: {str(last_error)}")
+
+
+def write_dataset_cache(df: pd.DataFrame, path: str, source: Optional[Dict[str, Any]] = None) -> None:
+    """
+    DataFrame'i sütun bazlı .npz önbelleğine yazar.
+
+    Kategorik sütunlar küçük tam sayı kodları + kategori listesi olarak,
+    numeric sütunlar kendi dtype'larıyla saklanır. source, verinin okunduğu
+    kaynağın kimliğidir (source_identity); None ise önbellek bir dosyaya bağlı
+    değildir. Dosya atomik olarak yazılır.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    arrays = {
+        "__format_version__": np.array(CACHE_FORMAT_VERSION),
+        "__source__": np.array(json.dumps(source)),
+        "__columns__": np.array([str(col) for col in df.columns]),
+    }
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[f"codes_{i}"] = series.cat.codes.to_numpy()
+            arrays[f"categories_{i}"] = np.array([str(cat) for cat in series.cat.categories])
+        else:
+            arrays[f"values_{i}"] = series.to_numpy()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_cache_source(path: str) -> Optional[Dict[str, Any]]:
+    """Önbelleğin üretildiği kaynağın kimliği (yalnızca üst veri okunur)."""
+    with np.load(path, allow_pickle=False) as cache:
+        if int(cache["__format_version__"]) != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Önbellek formatı uyumsuz: {path}")
+        return json.loads(str(cache["__source__"]))
+
+
+def read_dataset_cache(path: str) -> pd.DataFrame:
+    """write_dataset_cache ile yazılmış önbellekten DataFrame'i yeniden kurar."""
+    with np.load(path, allow_pickle=False) as cache:
+        if int(cache["__format_version__"]) != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Önbellek formatı uyumsuz: {path}")
+        columns = {}
+        for i, col in enumerate(cache["__columns__"]):
+            if f"codes_{i}" in cache:
+                columns[str(col)] = pd.Categorical.from_codes(cache[f"codes_{i}"], categories=cache[f"categories_{i}"].tolist())
+            else:
+                columns[str(col)] = cache[f"values_{i}"]
+    # Diziler bu çağrıya ait; copy=False ile numeric sütunlar tek blokta birleştirilirken
+    # oluşan geçici kopya (büyük veri setlerinde veri boyutunun ~2 katı tepe bellek) önlenir
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,374 @@
+"""
+CreditGuard AI - Girdi Dağılımı Kayması (Drift) İzleme
+Canlı başvuruların eğitim dağılımından ne kadar uzaklaştığını sabit bellekle izler.
+
+- Baseline (DriftBaseline): eğitim anında feature başına kova sınırları ve
+  eğitim satırlarının kovalara düşme oranları. Numeric feature'larda sınırlar
+  eğitim quantile'larıdır (az değerli feature'larda her değer ayrı kova),
+  kategorik feature'larda her encoder sınıfı bir kovadır. Model ile birlikte
+  snapshot'ta ve artifact'ta saklanır.
+- Canlı taraf yalnızca kova sayaçları tutar (feature x kova tamsayı tablosu):
+  bellek satır sayısından bağımsızdır.
+- İstek yolunda encode edilmiş satır sınırlı bir kuyruğa eklenir (~1 µs);
+  kovalama ve bilinmeyen kategori sayımı arka plandaki iş parçacığında
+  vektörel olarak yapılır. Kuyruk doluysa gözlem düşürülür ve sayılır
+  (tahmin yolu hiçbir zaman beklemez).
+- Rapor iki pencereyi birleştirir (mevcut + önceki, her biri
+  DRIFT_WINDOW_SECONDS); böylece sonuçlar son 1-2 pencereyi yansıtır.
+- PSI tüm feature'lar için, KS (kovalanmış birikimli dağılımlar arası en büyük
+  fark) numeric feature'lar için hesaplanır. Bilinmeyen kategoriler modelde
+  ilk sınıfa (kod 0) düşer; oranları ayrıca raporlanır.
+
+Çok worker'lı dağıtımda her worker kendi trafiğini izler.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app_logging import get_logger, log_fields
+
+logger = get_logger("drift")
+
+# Drift izleme açık/kapalı (kapalıyken istek yolunda yalnızca bir bayrak kontrolü kalır)
+DRIFT_ENABLED = os.getenv("CREDITGUARD_DRIFT_ENABLED", "1") == "1"
+
+# Numeric feature başına en fazla kova sayısı (eğitim quantile'ları)
+DRIFT_NUMERIC_BINS = int(os.getenv("CREDITGUARD_DRIFT_NUMERIC_BINS", "20"))
+
+# Baseline'ın hesaplandığı en fazla eğitim satırı (büyük veride rastgele örnek)
+DRIFT_BASELINE_ROWS = int(os.getenv("CREDITGUARD_DRIFT_BASELINE_ROWS", "200000"))
+
+# Pencere süresi; rapor mevcut ve önceki pencereyi birleştirir
+DRIFT_WINDOW_SECONDS = float(os.getenv("CREDITGUARD_DRIFT_WINDOW_SECONDS", "3600"))
+
+# Kovalanmayı bekleyen en fazla satır; dolunca yeni gözlemler düşürülür
+DRIFT_QUEUE_SIZE = int(os.getenv("CREDITGUARD_DRIFT_QUEUE_SIZE", "10000"))
+
+# Arka plan iş parçacığının kuyruğu boşaltma aralığı
+DRIFT_FLUSH_SECONDS = float(os.getenv("CREDITGUARD_DRIFT_FLUSH_SECONDS", "1"))
+
+# Bu kadar satır görülmeden feature durumu "insufficient_data" raporlanır
+DRIFT_MIN_ROWS = int(os.getenv("CREDITGUARD_DRIFT_MIN_ROWS", "100"))
+
+# PSI eşikleri: < WARN kararlı, WARN-ALERT orta, >= ALERT belirgin kayma
+PSI_WARN = float(os.getenv("CREDITGUARD_DRIFT_PSI_WARN", "0.1"))
+PSI_ALERT = float(os.getenv("CREDITGUARD_DRIFT_PSI_ALERT", "0.25"))
+
+# PSI'da boş kovalar için alt sınır (log(0) yerine)
+PSI_EPSILON = 1e-4
+
+# Feature başına raporlanan en fazla farklı bilinmeyen değer
+UNKNOWN_EXAMPLES = 10
+
+STATUS_ORDER = ("insufficient_data", "stable", "moderate", "significant")
+
+
+class DriftBaseline:
+    """
+    Eğitim dağılımının kovalanmış özeti.
+
+    edges (n_features, max_edges) matrisi +inf ile doldurulmuştur; bir değerin
+    kovası, değerden küçük veya eşit sınır sayısıdır. Böylece tüm feature'lar
+    tek vektörel karşılaştırma ile kovalanır. Kategorik feature'larda sınırlar
+    kod ± 0.5 olduğundan kova numarası encoder kodudur.
+    """
+
+    def __init__(self, feature_names: List[str], kinds: List[str], edges: np.ndarray,
+                 n_bins: np.ndarray, proportions: np.ndarray, training_rows: int):
+        self.feature_names = list(feature_names)
+        self.kinds = list(kinds)  # 'numeric' / 'categorical'
+        self.edges = edges
+        self.n_bins = n_bins
+        self.proportions = proportions  # (n_features, max_bins); kullanılmayan kovalar 0
+        self.training_rows = training_rows
+
+    @property
+    def max_bins(self) -> int:
+        return self.proportions.shape[1]
+
+    @classmethod
+    def from_training(cls, X_train: np.ndarray, feature_names: List[str], encoders: Dict[str, Any],
+                      bins: int = None, max_rows: int = None, seed: int = 42) -> "DriftBaseline":
+        """
+        Encode edilmiş eğitim matrisinden baseline oluşturur.
+
+        X_train memory-map olabilir; max_rows'tan büyükse yalnızca rastgele
+        seçilen satırlar okunur.
+        """
+        bins = bins or DRIFT_NUMERIC_BINS
+        max_rows = max_rows or DRIFT_BASELINE_ROWS
+        rows = len(X_train)
+        if rows > max_rows:
+            index = np.sort(np.random.default_rng(seed).choice(rows, size=max_rows, replace=False))
+            X_train = X_train[index]
+        X = np.asarray(X_train, dtype=np.float64)
+
+        kinds, edge_lists = [], []
+        for j, name in enumerate(feature_names):
+            if name in encoders:
+                kinds.append('categorical')
+                edge_lists.append(np.arange(1, len(encoders[name].classes_), dtype=np.float64) - 0.5)
+                continue
+            kinds.append('numeric')
+            column = X[:, j]
+            values = np.unique(column[~np.isnan(column)])
+            if len(values) <= bins:
+                # Az değerli feature (ör. installment_commitment): her değer ayrı kova
+                edge_lists.append((values[:-1] + values[1:]) / 2)
+            else:
+                edge_lists.append(np.unique(np.quantile(column, np.linspace(0, 1, bins + 1)[1:-1])))
+
+        n_bins = np.array([len(edges) + 1 for edges in edge_lists], dtype=np.int64)
+        edges = np.full((len(feature_names), max(int(n_bins.max()) - 1, 1)), np.inf)
+        for j, feature_edges in enumerate(edge_lists):
+            edges[j, :len(feature_edges)] = feature_edges
+
+        baseline = cls(feature_names, kinds, edges, n_bins,
+                       np.zeros((len(feature_names), int(n_bins.max()))), len(X))
+        counts = baseline.bin_counts(X)
+        baseline.proportions = counts / max(len(X), 1)
+        return baseline
+
+    def bin_indices(self, X: np.ndarray) -> np.ndarray:
+        """(n, n_features) kova numaraları."""
+        return (X[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+
+    def bin_counts(self, X: np.ndarray, chunk_rows: int = 4096) -> np.ndarray:
+        """(n_features, max_bins) kova sayaçları; ara bellek chunk_rows ile sınırlıdır."""
+        n_features, max_bins = len(self.feature_names), self.max_bins
+        offsets = np.arange(n_features) * max_bins
+        counts = np.zeros(n_features * max_bins, dtype=np.int64)
+        for start in range(0, len(X), chunk_rows):
+            flat = (self.bin_indices(X[start:start + chunk_rows]) + offsets).ravel()
+            counts += np.bincount(flat, minlength=counts.size)
+        return counts.reshape(n_features, max_bins)
+
+    def describe(self, j: int) -> Dict[str, Any]:
+        """Feature'ın kova sınırları ve eğitim oranları (ayrıntılı rapor için)."""
+        n_bins = int(self.n_bins[j])
+        return {
+            'edges': [float(edge) for edge in self.edges[j, :n_bins - 1]],
+            'baseline': [round(float(p), 6) for p in self.proportions[j, :n_bins]],
+        }
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI = sum((a - e) * ln(a / e)); boş kovalar PSI_EPSILON ile sınırlanır."""
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kovalanmış iki dağılımın birikimli oranları arasındaki en büyük fark."""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+def psi_status(psi: float) -> str:
+    if psi >= PSI_ALERT:
+        return "significant"
+    if psi >= PSI_WARN:
+        return "moderate"
+    return "stable"
+
+
+class _Window:
+    """Bir zaman penceresinin kova ve bilinmeyen kategori sayaçları."""
+
+    def __init__(self, baseline: DriftBaseline):
+        self.started = time.time()
+        self.rows = 0
+        self.counts = np.zeros((len(baseline.feature_names), baseline.max_bins), dtype=np.int64)
+        self.unknown = np.zeros(len(baseline.feature_names), dtype=np.int64)
+
+
+class DriftMonitor:
+    """
+    Tahmin edilen başvuruların feature dağılımını baseline ile karşılaştırır.
+
+    observe() istek yolundan çağrılır ve yalnızca kuyruğa ekler; sayaçlar
+    drain() ile (arka plan iş parçacığı veya rapor anında) güncellenir.
+    """
+
+    def __init__(self, queue_size: int = DRIFT_QUEUE_SIZE, window_seconds: float = DRIFT_WINDOW_SECONDS,
+                 enabled: bool = DRIFT_ENABLED):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.window_seconds = window_seconds
+        self.dropped = 0  # Kuyruk dolu olduğu için kovalanmadan düşürülen satır sayısı
+        self._pending = deque()
+        self._pending_rows = 0
+        self._pending_lock = threading.Lock()  # Yalnızca kuyruk sayacı için (kısa tutulur)
+        self._lock = threading.Lock()
+        self._baseline: Optional[DriftBaseline] = None
+        self._plan = None
+        self._model_version: Optional[str] = None
+        self._windows: List[_Window] = []
+        self._unknown_values: List[Dict[str, int]] = []
+        self._unknown_total: Dict[str, int] = {}  # Süreç ömrü boyunca (sayaç metrikleri için)
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def reset(self, baseline: Optional[DriftBaseline], feature_plan, model_version: str) -> None:
+        """
+        Yeni model yayına alındığında çağrılır.
+
+        Baseline değiştiyse (tam yeniden eğitim) pencereler sıfırlanır; artımlı
+        güncellemeler aynı baseline'ı taşıdığı için sayaçlar korunur.
+        """
+        with self._lock:
+            self._model_version = model_version
+            self._plan = feature_plan
+            if baseline is self._baseline:
+                return
+            self._baseline = baseline
+            self._windows = [_Window(baseline)] if baseline is not None else []
+            self._unknown_values = [{} for _ in baseline.feature_names] if baseline is not None else []
+
+    def observe(self, baseline: Optional[DriftBaseline], X: np.ndarray, records: List[Dict[str, Any]]) -> None:
+        """
+        Encode edilmiş satırları ve ham girişleri kovalanmak üzere kuyruğa ekler (bloklamaz).
+
+        X ve records çağıran tarafından sonradan değiştirilmemelidir.
+        """
+        if not self.enabled or baseline is None:
+            return
+        with self._pending_lock:
+            if self._pending_rows >= self.queue_size:
+                self.dropped += len(records)
+                return
+            self._pending_rows += len(records)
+            self._pending.append((baseline, X, records))
+
+    def drain(self) -> int:
+        """Kuyruktaki gözlemleri kovalar; işlenen satır sayısını döndürür."""
+        items = []
+        with self._pending_lock:
+            while self._pending:
+                items.append(self._pending.popleft())
+            self._pending_rows = 0
+        if not items:
+            with self._lock:
+                self._rotate()
+            return 0
+
+        with self._lock:
+            self._rotate()
+            baseline = self._baseline
+            # Önceki modelin baseline'ı ile gelen gözlemler yeni pencerelere karışmaz
+            items = [item for item in items if item[0] is baseline]
+            if not items:
+                return 0
+            X = items[0][1] if len(items) == 1 else np.concatenate([item[1] for item in items])
+            records = [record for item in items for record in item[2]]
+            window = self._windows[0]
+            window.counts += baseline.bin_counts(X)
+            window.rows += len(records)
+            names = baseline.feature_names
+            for slot, value in self._plan.unknown_categories(records):
+                window.unknown[slot] += 1
+                name = names[slot]
+                self._unknown_total[name] = self._unknown_total.get(name, 0) + 1
+                examples = self._unknown_values[slot]
+                if value in examples or len(examples) < UNKNOWN_EXAMPLES:
+                    examples[value] = examples.get(value, 0) + 1
+            return len(records)
+
+    def _rotate(self) -> None:
+        """Mevcut pencere süresini doldurduysa öncekinin yerine geçer (kilit altında çağrılır)."""
+        if not self._windows or time.time() - self._windows[0].started < self.window_seconds:
+            return
+        self._windows = [_Window(self._baseline), self._windows[0]]
+
+    def unknown_totals(self) -> Dict[str, int]:
+        """Feature başına süreç ömrü boyunca görülen bilinmeyen kategori sayısı."""
+        with self._lock:
+            return dict(self._unknown_total)
+
+    def report(self, detail: bool = False) -> Dict[str, Any]:
+        """
+        Feature başına PSI, KS ve bilinmeyen kategori oranları.
+
+        Args:
+            detail: True ise kova sınırları ile eğitim ve canlı oranlar da eklenir
+        """
+        self.drain()
+        with self._lock:
+            baseline = self._baseline
+            if baseline is None:
+                return {'enabled': self.enabled, 'model_version': self._model_version, 'baseline': False,
+                        'dropped_rows': self.dropped}
+            windows = list(self._windows)
+            counts = sum(window.counts for window in windows)
+            unknown = sum(window.unknown for window in windows)
+            rows = sum(window.rows for window in windows)
+            unknown_values = [dict(examples) for examples in self._unknown_values]
+            model_version = self._model_version
+
+        features = {}
+        for j, name in enumerate(baseline.feature_names):
+            n_bins = int(baseline.n_bins[j])
+            expected = baseline.proportions[j, :n_bins]
+            entry: Dict[str, Any] = {'type': baseline.kinds[j]}
+            if rows:
+                actual = counts[j, :n_bins] / rows
+                psi = population_stability_index(expected, actual)
+                entry['psi'] = round(psi, 6)
+                if baseline.kinds[j] == 'numeric':
+                    entry['ks'] = round(ks_statistic(expected, actual), 6)
+                entry['status'] = psi_status(psi) if rows >= DRIFT_MIN_ROWS else "insufficient_data"
+            else:
+                entry['status'] = "insufficient_data"
+            if baseline.kinds[j] == 'categorical':
+                entry['unknown_rows'] = int(unknown[j])
+                entry['unknown_rate'] = round(float(unknown[j]) / rows, 6) if rows else 0.0
+                if unknown_values[j]:
+                    entry['unknown_values'] = unknown_values[j]
+            if detail:
+                entry.update(baseline.describe(j))
+                if rows:
+                    entry['live'] = [round(float(p), 6) for p in counts[j, :n_bins] / rows]
+            features[name] = entry
+
+        statuses = [entry['status'] for entry in features.values()]
+        return {
+            'enabled': self.enabled,
+            'model_version': model_version,
+            'baseline': True,
+            'status': max(statuses, key=STATUS_ORDER.index) if rows >= DRIFT_MIN_ROWS else "insufficient_data",
+            'observed_rows': int(rows),
+            'dropped_rows': self.dropped,
+            'pending_rows': self._pending_rows,
+            'baseline_rows': baseline.training_rows,
+            'window_seconds': self.window_seconds,
+            'window_started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(windows[-1].started)),
+            'thresholds': {'psi_warn': PSI_WARN, 'psi_alert': PSI_ALERT, 'min_rows': DRIFT_MIN_ROWS},
+            'drifted_features': sorted(
+                (name for name, entry in features.items() if entry['status'] in ("moderate", "significant")),
+                key=lambda name: -features[name]['psi']),
+            'features': features,
+        }
+
+    def start(self) -> None:
+        """Kuyruğu DRIFT_FLUSH_SECONDS aralıklarla boşaltan arka plan iş parçacığını başlatır."""
+        if not self.enabled or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(DRIFT_FLUSH_SECONDS):
+                try:
+                    self.drain()
+                except Exception as e:
+                    logger.warning("Drift gözlemleri işlenemedi", extra=log_fields(error=str(e)))
+
+        self._worker = threading.Thread(target=run, name="drift-monitor", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
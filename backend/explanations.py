@@ -0,0 +1,204 @@
+"""
+CreditGuard AI - Açıklama Motoru
+Risk skoru açıklamalarını model başına bir kez derlenen kurallarla üretir.
+
+Hangi feature'ların açıklamaya gireceği (toplam importance'ın %60'ını kapsayan
+en önemli 5 feature) isteğe değil modele bağlıdır. Bu liste, Türkçe isimler ve
+kural eşikleri model eğitildiğinde/yüklendiğinde hesaplanır; her tahminde
+feature_importances_ (200 ağaç üzerinden yeniden hesaplanır) okunmaz ve
+sıralama yapılmaz. Toplu tahminde açıklamalar sütun bazlı tek geçişte üretilir.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Feature Türkçe isimleri
+FEATURE_TURKISH_NAMES = {
+    'payment_per_month': 'Aylık Ödeme Yükü',
+    'credit_age_ratio': 'Yaş/Kredi Oranı',
+    'checking_status': 'Hesap Durumu',
+    'savings_status': 'Tasarruf Durumu',
+    'credit_history': 'Kredi Geçmişi',
+    'credit_amount': 'Kredi Tutarı',
+    'duration': 'Kredi Süresi',
+    'age': 'Yaş',
+    'employment': 'İstihdam Durumu',
+    'purpose': 'Kredi Amacı',
+    'housing': 'Konut Durumu',
+    'installment_commitment': 'Taksit Taahhüdü',
+    'personal_status': 'Kişisel Durum',
+    'other_parties': 'Diğer Taraflar',
+    'residence_since': 'İkamet Süresi',
+    'property_magnitude': 'Mülkiyet Büyüklüğü',
+    'other_payment_plans': 'Diğer Ödeme Planları',
+    'existing_credits': 'Mevcut Krediler',
+    'job': 'Meslek',
+    'num_dependents': 'Bağımlı Sayısı',
+    'own_telephone': 'Telefon Sahipliği',
+    'foreign_worker': 'Yabancı İşçi',
+}
+
+# Numeric feature kuralları: (koşul, açıklama şablonu), ilk eşleşen kural kullanılır.
+# Koşullar hem skaler hem NumPy dizisi üzerinde çalışır; yalnızca int/float değerlere uygulanır.
+NUMERIC_RULES: Dict[str, List[tuple]] = {
+    'payment_per_month': [
+        (lambda v: v > 500, "{} fazla"),  # Yüksek aylık ödeme
+        (lambda v: v > 300, "{} orta seviyede"),
+    ],
+    'credit_amount': [
+        (lambda v: v > 10000, "{} yüksek"),  # Yüksek kredi tutarı
+    ],
+    'credit_age_ratio': [
+        (lambda v: v > 200, "{} dengesiz"),  # Yaşa göre yüksek kredi
+    ],
+    'age': [
+        (lambda v: (v < 25) | (v > 65), "{} riskli aralıkta"),  # Genç veya yaşlı
+    ],
+    'existing_credits': [
+        (lambda v: v >= 3, "{} fazla"),  # Çok fazla mevcut kredi
+    ],
+}
+
+# Kategorik feature kuralları: (riskli değerler, açıklama şablonu), değerin str() hali ile karşılaştırılır
+CATEGORICAL_RULES: Dict[str, List[tuple]] = {
+    'checking_status': [
+        (('<0', 'no checking'), "{} zayıf"),  # Negatif bakiye veya hesap yok
+        (('0<=X<200',), "{} düşük"),
+    ],
+    'savings_status': [
+        (('<100', 'no known savings'), "{} yetersiz"),  # Düşük tasarruf
+    ],
+    'credit_history': [
+        (('delayed previously', 'critical/other existing credit'), "{} sorunlu"),  # Kötü geçmiş
+    ],
+    'employment': [
+        (('unemployed', '<1'), "{} belirsiz"),  # İşsiz veya kısa süreli
+    ],
+    'housing': [
+        (('rent',), "{} kirada"),  # Kirada oturuyor
+    ],
+}
+
+# Açıklamaya giren feature'lar: toplam importance'ın %60'ına ulaşana kadar, en fazla 5
+TARGET_IMPORTANCE = 0.6
+MAX_TOP_FEATURES = 5
+MAX_EXPLANATIONS = 3
+DEFAULT_EXPLANATION = "Genel risk faktörleri"
+
+
+class ExplainedFeature:
+    """Açıklamaya giren tek bir feature için önceden derlenmiş kurallar."""
+
+    def __init__(self, name: str, importance: float):
+        self.name = name
+        self.importance = importance
+        self.turkish_name = FEATURE_TURKISH_NAMES.get(name, name)
+        self.numeric_rules = [
+            (condition, template.format(self.turkish_name))
+            for condition, template in NUMERIC_RULES.get(name, [])
+        ]
+        self.categorical_rules = [
+            (frozenset(risk_values), template.format(self.turkish_name))
+            for risk_values, template in CATEGORICAL_RULES.get(name, [])
+        ]
+        # Özel bir risk nedeni bulunamazsa importance'a göre genel açıklama
+        if importance > 0.1:  # Çok önemli feature
+            self.fallback = f"{self.turkish_name} önemli faktör"
+        else:
+            self.fallback = f"{self.turkish_name} etkili"
+
+    def reason(self, value: Any) -> str:
+        """Tek bir değer için risk nedeni."""
+        if self.numeric_rules:
+            if isinstance(value, (int, float)):
+                for condition, text in self.numeric_rules:
+                    if condition(value):
+                        return text
+        elif self.categorical_rules:
+            text_value = str(value)
+            for risk_values, text in self.categorical_rules:
+                if text_value in risk_values:
+                    return text
+        return self.fallback
+
+    def reasons(self, values: Sequence[Any]) -> np.ndarray:
+        """Bir sütun değer için risk nedenleri (object dizisi), reason() ile aynı sonuç."""
+        result = np.full(len(values), self.fallback, dtype=object)
+        if self.numeric_rules:
+            applicable = np.array([isinstance(value, (int, float)) for value in values], dtype=bool)
+            if not applicable.any():
+                return result
+            column = np.array([value if ok else np.nan for value, ok in zip(values, applicable)], dtype=np.float64)
+            # İlk eşleşen kural kazanır: kurallar sondan başa uygulanır
+            for condition, text in reversed(self.numeric_rules):
+                result[applicable & condition(column)] = text
+        elif self.categorical_rules:
+            column = np.array([str(value) for value in values], dtype=object)
+            for risk_values, text in reversed(self.categorical_rules):
+                result[np.isin(column, list(risk_values))] = text
+        return result
+
+
+class ExplanationEngine:
+    """
+    Model başına bir kez oluşturulan açıklama motoru.
+
+    top_features, feature_importances_ sırasına göre seçilmiş ve kuralları
+    derlenmiş feature'ları tutar. explain() tek başvuru, explain_batch()
+    bir başvuru listesi için generate_risk_explanation ile aynı metni üretir.
+    """
+
+    def __init__(self, feature_names: List[str], feature_importances: Sequence[float]):
+        # Feature isimleri ile importance'ları eşleştir ve sırala
+        sorted_features = sorted(dict(zip(feature_names, feature_importances)).items(),
+                                 key=lambda x: x[1], reverse=True)
+
+        self.top_features: List[ExplainedFeature] = []
+        cumulative_importance = 0.0
+        for feature_name, importance in sorted_features:
+            if cumulative_importance < TARGET_IMPORTANCE and len(self.top_features) < MAX_TOP_FEATURES:
+                self.top_features.append(ExplainedFeature(feature_name, importance))
+                cumulative_importance += importance
+            else:
+                break
+
+    @staticmethod
+    def _lookup(name: str, feature_values: Dict[str, Any], original_input_data: Dict[str, Any]) -> Any:
+        # Önce model'e gönderilen (create_domain_features uygulanmış) değerler
+        if name in feature_values:
+            return feature_values[name]
+        return original_input_data.get(name)
+
+    def explain(self, feature_values: Dict[str, Any], original_input_data: Optional[Dict[str, Any]] = None) -> str:
+        """Tek başvuru için Türkçe risk açıklaması."""
+        original_input_data = original_input_data or {}
+        explanations = []
+        for feature in self.top_features:
+            value = self._lookup(feature.name, feature_values, original_input_data)
+            if value is None:
+                continue
+            explanations.append(feature.reason(value))
+            if len(explanations) == MAX_EXPLANATIONS:
+                break
+        return ", ".join(explanations) if explanations else DEFAULT_EXPLANATION
+
+    def explain_batch(self, batch_values: List[Dict[str, Any]],
+                      records: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """Başvuru listesi için açıklamalar; kurallar her feature sütununa tek seferde uygulanır."""
+        n_rows = len(batch_values)
+        records = records if records is not None else [{}] * n_rows
+
+        columns = []
+        for feature in self.top_features:
+            values = [self._lookup(feature.name, values, record) for values, record in zip(batch_values, records)]
+            present = [value is not None for value in values]
+            reasons = feature.reasons([value if ok else 0 for value, ok in zip(values, present)])
+            columns.append((present, reasons))
+
+        explanations = []
+        for i in range(n_rows):
+            row = [reasons[i] for present, reasons in columns if present[i]][:MAX_EXPLANATIONS]
+            explanations.append(", ".join(row) if row else DEFAULT_EXPLANATION)
+        return explanations
+
@@ -0,0 +1,138 @@
+"""
+CreditGuard AI - Düzleştirilmiş Orman Motoru
+Eğitilmiş RandomForestClassifier ağaçlarını bitişik NumPy dizilerine aktarır ve
+tüm ağaçları aynı anda, vektörel olarak dolaşarak olasılık üretir.
+
+Tek satırlık tahminde scikit-learn'ün predict_proba çağrısı zamanın çoğunu
+girdi doğrulamasında ve joblib/thread dağıtımında (n_jobs=-1) harcar; burada
+yalnızca birkaç dizi indeksleme işlemi yapılır. Sonuçlar predict_proba ile
+kayan nokta toleransı içinde aynıdır (ağaç olasılıkları aynı sırayla toplanır).
+
+Aynı diziler üzerinden başvuru bazlı yerel katkılar (Saabas yöntemi) da
+hesaplanır: her düğüm için "çocuğun riskli olasılığı - ebeveynin riskli
+olasılığı" farkı eğitimde bir kez çıkarılır; bir satırın yolu boyunca bu
+farklar, ebeveynde bölünen feature'a yazılır. Katkıların toplamı ile taban
+değerin (kök düğümlerin ortalama olasılığı) toplamı, tahmin edilen olasılığa eşittir.
+"""
+
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Bu satır sayısının üzerindeki batch'ler scikit-learn'ün çok thread'li yoluna bırakılır
+FLAT_FOREST_MAX_ROWS = 256
+
+# Katkı hesabında bellek kullanımını sınırlamak için tek seferde işlenen satır sayısı
+CONTRIBUTION_CHUNK_ROWS = 1024
+
+# Katkıların hesaplandığı sınıf (1 = riskli)
+POSITIVE_CLASS_INDEX = 1
+
+
+class FlatForest:
+    """
+    Ormanın tüm düğümlerini tek bir dizi kümesinde tutan çıkarım motoru.
+
+    Her ağacın düğümleri ardışık olarak birleştirilir; çocuk indeksleri global
+    indekse çevrilir ve yaprak düğümler kendilerini gösterir. Böylece her
+    ağaç/satır çifti max_depth adım boyunca aynı işlemle ilerletilebilir.
+    """
+
+    def __init__(self, model: RandomForestClassifier, max_rows: Optional[int] = FLAT_FOREST_MAX_ROWS):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left < 0
+            own_index = np.arange(tree.node_count, dtype=np.int64) + offset
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            threshold.append(tree.threshold.astype(np.float64))
+            left.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            right.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            # DecisionTreeClassifier.predict_proba ile aynı normalizasyon
+            leaf_value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = leaf_value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value.append(leaf_value / normalizer)
+
+        self.model = model
+        self.max_rows = max_rows
+        self.n_trees = len(trees)
+        self.n_features = int(model.n_features_in_)
+        self.classes_ = model.classes_
+        self.max_depth = int(max(tree.max_depth for tree in trees))
+        self.roots = offsets
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.value = np.concatenate(value)
+
+        # Yerel katkılar için yol istatistikleri: düğüme girildiğinde riskli olasılığındaki değişim
+        positive = self.value[:, POSITIVE_CLASS_INDEX]
+        self.node_delta = np.zeros(len(positive), dtype=np.float64)
+        for child in (self.left, self.right):
+            internal = child != np.arange(len(child))
+            self.node_delta[child[internal]] = positive[child[internal]] - positive[internal]
+        self.bias = float(positive[self.roots].mean())
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Her satırın her ağaçta düştüğü yaprağın global indeksini döndürür: (n_trees, n_rows)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        # Ağaç-major düzen: nodes[t * n_rows + i] = t. ağaçta i. satırın düğümü
+        nodes = np.repeat(self.roots, n_rows)
+        row_base = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+        for _ in range(self.max_depth):
+            # float32 girdi float64 threshold ile karşılaştırılır (scikit-learn ile aynı)
+            go_left = flat_X[row_base + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """RandomForestClassifier.predict_proba ile aynı formatta (n_rows, n_classes) olasılıklar."""
+        if self.max_rows is not None and len(X) > self.max_rows:
+            return self.model.predict_proba(X)
+        # Ağaç ekseni boyunca toplama ardışık yapılır (predict_proba'daki birikimle aynı sıra)
+        proba = self.value[self.apply(X)].sum(axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Her satır için feature başına işaretli katkılar: (n_rows, n_features).
+
+        Pozitif katkı riskli olasılığını artırır. bias + satır toplamı,
+        predict_proba(X)[:, 1] ile kayan nokta toleransı içinde aynıdır.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        result = np.empty((X.shape[0], self.n_features), dtype=np.float64)
+        for start in range(0, X.shape[0], CONTRIBUTION_CHUNK_ROWS):
+            chunk = X[start:start + CONTRIBUTION_CHUNK_ROWS]
+            result[start:start + len(chunk)] = self._contributions_chunk(chunk)
+        return result
+
+    def _contributions_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        size = n_rows * self.n_features
+        flat_X = X.ravel()
+        nodes = np.repeat(self.roots, n_rows)
+        row_base = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+        totals = np.zeros(size, dtype=np.float64)
+        for _ in range(self.max_depth):
+            split_feature = self.feature[nodes]
+            slots = row_base + split_feature
+            go_left = flat_X[slots] <= self.threshold[nodes]
+            next_nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            moved = next_nodes != nodes
+            if not moved.any():
+                break
+            # Olasılık değişimi, ebeveynde bölünen feature'a yazılır
+            totals += np.bincount(slots[moved], weights=self.node_delta[next_nodes[moved]], minlength=size)
+            nodes = next_nodes
+        totals /= self.n_trees
+        return totals.reshape(n_rows, self.n_features)
@@ -0,0 +1,385 @@
+"""
+CreditGuard AI - Artımlı Yeniden Eğitim
+Yeni etiketlenen başvurularla ormanın yalnızca bir kısmını yenileyen ucuz yeniden eğitim.
+
+- Eğitim durumu (TrainingState): encode edilmiş eğitim ve holdout satırları ile
+  holdout üzerinde ağaç olasılıklarının toplamı. Model ile birlikte snapshot'ta
+  ve artifact'ta saklanır.
+- Eğitim satırları artifact'ta değil, yalnızca sonuna eklenen bir dosya çiftinde
+  (TrainingRows) tutulur; durum dosyanın yolunu ve kendi satır sayısını saklar.
+  Her tur yalnızca yeni satırları yazar, geçmiş kopyalanmaz ve yeniden pickle edilmez.
+- Yeni satırların INCREMENTAL_HOLDOUT_FRACTION kadarı holdout'a, kalanı eğitim
+  setine eklenir. Holdout kayan bir penceredir: en fazla INCREMENTAL_MAX_HOLDOUT_ROWS
+  satır tutulur, taşan en eski satırlar (ve olasılık toplamları) düşülür.
+- Rolling tree replacement: en eski ağaçların INCREMENTAL_TREE_FRACTION kadarı,
+  yeni satırlar ve geçmişten örneklenen satırlardan oluşan bir pencere üzerinde
+  eğitilen ağaçlarla değiştirilir. Pencere yeni satır sayısı ile orantılıdır
+  (en az INCREMENTAL_MIN_WINDOW_ROWS).
+- Holdout olasılıkları baştan hesaplanmaz: çıkarılan ağaçların katkısı düşülür,
+  yeni ağaçlarınki eklenir; yalnızca yeni holdout satırları tüm ormanla skorlanır.
+
+Bir turun maliyeti böylece yeni satır sayısı ve holdout üst sınırıyla orantılıdır;
+birikmiş geçmişle büyümez.
+"""
+
+import contextlib
+import copy
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app_logging import get_logger, log_fields
+from shared_state import file_lock
+
+logger = get_logger("incremental")
+
+# Her artımlı turda yenilenen ağaç oranı (0-1]
+INCREMENTAL_TREE_FRACTION = float(os.getenv("CREDITGUARD_INCREMENTAL_TREE_FRACTION", "0.1"))
+
+# Yeni etiketli satırlardan holdout'a ayrılan oran (ilk eğitimdeki %20 test ile aynı)
+INCREMENTAL_HOLDOUT_FRACTION = 0.2
+
+# Pencere: yeni eğitim satırı başına geçmişten örneklenen satır sayısı ve en küçük pencere
+INCREMENTAL_HISTORY_RATIO = float(os.getenv("CREDITGUARD_INCREMENTAL_HISTORY_RATIO", "4"))
+INCREMENTAL_MIN_WINDOW_ROWS = int(os.getenv("CREDITGUARD_INCREMENTAL_MIN_WINDOW_ROWS", "256"))
+
+# Holdout penceresinin üst sınırı: skorlama ve threshold seçimi bu kadar satırla sınırlı kalır
+INCREMENTAL_MAX_HOLDOUT_ROWS = int(os.getenv("CREDITGUARD_INCREMENTAL_MAX_HOLDOUT_ROWS", "20000"))
+
+# Yayındaki ve gölge modelinkiler dışında saklanan en yeni eğitim satırı kümesi sayısı
+# (henüz yeni sürümü yüklememiş worker'lar için); daha eskileri yeniden eğitimden sonra silinir
+INCREMENTAL_ROWS_KEEP = int(os.getenv("CREDITGUARD_INCREMENTAL_ROWS_KEEP", "4"))
+
+# Olasılık toplamının tutulduğu sınıf (1 = riskli)
+POSITIVE_CLASS_INDEX = 1
+
+
+class TrainingRows:
+    """
+    Yalnızca sonuna eklenen eğitim satırları: <directory>/<name>.X (float32,
+    satır başına n_features değer) ve <directory>/<name>.y (int8 etiket).
+
+    Bir TrainingState dosyanın ilk n_train satırını görür; bu önek hiç
+    değiştirilmez. Dosyanın sonuna yalnızca satır sayısı dosyayla aynı olan
+    (en son eklemeyi yapan) durum yazar. Aynı durumdan ikinci bir dal açılırsa
+    (örneğin aynı modelden önce gölge, sonra yayındaki model güncellenirse)
+    önek yeni bir dosyaya kopyalanır.
+    """
+
+    def __init__(self, directory: str, name: str, n_features: int):
+        self.directory = directory
+        self.name = name
+        self.n_features = n_features
+
+    @property
+    def x_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.X")
+
+    @property
+    def y_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.y")
+
+    @classmethod
+    def create(cls, directory: str, X: np.ndarray, y: np.ndarray) -> "TrainingRows":
+        """Yeni bir dosya çifti açar ve satırları yazar."""
+        os.makedirs(directory, exist_ok=True)
+        rows = cls(directory, uuid.uuid4().hex, int(X.shape[1]))
+        rows._write_at(0, X, y)
+        return rows
+
+    def size(self) -> int:
+        """Dosyadaki tam satır sayısı (yarım kalmış bir yazımın artığı sayılmaz)."""
+        try:
+            x_rows = os.path.getsize(self.x_path) // (4 * self.n_features)
+            y_rows = os.path.getsize(self.y_path)
+        except FileNotFoundError:
+            return 0
+        return min(x_rows, y_rows)
+
+    def read(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """İlk n satır (salt okunur memory-map)."""
+        if n == 0:
+            return np.empty((0, self.n_features), dtype=np.float32), np.empty(0, dtype=np.int8)
+        if self.size() < n:
+            raise ValueError(f"Eğitim satırları dosyası eksik veya silinmiş ({self.x_path}); "
+                             "tam yeniden eğitim gerekli.")
+        X = np.memmap(self.x_path, dtype=np.float32, mode="r", shape=(n, self.n_features))
+        y = np.memmap(self.y_path, dtype=np.int8, mode="r", shape=(n,))
+        return X, y
+
+    def append(self, n: int, X: np.ndarray, y: np.ndarray) -> "TrainingRows":
+        """
+        İlk n satırın arkasına X, y'yi ekler.
+
+        Dosyada n'den fazla satır varsa (başka bir dal ekleme yapmış) önek yeni
+        bir dosyaya kopyalanır ve ekleme oraya yapılır.
+
+        Returns:
+            Satırların yazıldığı dosya (kendisi veya yeni dal)
+        """
+        with file_lock(self.y_path):
+            size = self.size()
+            if len(y) == 0 and size >= n:
+                return self
+            if size == n:
+                self._write_at(n, X, y)
+                os.utime(self.y_path)  # prune_training_rows için son kullanım zamanı
+                return self
+        branch = self.branch(n)
+        branch._write_at(n, X, y)
+        return branch
+
+    def branch(self, n: int, directory: str = None) -> "TrainingRows":
+        """İlk n satırı yeni bir dosya çiftine kopyalar."""
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        rows = TrainingRows(directory, uuid.uuid4().hex, self.n_features)
+        for source, target, row_bytes in ((self.x_path, rows.x_path, 4 * self.n_features),
+                                          (self.y_path, rows.y_path, 1)):
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+                dst.truncate(n * row_bytes)
+        logger.info("Eğitim satırları yeni dosyaya kopyalandı", extra=log_fields(
+            source=self.name, target=rows.name, rows=n))
+        return rows
+
+    def _write_at(self, n: int, X: np.ndarray, y: np.ndarray) -> None:
+        """Satırları n. satırdan itibaren yazar; önceki yarım yazımın artığını keser."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.int8)
+        # Önce X, sonra y: size() y'ye göre sayar, yarım kalan bir X yazımı görünmez
+        for path, data, row_bytes in ((self.x_path, X, 4 * self.n_features), (self.y_path, y, 1)):
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(n * row_bytes)
+                f.write(data.tobytes())
+                f.truncate()
+
+
+def prune_training_rows(directory: str, keep: int = None, protected: Iterable[str] = ()) -> None:
+    """
+    Dizindeki eğitim satırı kümelerinden korunanlar ve en son kullanılan keep
+    tanesi dışındakileri siler.
+
+    Args:
+        protected: Silinmeyecek küme adları (yayındaki ve gölge modelin satırları)
+    """
+    keep = INCREMENTAL_ROWS_KEEP if keep is None else keep
+    protected = set(protected)
+    try:
+        entries = [entry for entry in os.listdir(directory)
+                   if entry.endswith(".y") and entry[:-2] not in protected]
+    except FileNotFoundError:
+        return
+    paths = [os.path.join(directory, entry) for entry in entries]
+    mtimes = {}
+    for path in paths:
+        with contextlib.suppress(OSError):
+            mtimes[path] = os.stat(path).st_mtime_ns
+    for path in sorted(mtimes, key=mtimes.get, reverse=True)[keep:]:
+        for suffix in (".y", ".X", ".y.lock"):
+            with contextlib.suppress(OSError):
+                os.remove(path[:-2] + suffix)
+        logger.info("Eski eğitim satırları silindi", extra=log_fields(path=path[:-2]))
+
+
+class TrainingState:
+    """
+    Artımlı yeniden eğitim için saklanan eğitim durumu.
+
+    Eğitim satırları TrainingRows dosyasının ilk n_train satırıdır (X_train ve
+    y_train memory-map olarak okunur). holdout_proba_sum, holdout satırlarında
+    ormandaki her ağacın riskli olasılıklarının toplamıdır; n_trees'e bölünce
+    predict_proba(X_holdout)[:, 1] verir. Diziler değiştirilmez; her tur yeni
+    bir TrainingState üretir (snapshot ile aynı).
+    """
+
+    def __init__(self, rows: Optional[TrainingRows], n_train: int, X_holdout: np.ndarray,
+                 y_holdout: np.ndarray, holdout_proba_sum: np.ndarray, rounds: int = 0,
+                 appended_rows: int = 0):
+        self.rows = rows
+        self.n_train = n_train
+        self.X_holdout = X_holdout
+        self.y_holdout = y_holdout
+        self.holdout_proba_sum = holdout_proba_sum
+        self.rounds = rounds  # Tamamlanan artımlı tur sayısı
+        self.appended_rows = appended_rows  # Tam eğitimden sonra eklenen etiketli satır sayısı
+        self._legacy_train = None  # Satırları artifact içinde saklayan eski durumlar (X, y)
+
+    @classmethod
+    def from_training(cls, X_train, y_train, X_holdout, y_holdout, holdout_proba: np.ndarray,
+                      n_trees: int, rows_dir: str) -> "TrainingState":
+        """
+        Tam eğitimin eğitim/test ayrımından ve test olasılıklarından durum oluşturur.
+
+        Eğitim satırları rows_dir altında yeni bir TrainingRows dosyasına yazılır.
+        """
+        X_holdout, y_holdout, holdout_proba_sum = _cap_holdout(
+            np.ascontiguousarray(np.asarray(X_holdout, dtype=np.float32)),
+            np.asarray(y_holdout, dtype=np.int8),
+            np.asarray(holdout_proba, dtype=np.float64) * n_trees)
+        return cls(
+            rows=TrainingRows.create(rows_dir, np.asarray(X_train), np.asarray(y_train)),
+            n_train=int(len(y_train)),
+            X_holdout=X_holdout,
+            y_holdout=y_holdout,
+            holdout_proba_sum=holdout_proba_sum,
+        )
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if 'X_train' in state:
+            # Eski artifact: satırlar durumla birlikte pickle edilmiş. İlk artımlı
+            # turda bir TrainingRows dosyasına taşınır.
+            X_train, y_train = state.pop('X_train'), state.pop('y_train')
+            state.update(rows=None, n_train=len(y_train), _legacy_train=(X_train, y_train))
+        self.__dict__.update(state)
+
+    @property
+    def X_train(self) -> np.ndarray:
+        return self._train()[0]
+
+    @property
+    def y_train(self) -> np.ndarray:
+        return self._train()[1]
+
+    def _train(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._legacy_train is not None:
+            return self._legacy_train
+        return self.rows.read(self.n_train)
+
+    def append_train(self, X_add: np.ndarray, y_add: np.ndarray, rows_dir: str = None) -> TrainingRows:
+        """
+        Yeni eğitim satırlarını ekler; satırların bulunduğu dosyayı döndürür.
+
+        Eski (satırları pickle içinde) durumlarda geçmiş bir kez rows_dir altında
+        yeni bir dosyaya yazılır.
+        """
+        if self._legacy_train is not None:
+            if rows_dir is None:
+                raise ValueError("Eski eğitim durumu için eğitim satırı dizini gerekli.")
+            X_train, y_train = self._legacy_train
+            rows = TrainingRows.create(rows_dir, np.asarray(X_train), np.asarray(y_train))
+            return rows.append(self.n_train, X_add, y_add)
+        return self.rows.append(self.n_train, X_add, y_add)
+
+    @property
+    def n_holdout(self) -> int:
+        return len(self.y_holdout)
+
+
+def _cap_holdout(X: np.ndarray, y: np.ndarray, proba_sum: np.ndarray,
+                 max_rows: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Holdout'un en yeni max_rows satırını tutar (satırlar eklenme sırasındadır)."""
+    max_rows = INCREMENTAL_MAX_HOLDOUT_ROWS if max_rows is None else max_rows
+    if len(y) <= max_rows:
+        return X, y, proba_sum
+    return X[-max_rows:], y[-max_rows:], proba_sum[-max_rows:]
+
+
+def _tree_proba_sum(trees, X: np.ndarray) -> np.ndarray:
+    """Verilen ağaçların riskli olasılıklarının satır bazlı toplamı."""
+    total = np.zeros(len(X), dtype=np.float64)
+    for tree in trees:
+        total += tree.predict_proba(X, check_input=False)[:, POSITIVE_CLASS_INDEX]
+    return total
+
+
+def _holdout_mask(y_new: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Yeni satırların sınıf bazında INCREMENTAL_HOLDOUT_FRACTION kadarını holdout'a ayırır."""
+    mask = np.zeros(len(y_new), dtype=bool)
+    for label in np.unique(y_new):
+        rows = np.flatnonzero(y_new == label)
+        n_holdout = int(round(len(rows) * INCREMENTAL_HOLDOUT_FRACTION))
+        mask[rng.choice(rows, size=n_holdout, replace=False)] = True
+    return mask
+
+
+def rolling_update(model: RandomForestClassifier, state: TrainingState, X_new: np.ndarray,
+                   y_new: np.ndarray, new_trees: RandomForestClassifier, seed: int = 42,
+                   rows_dir: str = None) -> Tuple[RandomForestClassifier, TrainingState, Dict[str, Any]]:
+    """
+    Yeni etiketli satırlarla ormanın en eski ağaçlarını yeniler.
+
+    Args:
+        model: Yayındaki (değiştirilmez) model
+        state: Modelin eğitim durumu
+        X_new, y_new: Encode edilmiş yeni satırlar ve etiketleri (1 = riskli)
+        new_trees: Yenilenecek ağaç sayısı kadar n_estimators ile kurulmuş, eğitilmemiş model
+        seed: Holdout ayrımı ve geçmiş örneklemesi için seed
+        rows_dir: Eski (satırları artifact içinde) durumlar için eğitim satırı dizini
+
+    Returns:
+        (model, state, info): yeni model ve eğitim durumu, tur bilgileri
+
+    Raises:
+        ValueError: Pencerede iki sınıf da yoksa
+    """
+    rng = np.random.default_rng(seed)
+    X_new = np.ascontiguousarray(X_new, dtype=np.float32)
+    y_new = np.asarray(y_new, dtype=np.int8)
+
+    to_holdout = _holdout_mask(y_new, rng)
+    X_add, y_add = X_new[~to_holdout], y_new[~to_holdout]
+    X_holdout_new, y_holdout_new = X_new[to_holdout], y_new[to_holdout]
+
+    # Pencere: yeni eğitim satırları + geçmişten yeni satır sayısıyla orantılı örnek.
+    # Geçmiş memory-map'ten yalnızca örneklenen satırlar okunur (dosya sırasıyla).
+    n_history = min(state.n_train, max(INCREMENTAL_MIN_WINDOW_ROWS - len(y_add),
+                                       int(INCREMENTAL_HISTORY_RATIO * len(y_add))))
+    history = np.sort(rng.choice(state.n_train, size=n_history, replace=False))
+    X_train, y_train = state._train()
+    X_window = np.concatenate([X_add, X_train[history]])
+    y_window = np.concatenate([y_add, y_train[history]])
+    if len(np.unique(y_window)) < len(model.classes_):
+        raise ValueError("Artımlı eğitim penceresinde her iki sınıftan da örnek olmalı.")
+
+    new_trees.fit(X_window, y_window)
+    n_replaced = len(new_trees.estimators_)
+    removed = model.estimators_[:n_replaced]
+
+    # Yayındaki model değiştirilmez; ağaçlar eğitimden sonra salt okunur olduğu için paylaşılır
+    updated = copy.copy(model)
+    updated.estimators_ = list(model.estimators_[n_replaced:]) + list(new_trees.estimators_)
+
+    # Kayan holdout penceresi: üst sınırı aşan en eski satırlar skorlanmadan düşülür
+    n_dropped = max(0, state.n_holdout + len(y_holdout_new) - INCREMENTAL_MAX_HOLDOUT_ROWS)
+    dropped_old = min(n_dropped, state.n_holdout)
+    X_kept, y_kept = state.X_holdout[dropped_old:], state.y_holdout[dropped_old:]
+    X_holdout_new, y_holdout_new = X_holdout_new[n_dropped - dropped_old:], y_holdout_new[n_dropped - dropped_old:]
+
+    # Kalan holdout: yalnızca değişen ağaçlar skorlanır
+    holdout_proba_sum = (state.holdout_proba_sum[dropped_old:]
+                         + _tree_proba_sum(new_trees.estimators_, X_kept)
+                         - _tree_proba_sum(removed, X_kept))
+    # Yeni holdout satırları: tüm orman
+    holdout_proba_sum = np.concatenate([holdout_proba_sum, _tree_proba_sum(updated.estimators_, X_holdout_new)])
+
+    # Eğitim satırları dosyanın sonuna eklenir; geçmiş kopyalanmaz
+    new_state = TrainingState(
+        rows=state.append_train(X_add, y_add, rows_dir),
+        n_train=state.n_train + len(y_add),
+        X_holdout=np.concatenate([X_kept, X_holdout_new]),
+        y_holdout=np.concatenate([y_kept, y_holdout_new]),
+        holdout_proba_sum=holdout_proba_sum,
+        rounds=state.rounds + 1,
+        appended_rows=state.appended_rows + len(y_new),
+    )
+    info = {
+        'round': new_state.rounds,
+        'new_rows': int(len(y_new)),
+        'new_train_rows': int(len(y_add)),
+        'new_holdout_rows': int(to_holdout.sum()),
+        'holdout_dropped_rows': int(n_dropped),
+        'window_rows': int(len(y_window)),
+        'trees_replaced': int(n_replaced),
+    }
+    return updated, new_state, info
+
+
+def trees_to_replace(n_trees: int, fraction: float = None) -> int:
+    """Bir turda yenilenecek ağaç sayısı (en az 1, en fazla tüm orman)."""
+    fraction = INCREMENTAL_TREE_FRACTION if fraction is None else fraction
+    return min(n_trees, max(1, int(round(n_trees * fraction))))
@@ -0,0 +1,259 @@
+"""
+CreditGuard AI - Çıkarım Havuzu
+CPU yoğun tahmin işlerini asyncio event loop dışında, sınırlı bir kuyrukla çalıştırır.
+
+Kuyruk dolduğunda yeni işler beklemeye alınmak yerine hemen reddedilir
+(InferenceQueueFull); API bunu 503 + Retry-After olarak döndürür. Böylece ani
+yük artışlarında gecikme birikmez ve /health gibi hafif endpoint'ler yanıt
+vermeye devam eder.
+
+MicroBatcher, aynı anda gelen tekil tahmin isteklerini birkaç milisaniye
+biriktirip tek bir matris olarak havuza gönderir; predict_proba'nın çağrı
+başına sabit maliyeti (doğrulama, joblib dağıtımı) istekler arasında paylaşılır.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Havuz ayarları (ortam değişkenleri ile yapılandırılabilir)
+INFERENCE_WORKERS = int(os.getenv("CREDITGUARD_INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_MAX_QUEUE = int(os.getenv("CREDITGUARD_INFERENCE_MAX_QUEUE", "64"))
+RETRY_AFTER_SECONDS = int(os.getenv("CREDITGUARD_RETRY_AFTER_SECONDS", "1"))
+
+# Mikro-batch ayarları: BATCH_MAX_SIZE=1 biriktirmeyi kapatır
+BATCH_MAX_SIZE = int(os.getenv("CREDITGUARD_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("CREDITGUARD_BATCH_MAX_WAIT_MS", "2"))
+
+
+class InferenceQueueFull(Exception):
+    """Çıkarım kuyruğu dolu; istek kabul edilmedi."""
+
+
+class BoundedExecutor:
+    """
+    Sabit sayıda worker thread'i ve sınırlı bekleme kuyruğu olan çalıştırıcı.
+
+    Aynı anda en fazla max_workers iş çalışır, max_queue iş bekler; fazlası
+    reddedilir. Kuyruk derinliği ve bekleme süreleri stats() ile okunur.
+
+    Thread tabanlıdır: scikit-learn ağaç çıkarımı GIL'i bıraktığı için thread'ler
+    yeterlidir ve model her süreçte ayrıca yüklenmek zorunda kalmaz.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_MAX_QUEUE,
+                 name: str = "inference"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._started = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def is_full(self) -> bool:
+        """Yeni iş şu an reddedilir mi (çalışan + bekleyen iş kapasitede)?"""
+        with self._lock:
+            return self._in_flight >= self.capacity
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        func(*args)'ı havuzda çalıştırır ve sonucunu bekler.
+
+        Raises:
+            InferenceQueueFull: Çalışan + bekleyen iş sayısı kapasiteye ulaştıysa
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFull()
+            self._in_flight += 1
+            self._submitted += 1
+        enqueued = time.perf_counter()
+
+        def task():
+            wait = time.perf_counter() - enqueued
+            with self._lock:
+                self._running += 1
+                self._started += 1
+                self._total_wait += wait
+                self._last_wait = wait
+                if wait > self._max_wait:
+                    self._max_wait = wait
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def release(future) -> None:
+            # Yuva iş gerçekten bitince (veya başlamadan iptal edilince) bırakılır; bekleyen
+            # istek iptal edilse de (istemci koptu, zaman aşımı) thread'deki iş sürerken kapasitede sayılır
+            with self._lock:
+                self._in_flight -= 1
+                if future.cancelled() or future.exception() is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+        # İsteğin context'i (ör. trace id) havuz thread'ine taşınır
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, task)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Kuyruk derinliği, çalışan iş sayısı ve bekleme süresi istatistikleri."""
+        with self._lock:
+            started = self._started
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(0, self._in_flight - self._running),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "last_wait_ms": round(self._last_wait * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı tekil istekleri toplayıp tek bir toplu çağrı ile skorlayan birleştirici.
+
+    İlk istek geldiğinde en fazla max_wait_ms beklenir (veya max_batch_size
+    dolana kadar); biriken kayıtlar batch_func(list) ile havuzda tek seferde
+    işlenir ve sonuçlar sırasıyla bekleyen isteklere dağıtılır. Her batch
+    havuzda tek iş sayılır; havuz doluysa batch'teki tüm istekler
+    InferenceQueueFull alır.
+
+    single_func verilmişse bekleme süresi içinde tek kayıt biriken batch'ler
+    (eşzamanlı istek yokken) batch_func yerine single_func(item) ile, tekil
+    tahmin yoluyla skorlanır.
+    """
+
+    def __init__(self, batch_func: Callable[[List[Any]], List[Any]], executor: BoundedExecutor,
+                 max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 single_func: Optional[Callable[[Any], Any]] = None):
+        self.batch_func = batch_func
+        self.single_func = single_func
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._last_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    async def submit(self, item: Any) -> Any:
+        """Kaydı bir sonraki batch'e ekler ve kendi sonucunu bekler."""
+        loop = asyncio.get_running_loop()
+        self._ensure_collector(loop)
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    def _ensure_collector(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Toplayıcı görev, çalışan event loop'a bağlıdır (test istemcileri her seferinde yeni loop açar)
+        if self._loop is loop and self._collector is not None and not self._collector.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._collector = loop.create_task(self._collect(self._queue))
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Batch arka planda çalışır; toplayıcı hemen sonraki batch'i biriktirmeye başlar.
+            # Batch birden çok isteğe ait olduğu için ilk isteğin context'i (trace id) taşınmaz.
+            loop.create_task(self._dispatch(batch), context=contextvars.Context())
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # Bağlantısı kopan (iptal edilen) istekler skorlanmaz
+        pending = [(item, future) for item, future in batch if not future.done()]
+        if not pending:
+            return
+        try:
+            results = await self._run_batch([item for item, _ in pending])
+        except BaseException as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run_batch(self, items: List[Any]) -> List[Any]:
+        if len(items) == 1 and self.single_func is not None:
+            results = [await self.executor.run(self.single_func, items[0])]
+        else:
+            results = await self.executor.run(self.batch_func, items)
+        self._batches += 1
+        self._items += len(items)
+        self._last_batch = len(items)
+        if len(items) > self._largest_batch:
+            self._largest_batch = len(items)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch sayısı ve boyut istatistikleri."""
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "last_batch": self._last_batch,
+        }
+
+    def shutdown(self) -> None:
+        if self._collector is not None and not self._collector.done():
+            self._collector.cancel()
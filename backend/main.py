@@ -3,11 +3,25 @@ CreditGuard AI - FastAPI Backend
 Kredi risk skoru tahmini ve model performans API'leri.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Body, Depends, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Dict, Any, Literal
+import asyncio
+import codecs
+import json
+import time
+import metrics
 import ml_service
+from app_logging import TraceIdMiddleware, current_trace_id, dropped_records, get_logger, log_fields, trace_id_var
+from inference_pool import BoundedExecutor, InferenceQueueFull, MicroBatcher, RETRY_AFTER_SECONDS
+from schemas import CreditApplication, application_to_input, validate_application, validate_labeled_application
+
+logger = get_logger("api")
 
 app = FastAPI(
     title="CreditGuard AI API",
@@ -24,50 +38,214 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# İstek sayısı / durum kodu / gecikme metrikleri (saf ASGI, istek başına birkaç µs)
+app.add_middleware(metrics.MetricsMiddleware)
 
-# Request/Response modelleri
-class CreditApplication(BaseModel):
-    # Zorunlu numeric feature'lar
-    duration: int = Field(..., ge=1, le=120, description="Kredi süresi (ay)")
-    credit_amount: float = Field(..., ge=0, description="Kredi tutarı")
-    age: int = Field(..., ge=18, le=100, description="Yaş")
-    
-    # Zorunlu categorical feature'lar
-    housing: str = Field(..., description="Konut durumu")
-    savings_status: Optional[str] = Field(None, description="Tasarruf durumu")  # Veri setinde 'savings_status'
-    saving_status: Optional[str] = Field(None, description="Tasarruf durumu (alternatif isim, frontend uyumluluğu için)")  # Frontend'den gelebilir
-    checking_status: str = Field(..., description="Hesap durumu")
-    purpose: str = Field(..., description="Kredi amacı")
-    
-    # Opsiyonel numeric feature'lar
-    installment_commitment: Optional[int] = Field(None, ge=1, le=4, description="Taksit taahhüdü")
-    residence_since: Optional[int] = Field(None, ge=1, le=4, description="İkamet süresi")
-    existing_credits: Optional[int] = Field(None, ge=1, le=4, description="Mevcut krediler")
-    num_dependents: Optional[int] = Field(None, ge=1, le=2, description="Bağımlı sayısı")
-    
-    # Opsiyonel categorical feature'lar
-    credit_history: Optional[str] = Field(None, description="Kredi geçmişi")
-    employment: Optional[str] = Field(None, description="İstihdam durumu")
-    personal_status: Optional[str] = Field(None, description="Kişisel durum")
-    other_parties: Optional[str] = Field(None, description="Diğer taraflar")
-    property_magnitude: Optional[str] = Field(None, description="Mülkiyet büyüklüğü")
-    other_payment_plans: Optional[str] = Field(None, description="Diğer ödeme planları")
-    job: Optional[str] = Field(None, description="Meslek")
-    own_telephone: Optional[str] = Field(None, description="Telefon")
-    foreign_worker: Optional[str] = Field(None, description="Yabancı işçi")
+# İstek bazlı trace id (X-Request-ID / X-Trace-ID); en dışta olduğu için tüm loglarda görünür
+app.add_middleware(TraceIdMiddleware)
+
+
+# CPU yoğun tahminler event loop dışında, sınırlı kuyruklu havuzda çalışır
+inference_executor = BoundedExecutor()
+
+def predict_traced_batch(items):
+    """Mikro-batch girdisi (trace id, başvuru) çiftleridir; trace id'ler batch loguna taşınır."""
+    trace_ids, records = zip(*items)
+    return ml_service.predict_risk_batch(list(records), trace_ids=list(trace_ids))
+
+
+def predict_traced_single(item):
+    """Tek kayıtlık mikro-batch: tekil tahmin yolu (FeaturePlan.encode), isteğin trace id'siyle."""
+    trace_id, record = item
+    token = trace_id_var.set(trace_id)
+    try:
+        return ml_service.predict_risk(record)
+    finally:
+        trace_id_var.reset(token)
+
+
+# Eşzamanlı /predict istekleri birkaç ms biriktirilip tek predict_proba çağrısıyla skorlanır;
+# bekleme süresinde başka istek gelmezse tekil yol kullanılır
+prediction_batcher = MicroBatcher(predict_traced_batch, inference_executor, single_func=predict_traced_single)
+
+
+def inference_busy() -> bool:
+    """Çıkarım havuzunda boş worker yoksa veya istek bekliyorsa True; gölge model skorlaması ertelenir."""
+    pool = inference_executor.stats()
+    return (pool["queue_depth"] > 0 or pool["running"] >= pool["workers"]
+            or prediction_batcher.stats()["pending"] > 0)
+
+
+# Gölge model yalnızca boş çıkarım kapasitesini kullanır; yük altında işi düşürülür
+ml_service.shadow_evaluator.load_probe = inference_busy
+
+
+@app.on_event("startup")
+async def load_model_on_startup():
+    """
+    Model yaşam döngüsünü arka planda başlatır: artifact'ı yükler (yoksa eğitip
+    yazar), tahmin yollarını ısıtır ve ardından hazır işaretler.
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "duration": 24,
-                "credit_amount": 5000,
-                "age": 35,
-                "housing": "own",
-                "savings_status": "100<=X<500",
-                "checking_status": "0<=X<200",
-                "purpose": "new car"
-            }
-        }
+    Sunucu bu sırada istek kabul eder; /health hazır olana kadar 503 döner.
+    Çok worker'lı dağıtımda eğitim artifact dosya kilidi ile tek worker'da
+    yapılır, diğerleri yazılan artifact'ı yükler. Artifact da veri seti de
+    yoksa sunucu açıklayıcı bir hata ile başlamaz.
+    """
+    ml_service.check_model_source()
+    schedule_model_load()
+    # Çok worker'lı modda (CREDITGUARD_METRICS_DIR) metrik toplamlarını düzenli yaz
+    metrics.registry.start_flusher()
+    # Drift gözlemlerini istek yolunun dışında kovala
+    ml_service.drift_monitor.start()
+    # Başka bir worker'ın yeniden eğitip yazdığı artifact'ı yükle
+    ml_service.start_model_sync()
+
+
+@app.on_event("shutdown")
+async def shutdown_inference_executor():
+    prediction_batcher.shutdown()
+    inference_executor.shutdown()
+    metrics.registry.stop_flusher()
+    ml_service.drift_monitor.stop()
+    ml_service.shadow_evaluator.stop()
+    ml_service.stop_model_sync()
+
+
+def collect_service_metrics():
+    """Scrape anında okunan anlık değerler: model sürümü, kuyruk, batch ve önbellek durumu."""
+    if ml_service.current_snapshot is not None:
+        yield ("creditguard_model_info",
+               (("model_version", ml_service.model_version or ""), ("inference_engine", ml_service.INFERENCE_ENGINE)),
+               1)
+    pool = inference_executor.stats()
+    yield ("creditguard_inference_running", (), pool["running"])
+    yield ("creditguard_inference_queue_depth", (), pool["queue_depth"])
+    yield ("creditguard_inference_rejected_total", (), pool["rejected"])
+    yield ("creditguard_batcher_pending", (), prediction_batcher.stats()["pending"])
+    cache = ml_service.prediction_cache.stats()
+    yield ("creditguard_prediction_cache_size", (), cache["size"])
+    yield ("creditguard_prediction_cache_hits_total", (), cache["hits"])
+    yield ("creditguard_prediction_cache_misses_total", (), cache["misses"])
+    yield ("creditguard_prediction_cache_evictions_total", (), cache["evictions"])
+    yield ("creditguard_prediction_cache_invalidations_total", (), cache["invalidations"])
+    yield ("creditguard_labeled_outcomes_pending", (), ml_service.pending_labeled_outcomes())
+    yield ("creditguard_log_records_dropped_total", (), dropped_records())
+    yield ("creditguard_model_ready", (), ml_service.model_status["state"] == "ready")
+    peak_rss = metrics.peak_rss_bytes()
+    if peak_rss is not None:
+        yield ("creditguard_process_peak_rss_bytes", (), peak_rss)
+    drift = ml_service.drift_monitor.report()
+    yield ("creditguard_drift_observations_dropped_total", (), drift["dropped_rows"])
+    for feature, entry in drift.get("features", {}).items():
+        if "psi" in entry:
+            yield ("creditguard_drift_psi", (("feature", feature),), entry["psi"])
+    for feature, count in ml_service.drift_monitor.unknown_totals().items():
+        yield ("creditguard_unknown_categories_total", (("feature", feature),), count)
+    shadow = ml_service.shadow_evaluator.report()
+    if shadow["enabled"]:
+        labels = (("challenger_version", shadow["challenger_version"]),)
+        yield ("creditguard_shadow_scored_rows_total", labels, shadow["scored_rows"])
+        yield ("creditguard_shadow_decision_disagreements_total", labels, shadow.get("decision_disagreements", 0))
+        for reason, count in shadow["dropped_rows"].items():
+            yield ("creditguard_shadow_dropped_rows_total", labels + (("reason", reason),), count)
+
+
+metrics.registry.describe("creditguard_model_info", "gauge", "Yayındaki model sürümü ve çıkarım motoru (worker sayısı)")
+metrics.registry.describe("creditguard_inference_running", "gauge", "Çıkarım havuzunda çalışan iş sayısı")
+metrics.registry.describe("creditguard_inference_queue_depth", "gauge", "Çıkarım havuzunda bekleyen iş sayısı")
+metrics.registry.describe("creditguard_inference_rejected_total", "counter", "Kuyruk dolu olduğu için reddedilen iş sayısı (503)")
+metrics.registry.describe("creditguard_batcher_pending", "gauge", "Mikro-batch kuyruğunda bekleyen istek sayısı")
+metrics.registry.describe("creditguard_prediction_cache_size", "gauge", "Tahmin önbelleğindeki kayıt sayısı")
+metrics.registry.describe("creditguard_prediction_cache_hits_total", "counter", "Tahmin önbelleği isabet sayısı")
+metrics.registry.describe("creditguard_prediction_cache_misses_total", "counter", "Tahmin önbelleği ıska sayısı")
+metrics.registry.describe("creditguard_prediction_cache_evictions_total", "counter", "Kapasite nedeniyle atılan önbellek kaydı sayısı")
+metrics.registry.describe("creditguard_prediction_cache_invalidations_total", "counter", "Model değiştiği için boşaltılan önbellek sayısı")
+metrics.registry.describe("creditguard_labeled_outcomes_pending", "gauge", "Artımlı eğitimi bekleyen etiketli başvuru sayısı (worker'lar arası ortak kuyruk)", aggregate="max")
+metrics.registry.describe("creditguard_model_ready", "gauge", "Model yüklü ve ısınmış ise 1 (tüm worker'lar hazırsa 1)", aggregate="min")
+metrics.registry.describe("creditguard_process_peak_rss_bytes", "gauge", "Sürecin en yüksek bellek kullanımı (RSS, bayt; en yüksek worker)", aggregate="max")
+metrics.registry.describe("creditguard_drift_psi", "gauge", "Feature başına eğitim dağılımına göre PSI (son iki drift penceresi; en yüksek worker)", aggregate="max")
+metrics.registry.describe("creditguard_drift_observations_dropped_total", "counter", "Drift kuyruğu dolu olduğu için kovalanmayan satır sayısı")
+metrics.registry.describe("creditguard_unknown_categories_total", "counter", "Encoder sözlüğünde olmayan (ilk sınıfa düşen) kategorik değer sayısı")
+metrics.registry.describe("creditguard_shadow_scored_rows_total", "counter", "Gölge modelin skorladığı satır sayısı")
+metrics.registry.describe("creditguard_shadow_decision_disagreements_total", "counter", "Gölge model ile yayındaki modelin kararının farklı olduğu satır sayısı")
+metrics.registry.describe("creditguard_shadow_dropped_rows_total", "counter", "Yük altında skorlanmadan düşürülen gölge satır sayısı (queue_full, stale)")
+metrics.registry.describe("creditguard_log_records_dropped_total", "counter", "Log kuyruğu dolu olduğu için düşürülen kayıt sayısı")
+metrics.registry.register_collector(collect_service_metrics)
+
+
+async def ensure_model_loaded():
+    """Model yüklü değilse event loop'u bloklamadan yükler/eğitir (lazy loading, tek seferde)."""
+    if ml_service.current_snapshot is None:
+        await run_in_threadpool(ml_service.ensure_model)
+
+
+# Başlangıçta veya okuma endpoint'lerinden arka planda başlatılan model hazırlığı (istek beklemez)
+_model_load_task: Optional[asyncio.Task] = None
+
+
+def schedule_model_load() -> None:
+    """Model hazır değilse yükleme/eğitim + ısınmayı arka planda başlatır; zaten sürüyorsa bir şey yapmaz."""
+    global _model_load_task
+    if ml_service.model_status["state"] == "ready" or (_model_load_task is not None and not _model_load_task.done()):
+        return
+    _model_load_task = asyncio.get_running_loop().create_task(run_in_threadpool(ml_service.prepare_model))
+    # Hata model_status'a yazılır; görev sonucu ayrıca beklenmez
+    _model_load_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+
+def model_not_ready_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Model henüz hazır değil (durum: {ml_service.model_status['state']}).",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match başlığı (liste, W/ önekli veya *) verilen ETag ile eşleşiyor mu?"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+async def run_inference(func, *args):
+    """
+    Tahmin işini çıkarım havuzunda çalıştırır.
+    Kuyruk doluysa 503 + Retry-After döndürür (gecikme biriktirmek yerine).
+    """
+    try:
+        return await inference_executor.run(func, *args)
+    except InferenceQueueFull:
+        raise service_busy_error()
+
+
+async def predict_single(input_data, include_attributions: bool = False):
+    """
+    Tekil tahmini mikro-batch birleştirici üzerinden yapar.
+    Biriktirme kapalıysa (CREDITGUARD_BATCH_MAX_SIZE=1) veya yerel katkılar
+    istendiyse doğrudan predict_risk çalışır.
+    """
+    if include_attributions or not prediction_batcher.enabled:
+        return await run_inference(ml_service.predict_risk, input_data, include_attributions)
+    try:
+        return await prediction_batcher.submit((current_trace_id(), input_data))
+    except InferenceQueueFull:
+        raise service_busy_error()
+
+
+def service_busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Sunucu yoğun, lütfen kısa süre sonra tekrar deneyin.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+# Request/Response modelleri
+class LocalAttributions(BaseModel):
+    base_value: float  # Modelin ortalama riskli olasılığı
+    contributions: Dict[str, float]  # Feature -> işaretli katkı (pozitif = riski artırır)
 
 
 class PredictionResponse(BaseModel):
@@ -76,12 +254,64 @@ class PredictionResponse(BaseModel):
     risk_level: str
     risk_probability: float
     explanation: str
+    attributions: Optional[LocalAttributions] = None  # Yalnızca ?attributions=true ile
+
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    status: str  # "ok" veya "error"
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchPredictionItem]
 
 
 class ModelPerformanceResponse(BaseModel):
     metrics: dict
     confusion_matrix: list
     dataset_info: str
+    threshold_curve: Optional[dict] = None  # Her threshold için precision/recall/F1/maliyet
+
+
+# Toplu tahminde tek istekte kabul edilen en fazla başvuru sayısı
+MAX_BATCH_SIZE = 10000
+
+
+def prepare_prediction_input(application: CreditApplication) -> dict:
+    """
+    Doğrulanmış başvuruyu ml_service'in beklediği giriş sözlüğüne çevirir.
+    Eksik zorunlu alan varsa HTTPException (400) fırlatır.
+    """
+    try:
+        return application_to_input(application)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def validated_prediction_input(request: Request) -> dict:
+    """
+    /predict gövdesini CreditApplication ile doğrulayıp giriş sözlüğüne çevirir.
+
+    Doğrulama FastAPI'ye bırakılmaz (handler başlamadan çalışır ve ölçülemezdi):
+    JSON ayrıştırma, model doğrulama ve giriş dönüşümü birlikte "validation"
+    aşamasında ölçülür. Gövdenin ağdan okunması aşamaya dahil değildir.
+    Hatalar FastAPI'nin 422 biçimiyle döner.
+    """
+    body = await request.body()
+    timer = metrics.StageTimer("single")
+    try:
+        application = CreditApplication.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)], body=body)
+    input_data = prepare_prediction_input(application)
+    timer.mark("validation")
+    return input_data
 
 
 @app.get("/")
@@ -95,28 +325,35 @@ async def root():
 
 
 @app.get("/model-performance", response_model=ModelPerformanceResponse)
-async def get_model_performance():
+async def get_model_performance(request: Request):
     """
     Eğitilmiş modelin performans metriklerini döndürür.
     Frontend dashboard'da gösterilmek üzere accuracy, precision, recall, f1 ve confusion matrix içerir.
+    
+    Yanıt her model yayınında bir kez serileştirilir ve ETag ile döner;
+    If-None-Match aynı ETag'i taşıyorsa gövdesiz 304 döner. Model henüz
+    yüklenmediyse istek eğitimi beklemez: yükleme arka planda başlatılır ve
+    503 + Retry-After döner.
     """
-    try:
-        # Model eğitilmemişse eğit (lazy loading)
-        if ml_service.trained_model is None:
-            print("Model henüz eğitilmemiş, eğitim başlatılıyor...")
-            ml_service.train_model()
-            print("Model eğitimi tamamlandı!")
-        
-        metrics = ml_service.get_model_metrics()
-        return ModelPerformanceResponse(**metrics)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Beklenmeyen hata: {str(e)}")
+    payload = ml_service.performance_payload
+    if payload is None:
+        schedule_model_load()
+        raise model_not_ready_error()
+    
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_credit_risk(application: CreditApplication):
+# Gövde bağımlılıkta elle doğrulandığı için şema OpenAPI'ye ayrıca eklenir
+@app.post("/predict", response_model=PredictionResponse, response_model_exclude_none=True,
+          openapi_extra={"requestBody": {"required": True, "content": {
+              "application/json": {"schema": CreditApplication.model_json_schema()}}}})
+async def predict_credit_risk(
+    input_data: dict = Depends(validated_prediction_input),
+    attributions: bool = Query(False, description="Başvuruya özel feature katkılarını da döndür")
+):
     """
     Kredi başvurusu için risk skoru hesaplar.
     
@@ -128,29 +365,16 @@ async def predict_credit_risk(application: CreditApplication):
     - saving_status: Tasarruf durumu
     - checking_status: Hesap durumu
     - purpose: Kredi amacı
+    
+    attributions=true ile yanıt, bu başvurunun skorunu hangi feature'ların ne
+    yönde etkilediğini gösteren işaretli katkıları da içerir.
     """
     try:
-        # Model eğitilmemişse eğit (lazy loading)
-        if ml_service.trained_model is None:
-            print("Model henüz eğitilmemiş, eğitim başlatılıyor...")
-            ml_service.train_model()
-            print("Model eğitimi tamamlandı!")
+        # Model yüklenmemişse yükle/eğit (lazy loading, tek seferde)
+        await ensure_model_loaded()
         
-        # Giriş verisini dict'e çevir (None değerleri filtrele)
-        input_data = {k: v for k, v in application.dict().items() if v is not None}
-        
-        # saving_status -> savings_status mapping (frontend uyumluluğu için)
-        if 'saving_status' in input_data and 'savings_status' not in input_data:
-            input_data['savings_status'] = input_data.pop('saving_status')
-        
-        # Temel alanların varlığını kontrol et
-        required_fields = ['duration', 'credit_amount', 'age', 'housing', 'checking_status', 'purpose', 'savings_status']
-        missing_fields = [field for field in required_fields if field not in input_data]
-        if missing_fields:
-            raise HTTPException(status_code=400, detail=f"Eksik alanlar: {', '.join(missing_fields)}")
-        
-        # Tahmin yap
-        result = ml_service.predict_risk(input_data)
+        # Tahmin yap (event loop dışında, eşzamanlı isteklerle birlikte toplu olarak)
+        result = await predict_single(input_data, attributions)
         
         # Sonuç doğrulama
         if not result or 'risk_score' not in result:
@@ -162,19 +386,269 @@ async def predict_credit_risk(application: CreditApplication):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Tahmin hatası detayı: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Tahmin hatası")
         raise HTTPException(status_code=500, detail=f"Tahmin hatası: {str(e)}")
 
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_credit_risk_batch(
+    applications: List[Any] = Body(...),
+    attributions: bool = Query(False, description="Her sonuca başvuruya özel feature katkılarını ekle")
+):
+    """
+    Birden çok kredi başvurusu için risk skorlarını tek istekte hesaplar.
+    
+    Her başvuru ayrı ayrı doğrulanır; geçersiz satırlar tek tek raporlanır ve
+    toplu işlemin geri kalanını etkilemez. Geçerli satırlar tek bir
+    predict_proba çağrısı ile skorlanır. Sonuçlar giriş sırasıyla döner.
+    """
+    if len(applications) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Tek istekte en fazla {MAX_BATCH_SIZE} başvuru gönderilebilir."
+        )
+    
+    try:
+        # Model yüklenmemişse yükle/eğit (lazy loading, tek seferde)
+        await ensure_model_loaded()
+        
+        items: List[Optional[BatchPredictionItem]] = [None] * len(applications)
+        valid_indices = []
+        valid_inputs = []
+        
+        for index, raw in enumerate(applications):
+            try:
+                input_data = validate_application(raw)
+            except ValueError as e:
+                items[index] = BatchPredictionItem(index=index, status="error", error=str(e))
+                continue
+            valid_indices.append(index)
+            valid_inputs.append(input_data)
+        
+        # Geçerli satırları tek seferde skorla
+        results = await run_inference(ml_service.predict_risk_batch, valid_inputs, True, attributions)
+        for index, result in zip(valid_indices, results):
+            items[index] = BatchPredictionItem(index=index, status="ok", result=PredictionResponse(**result))
+        
+        succeeded = len(valid_indices)
+        return BatchPredictionResponse(
+            total=len(applications),
+            succeeded=succeeded,
+            failed=len(applications) - succeeded,
+            results=items
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Toplu tahmin hatası", extra=log_fields(rows=len(applications)))
+        raise HTTPException(status_code=500, detail=f"Toplu tahmin hatası: {str(e)}")
+
+
+# Stream skorlamada çıkarım havuzu doluysa parça bu aralıklarla yeniden denenir; bu sırada
+# gövde okunmaz, istemcinin yüklemesi TCP akış kontrolü ile yavaşlar
+STREAM_BUSY_RETRY_SECONDS = 0.05
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    İstek gövdesi okunurken yanıtı akıtan StreamingResponse.
+    
+    Starlette, ASGI spec 2.4'ten eski sunucularda (uvicorn HTTP) istemci kopmasını
+    yanıt süresince receive() ile dinler; bu dinleyici üretecin okuduğu gövde
+    mesajlarını tüketirdi. Burada kopmayı gövdeyi okuyan üreteç kendisi
+    (request.stream() -> ClientDisconnect) fark eder.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def run_stream_chunk(*args):
+    """Stream parçasını çıkarım havuzunda skorlar; havuz doluysa reddetmek yerine yer açılmasını bekler."""
+    while True:
+        try:
+            return await inference_executor.run(ml_service.score_record_lines, *args)
+        except InferenceQueueFull:
+            await asyncio.sleep(STREAM_BUSY_RETRY_SECONDS)
+
+
+@app.post("/predict/stream")
+async def predict_credit_risk_stream(
+    request: Request,
+    input_format: Optional[str] = Query(None, alias="format", description="csv veya ndjson (varsayılan: Content-Type)"),
+    chunk_size: int = Query(ml_service.STREAM_CHUNK_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Parça boyutu (satır)")
+):
+    """
+    CSV veya NDJSON başvuru akışını sabit bellekle skorlar.
+    
+    İstek gövdesi ağdan geldikçe satırlara bölünür; her chunk_size satır
+    dolduğunda parça çıkarım havuzunda (ayrıştırma + toplu tahmin) skorlanır
+    ve sonuçları hemen NDJSON olarak geri akıtılır. Bellekte en fazla bir
+    parça tutulur. Havuz doluysa gövde okuması bekler (geri basınç). Her satır
+    için {"index", "status", ...} kaydı döner; son satır {"summary": {...}}
+    özetidir (toplam satır, hatalı satır, satır/sn).
+    """
+    if input_format is None:
+        input_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if input_format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format 'csv' veya 'ndjson' olmalı.")
+    
+    # Model yüklenmemişse yükle/eğit (lazy loading, tek seferde)
+    await ensure_model_loaded()
+    # Yanıt başladıktan sonra 503 dönülemez; havuz şu an doluysa akışı hiç başlatma
+    if inference_executor.is_full():
+        raise service_busy_error()
+    
+    async def read_line_batches():
+        """Gövde parçalarını UTF-8 çözüp tam satır listeleri olarak verir."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        splitter = ml_service.RecordLineSplitter(input_format)
+        async for data in request.stream():
+            yield splitter.feed(decoder.decode(data))
+        yield splitter.feed(decoder.decode(b"", final=True)) + splitter.close()
+    
+    async def generate():
+        started = time.perf_counter()
+        total = 0
+        failed = 0
+        header = None
+        pending: List[str] = []
+        
+        async def score(lines):
+            nonlocal total, failed
+            outputs = await run_stream_chunk(lines, input_format, total, header)
+            total += len(outputs)
+            failed += sum(output["status"] != "ok" for output in outputs)
+            return "".join(json.dumps(output, ensure_ascii=False) + "\n" for output in outputs)
+        
+        try:
+            async for lines in read_line_batches():
+                if input_format == "csv" and header is None and lines:
+                    header = lines.pop(0)
+                pending.extend(lines)
+                while len(pending) >= chunk_size:
+                    chunk = pending[:chunk_size]
+                    del pending[:chunk_size]
+                    yield await score(chunk)
+            if pending:
+                yield await score(pending)
+        except ClientDisconnect:
+            logger.warning("Stream skorlama istemci koptuğu için durdu", extra=log_fields(rows=total))
+            return
+        except Exception as e:
+            logger.exception("Stream skorlama hatası", extra=log_fields(rows=total))
+            yield json.dumps({"error": f"Stream skorlama hatası: {str(e)}"}, ensure_ascii=False) + "\n"
+        
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        summary = {
+            "rows": total,
+            "succeeded": total - failed,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": round(total / elapsed, 1)
+        }
+        logger.info("Stream skorlama tamamlandı", extra=log_fields(**summary))
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return RequestBodyStreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.get("/health")
 async def health_check():
-    """Sağlık kontrolü"""
-    return {
-        "status": "healthy",
-        "model_trained": ml_service.trained_model is not None
-    }
+    """
+    Sağlık ve hazır olma durumu.
+    
+    Yalnızca bellekteki durumu okur; model yüklü değilse bile yükleme veya eğitim başlatmaz.
+    Model yüklenip ısınana kadar 503 döner (yük dengeleyici hazır olmayan worker'a istek yönlendirmez).
+    """
+    model_status = ml_service.model_status
+    ready = model_status["state"] == "ready"
+    return JSONResponse(status_code=200 if ready else 503, content={
+        "status": "healthy" if ready else model_status["state"],
+        "ready": ready,
+        "model_state": model_status,
+        "model_trained": ml_service.current_snapshot is not None,
+        "model_version": ml_service.model_version,
+        "inference_engine": ml_service.INFERENCE_ENGINE,
+        "inference": inference_executor.stats(),
+        "batching": prediction_batcher.stats(),
+        "prediction_cache": ml_service.prediction_cache.stats(),
+        "pending_labeled_outcomes": ml_service.pending_labeled_outcomes()
+    })
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Prometheus metrikleri (text exposition formatı).
+    
+    CREDITGUARD_METRICS_DIR verilmişse tüm uvicorn worker'larının toplamı döner.
+    """
+    body = await run_in_threadpool(metrics.registry.render)
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/drift")
+async def get_drift(detail: bool = Query(False, description="Kova sınırları ile eğitim ve canlı oranlar da eklensin")):
+    """
+    Tahmin edilen başvuruların eğitim dağılımına göre kayması.
+    
+    Feature başına PSI, numeric feature'lar için KS ve kategorik feature'lar
+    için bilinmeyen kategori oranları (modelde ilk sınıfa düşen değerler)
+    döner. Sonuçlar bu worker'ın son iki penceresini (CREDITGUARD_DRIFT_WINDOW_SECONDS)
+    kapsar. Yalnızca bellekteki sayaçları okur; model yüklemez.
+    """
+    if ml_service.current_snapshot is None:
+        raise model_not_ready_error()
+    report = await run_in_threadpool(ml_service.drift_monitor.report, detail)
+    if not report["baseline"]:
+        raise HTTPException(status_code=503, detail="Modelin drift baseline'ı yok (eski artifact); "
+                                                    "izleme için model yeniden eğitilmeli.")
+    return report
+
+
+@app.get("/shadow")
+async def get_shadow_report():
+    """
+    Gölge (challenger) modelin yayındaki modelle karşılaştırması.
+    
+    Karar uyuşmazlık oranı (APPROVE / REVIEW / REJECT), her modelin kendi
+    threshold'una göre sınıflandırma uyuşmazlığı, olasılık farkları ve yük
+    altında düşürülen satırlar. Sonuçlar bu worker'ın trafiğini kapsar.
+    """
+    return ml_service.shadow_evaluator.report()
+
+
+@app.post("/shadow")
+async def load_shadow_model():
+    """CREDITGUARD_SHADOW_MODEL_PATH artifact'ını gölge model olarak yükler (yeniden eğitim için /retrain-model?target=shadow)."""
+    try:
+        return await run_in_threadpool(ml_service.load_shadow_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/shadow")
+async def clear_shadow_model():
+    """Gölge modeli kaldırır; yayındaki model değişmez."""
+    if not ml_service.clear_shadow_model():
+        raise HTTPException(status_code=404, detail="Gölge model yok.")
+    return {"message": "Gölge model kaldırıldı"}
+
+
+@app.post("/shadow/promote")
+async def promote_shadow_model():
+    """Gölge modeli yayına alır ve artifact'a yazar; önceki istatistikler döner."""
+    report = ml_service.shadow_evaluator.report()
+    try:
+        snapshot = await run_in_threadpool(ml_service.promote_shadow_model)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"message": "Gölge model yayına alındı", "model_version": snapshot.model_version, "shadow": report}
 
 
 @app.get("/model-features")
@@ -184,19 +658,20 @@ async def get_model_features():
     Frontend formunu dinamik olarak oluşturmak için kullanılabilir.
     """
     try:
-        if ml_service.trained_model is None:
+        snapshot = ml_service.current_snapshot
+        if snapshot is None:
             raise HTTPException(status_code=503, detail="Model henüz eğitilmemiş.")
         
         # Numeric ve kategorik feature'ları ayır
         numeric_features = []
         categorical_features = {}
         
-        for feature in ml_service.feature_names:
-            if feature in ml_service.encoders:
+        for feature in snapshot.feature_names:
+            if feature in snapshot.encoders:
                 # Kategorik feature
                 categorical_features[feature] = {
                     "type": "categorical",
-                    "values": list(ml_service.encoders[feature].classes_)
+                    "values": list(snapshot.encoders[feature].classes_)
                 }
             else:
                 # Numeric feature
@@ -205,56 +680,112 @@ async def get_model_features():
         return {
             "numeric_features": numeric_features,
             "categorical_features": categorical_features,
-            "all_features": ml_service.feature_names
+            "all_features": snapshot.feature_names
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Hata: {str(e)}")
 
 
 @app.get("/sample-data")
-async def get_sample_data(include_target: bool = True):
+async def get_sample_data(
+    include_target: bool = True,
+    risk: Optional[Literal["bad", "good"]] = Query(None, description="Yalnızca bu sınıftan örnek"),
+    seed: Optional[int] = Query(None, description="Verilirse aynı örnek döner")
+):
     """
     Veri setinden rastgele bir örnek döndürür.
     Frontend formunu otomatik doldurmak için kullanılabilir.
     
+    Örnekler eğitimde kompakt bir depoya önceden serileştirilir; istek yalnızca
+    hazır JSON baytlarını döndürür.
+    
     Args:
         include_target: True ise, gerçek risk durumunu da döndürür (default: True)
+        risk: 'bad' / 'good' ile sınıfa göre (stratified) seçim
+        seed: Tekrarlanabilir seçim için seed
     """
     try:
-        # Model eğitilmemişse eğit (lazy loading)
-        if ml_service.trained_model is None:
-            print("Model henüz eğitilmemiş, eğitim başlatılıyor...")
-            ml_service.train_model()
-            print("Model eğitimi tamamlandı!")
+        # Model yüklenmemişse yükle/eğit (lazy loading, tek seferde)
+        await ensure_model_loaded()
         
-        sample = ml_service.get_sample_data(include_target=include_target)
-        return sample
+        body = ml_service.get_sample_data_json(include_target=include_target, risk=risk, seed=seed)
+        return Response(content=body, media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Hata: {str(e)}")
 
 
-@app.post("/retrain-model")
-async def retrain_model():
+@app.post("/labeled-outcomes")
+async def add_labeled_outcomes(applications: List[Any] = Body(...)):
     """
-    Modeli yeniden eğitir (class_weight='balanced' ile).
-    Kullanım: Model performansını iyileştirmek için.
+    Gerçekleşen sonucu bilinen başvuruları (actual_risk: 'bad' / 'good') artımlı eğitim için biriktirir.
+    
+    Her kayıt ayrı ayrı doğrulanır; geçersiz kayıtlar raporlanır, geçerliler
+    tüm worker'ların ortak kuyruğuna yazılır ve bir sonraki
+    POST /retrain-model?mode=incremental çağrısında modele eklenir.
+    """
+    if len(applications) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Tek istekte en fazla {MAX_BATCH_SIZE} başvuru gönderilebilir."
+        )
+    
+    records, labels, errors = [], [], []
+    for index, raw in enumerate(applications):
+        try:
+            input_data, label = validate_labeled_application(raw)
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        records.append(input_data)
+        labels.append(label)
+    
+    pending = await run_in_threadpool(ml_service.add_labeled_outcomes, records, labels)
+    return {
+        "total": len(applications),
+        "accepted": len(records),
+        "failed": len(errors),
+        "errors": errors,
+        "pending": pending
+    }
+
+
+@app.post("/retrain-model", status_code=202)
+async def retrain_model(
+    mode: str = Query("full", description="full: baştan eğitim, incremental: bekleyen etiketli satırlarla ağaçların bir kısmını yenile"),
+    target: str = Query("champion", description="champion: yayına al, shadow: gölge model olarak canlı trafikle karşılaştır")
+):
+    """
+    Modeli arka planda yeniden eğitir ve hemen bir iş kimliği döndürür.
+    
+    Eğitim sürerken mevcut model tahminlere hizmet vermeye devam eder; yeni
+    model hazır olduğunda atomik olarak yayına alınır (target=shadow ise
+    gölge model olur, bkz. /shadow). Diğer worker'lar yeni artifact'ı
+    CREDITGUARD_MODEL_SYNC_SECONDS içinde yükler. Durum için
+    GET /retrain-model/{job_id} kullanılır (herhangi bir worker'a gidebilir).
     """
     try:
-        print("Model yeniden eğitiliyor...")
-        # Modeli sıfırla
-        ml_service.trained_model = None
-        ml_service.model_metrics = {}
-        ml_service.original_dataset = None
-        # Yeniden eğit
-        ml_service.train_model()
+        job = await run_in_threadpool(ml_service.start_retrain_job, mode, target)
         return {
-            "message": "Model başarıyla yeniden eğitildi",
-            "metrics": ml_service.get_model_metrics()
+            "message": "Model yeniden eğitimi başlatıldı",
+            **job
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Model eğitimi hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Model eğitimi başlatılamadı: {str(e)}")
+
+
+@app.get("/retrain-model/{job_id}")
+async def get_retrain_status(job_id: str):
+    """Yeniden eğitim işinin durumunu döndürür (queued, running, succeeded, failed)."""
+    job = await run_in_threadpool(ml_service.get_retrain_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Yeniden eğitim işi bulunamadı.")
+    return job
 
 
 if __name__ == "__main__":
@@ -0,0 +1,385 @@
+"""
+CreditGuard AI - Prometheus Metrikleri
+İstek sayıları, hata sayıları ve aşama bazlı gecikme histogramları için hafif metrik kaydı.
+
+- Sayaç ve histogramlar iş parçacığı başına ayrı parçalarda (shard) tutulur;
+  her parça yalnızca kendi iş parçacığı tarafından yazılır, bu yüzden sıcak
+  yolda kilit yoktur (bir ölçüm birkaç sözlük/liste işlemi, ~1 µs).
+  Kilit yalnızca yeni bir iş parçacığının parçası kaydedilirken ve
+  toplama (scrape) sırasında alınır.
+- Kuyruk, önbellek ve model sürümü gibi anlık değerler scrape anında geri
+  çağırma fonksiyonlarından (register_collector) okunur.
+- Çok worker'lı dağıtımda (uvicorn --workers N) CREDITGUARD_METRICS_DIR
+  ortak bir klasör olarak verilir: her worker kendi toplamını
+  METRICS_FLUSH_SECONDS aralıklarla bu klasöre yazar, /metrics'e cevap veren
+  worker tüm dosyaları birleştirir. Sonlanmış worker'ların sayaçları korunur
+  (sayaçlar geri gitmez), anlık değerleri atlanır. Klasör dağıtım başında boşaltılmalıdır.
+  Anlık değerler describe(aggregate=...) ile verilen şekilde birleştirilir:
+  worker başına ayrı kaynaklar (kuyruk, önbellek) toplanır; PSI veya paylaşılan
+  bir dosyadan okunan sayılar gibi toplanınca anlamı bozulan değerlerin
+  en büyüğü (veya en küçüğü) alınır.
+
+Çıktı Prometheus text exposition formatındadır (0.0.4).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app_logging import get_logger, log_fields
+
+try:
+    import resource
+except ImportError:  # Windows: en yüksek RSS okunamaz
+    resource = None
+
+logger = get_logger("metrics")
+
+# Çok worker'lı toplama klasörü; verilmezse yalnızca bu sürecin metrikleri sunulur
+METRICS_DIR = os.getenv("CREDITGUARD_METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("CREDITGUARD_METRICS_FLUSH_SECONDS", "1"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# İstek ve aşama gecikmeleri (saniye): 50 µs - 10 sn
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Model eğitimi süreleri (saniye)
+TRAINING_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+# Anlık değerlerin worker'lar üzerinden birleştirilme şekilleri
+GAUGE_AGGREGATIONS = {"sum": sum, "max": max, "min": min}
+
+# Etiketler sıralı (isim, değer) çiftleri olarak tutulur
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    """Tek bir iş parçacığının sayaç ve histogram değerleri."""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # Histogram: kova başına (kümülatif olmayan) sayılar + [toplam, adet]
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+class MetricsRegistry:
+    """
+    Süreç içi metrik kaydı.
+
+    Metrikler önce describe() ile tanımlanır; inc() ve observe() tanımlı
+    isimler için iş parçacığının kendi parçasına yazar.
+    """
+
+    def __init__(self, metrics_dir: Optional[str] = METRICS_DIR):
+        self.metrics_dir = metrics_dir
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}
+        self._gauge_aggregation: Dict[str, str] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Labels, float]]]] = []
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def describe(self, name: str, metric_type: str, help_text: str,
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS, aggregate: str = "sum") -> None:
+        """
+        Metrik tipini (counter, gauge, histogram) ve açıklamasını kaydeder.
+
+        aggregate, gauge'ların çalışan worker'lar üzerinden nasıl birleştirileceğidir
+        (sum, max, min); sayaç ve histogramlar her zaman toplanır.
+        """
+        if aggregate not in GAUGE_AGGREGATIONS:
+            raise ValueError(f"Bilinmeyen gauge birleştirme şekli: {aggregate}")
+        self._meta[name] = (metric_type, help_text, tuple(buckets))
+        self._gauge_aggregation[name] = aggregate
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        """Sayacı artırır (kilitsiz, iş parçacığının kendi parçasında)."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Histogram'a bir ölçüm ekler (kilitsiz, iş parçacığının kendi parçasında)."""
+        histograms = self._shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        buckets = self._meta[name][2]
+        if histogram is None:
+            histogram = [0.0] * (len(buckets) + 3)
+            histograms[key] = histogram
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, Labels, float]]]) -> None:
+        """Scrape anında (isim, etiketler, değer) üreten geri çağırma fonksiyonu ekler."""
+        self._collectors.append(collector)
+
+    def _local_totals(self) -> Dict[str, Dict[str, list]]:
+        """Bu sürecin tüm parçalarının toplamı ve anlık değerleri (JSON uyumlu)."""
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict() kopyası GIL altında tek adımda alınır; sahibi yazmaya devam edebilir
+            for key, value in dict(shard.counters).items():
+                counters[key] = counters.get(key, 0.0) + value
+            for key, values in dict(shard.histograms).items():
+                values = list(values)
+                total = histograms.get(key)
+                histograms[key] = values if total is None else [a + b for a, b in zip(total, values)]
+
+        gauges: Dict[Tuple[str, Labels], float] = {}
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    gauges[(name, labels)] = float(value)
+            except Exception as e:
+                logger.warning("Metrik toplayıcı hatası", extra=log_fields(error=str(e)))
+
+        def encode(items):
+            return [[name, [list(pair) for pair in labels], value] for (name, labels), value in items.items()]
+
+        return {'counters': encode(counters), 'histograms': encode(histograms), 'gauges': encode(gauges)}
+
+    def flush(self) -> None:
+        """Bu sürecin toplamlarını METRICS_DIR'e atomik olarak yazar (çok worker'lı mod)."""
+        if not self.metrics_dir:
+            return
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, f"worker-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), **self._local_totals()}, f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self) -> None:
+        """Çok worker'lı modda toplamları arka planda düzenli yazan iş parçacığını başlatır."""
+        if not self.metrics_dir or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(METRICS_FLUSH_SECONDS):
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning("Metrikler yazılamadı", extra=log_fields(error=str(e)))
+
+        self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self) -> None:
+        self._stop.set()
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def _worker_totals(self) -> List[dict]:
+        """Tüm worker'ların toplamları; bu süreç her zaman güncel değerleriyle eklenir."""
+        local = {'pid': os.getpid(), 'alive': True, **self._local_totals()}
+        if not self.metrics_dir or not os.path.isdir(self.metrics_dir):
+            return [local]
+        workers = [local]
+        for entry in os.listdir(self.metrics_dir):
+            if not (entry.startswith("worker-") and entry.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.metrics_dir, entry), encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get('pid') == local['pid']:
+                continue
+            data['alive'] = _pid_alive(data.get('pid'))
+            workers.append(data)
+        return workers
+
+    def render(self) -> str:
+        """Tüm worker'ların metriklerini Prometheus text formatında döndürür."""
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        gauges: Dict[Tuple[str, Labels], List[float]] = {}
+        for worker in self._worker_totals():
+            for name, labels, value in worker.get('counters', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0.0) + value
+            for name, labels, values in worker.get('histograms', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                total = histograms.get(key)
+                histograms[key] = list(values) if total is None else [a + b for a, b in zip(total, values)]
+            if not worker['alive']:
+                continue
+            # Anlık değerler yalnızca çalışan worker'lardan; metriğin birleştirme şekliyle
+            for name, labels, value in worker.get('gauges', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                gauges.setdefault(key, []).append(value)
+
+        lines: List[str] = []
+        by_name: Dict[str, List[str]] = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), values in gauges.items():
+            value = GAUGE_AGGREGATIONS[self._gauge_aggregation.get(name, "sum")](values)
+            by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), values in histograms.items():
+            buckets = self._meta.get(name, ('histogram', '', LATENCY_BUCKETS))[2]
+            series = by_name.setdefault(name, [])
+            cumulative = 0.0
+            for bound, count in zip(buckets + (float('inf'),), values):
+                cumulative += count
+                le = "+Inf" if bound == float('inf') else _format_value(bound)
+                series.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {_format_value(cumulative)}")
+            series.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+            series.append(f"{name}_count{_format_labels(labels)} {_format_value(values[-1])}")
+
+        for name in sorted(by_name):
+            metric_type, help_text, _ = self._meta.get(name, ('untyped', '', ()))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(by_name[name])
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (RSS, bayt); okunamıyorsa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döndürür
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class StageTimer:
+    """
+    Bir tahmin çağrısının aşamalarını ölçer.
+
+    path: "single" (tek başvuru) veya "batch" (bir predict_risk_batch çağrısı;
+    ölçüm tüm batch için tektir).
+
+    Örnek:
+        timer = StageTimer("single")
+        ...encode...
+        timer.mark("encoding")
+        ...predict_proba...
+        timer.mark("predict_proba")
+    """
+
+    __slots__ = ('_path', '_last')
+
+    def __init__(self, path: str = "single"):
+        self._path = path
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        registry.observe("creditguard_prediction_stage_seconds", now - self._last,
+                         (("path", self._path), ("stage", stage)))
+        self._last = now
+
+
+class MetricsMiddleware:
+    """
+    HTTP istek sayısı ve gecikmesini ölçen ASGI middleware'i.
+
+    BaseHTTPMiddleware yerine doğrudan ASGI olarak yazılmıştır (istek başına
+    ek görev/kuyruk yok). Yol etiketi, yüksek kardinaliteyi önlemek için ham
+    URL değil route şablonudur (ör. /retrain-model/{job_id}).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: Optional[Dict[object, str]] = None
+
+    def _route_path(self, scope) -> str:
+        if self._paths is None:
+            router = scope.get("app")
+            routes = getattr(router, "routes", [])
+            self._paths = {route.endpoint: route.path for route in routes if hasattr(route, "endpoint")}
+        return self._paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = self._route_path(scope)
+            labels = (("method", scope["method"]), ("path", path), ("status", str(status_holder[0])))
+            registry.inc("creditguard_http_requests_total", labels)
+            if status_holder[0] >= 400:
+                registry.inc("creditguard_http_errors_total", labels)
+            registry.observe("creditguard_http_request_duration_seconds", time.perf_counter() - started,
+                             (("method", scope["method"]), ("path", path)))
+
+
+# Süreç genelindeki metrik kaydı
+registry = MetricsRegistry()
+
+registry.describe("creditguard_http_requests_total", "counter", "HTTP istek sayısı (yöntem, route, durum kodu)")
+registry.describe("creditguard_http_errors_total", "counter", "4xx/5xx ile biten HTTP istek sayısı")
+registry.describe("creditguard_http_request_duration_seconds", "histogram", "HTTP istek süresi (saniye)")
+registry.describe("creditguard_prediction_stage_seconds", "histogram",
+                  "Tahmin aşama süreleri: validation, encoding, cache, predict_proba, explanation (saniye)")
+registry.describe("creditguard_predictions_total", "counter", "Skorlanan başvuru sayısı (tekil/toplu, önbellek)")
+registry.describe("creditguard_training_duration_seconds", "histogram", "Model eğitim süresi (saniye)",
+                  buckets=TRAINING_BUCKETS)
+registry.describe("creditguard_trainings_total", "counter", "Model eğitimi sayısı (mod, sonuç)")
@@ -5,23 +5,55 @@ Model eğitimi, tahmin ve performans metriklerini yönetir.
 
 import pandas as pd
 import numpy as np
-from sklearn.datasets import fetch_openml
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import contextlib
+import csv
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
 import warnings
+import joblib
+import sklearn
+from schemas import validate_application
+from dataset import dataset_available, load_credit_dataset, missing_dataset_message
+from forest_engine import FlatForest
+from prediction_cache import PredictionCache, feature_vector_key
+from explanations import ExplanationEngine
+from thresholds import RECALL_FALLBACK_THRESHOLD, threshold_curve, select_threshold, curve_to_json
+from incremental import TrainingState, prune_training_rows, rolling_update, trees_to_replace
+from sample_store import SampleStore
+from drift import DriftBaseline, DriftMonitor
+from shadow import ShadowEvaluator
+from shared_state import (LabeledOutcomeStore, RetrainJobStore, file_lock, published_version_signature,
+                          read_published_version, write_published_version)
+import metrics
+from app_logging import get_logger, log_fields
 
 warnings.filterwarnings('ignore')
 
+logger = get_logger("ml_service")
 
-def create_domain_features(df):
+
+def create_domain_features(df, inplace=False):
     """
     Bankacılık alan bilgisi ile özellik mühendisliği yapar.
     Ödeme gücünü belirleyen oranları hesaplar.
+    
+    inplace=True ise sütunlar verilen DataFrame'e eklenir (eğitimde büyük veri
+    setinin kopyalanmaması için); aksi halde kopya döndürülür.
     """
-    df_new = df.copy()
+    df_new = df if inplace else df.copy()
     # Aylık Ödeme Yükü: Kredi Tutarı / Vade
     if 'credit_amount' in df_new.columns and 'duration' in df_new.columns:
         df_new['payment_per_month'] = df_new['credit_amount'] / df_new['duration']
@@ -32,12 +64,45 @@ def create_domain_features(df):
 
 
 # Global değişkenler
+# Not: Tahmin yolu yalnızca current_snapshot'ı okur; aşağıdaki tekil değişkenler
+# geriye dönük uyumluluk için her yayında snapshot'tan güncellenir.
+current_snapshot = None  # Yayındaki model anlık görüntüsü (ModelSnapshot)
 trained_model: RandomForestClassifier = None
 encoders: Dict[str, LabelEncoder] = {}
 model_metrics: Dict[str, Any] = {}
 feature_names: List[str] = []
 optimal_threshold: float = 0.5  # Tahmin threshold'u (0.5 = varsayılan)
-original_dataset: pd.DataFrame = None  # Orijinal veri seti (encode edilmemiş, örnek veri için)
+sample_store: Optional[SampleStore] = None  # Örnek veri deposu (encode edilmemiş satırlar, /sample-data için)
+feature_plan = None  # Tek satırlık tahmin için derlenmiş özellik planı (FeaturePlan)
+model_version: Optional[str] = None  # Yüklü modelin sürümü (artifact ile birlikte saklanır)
+dataset_fingerprint: Optional[str] = None  # Modelin eğitildiği veri setinin özeti (sha256)
+
+# Encode edilmiş feature vektörüne göre tahmin önbelleği (snapshot değişince boşalır)
+prediction_cache = PredictionCache()
+
+# Canlı başvuruların eğitim dağılımına göre kayması (snapshot'ın drift_baseline'ı ile)
+drift_monitor = DriftMonitor()
+
+# Yanıttaki karar bantları: (risk_score üst sınırı, karar, risk seviyesi)
+DECISION_BANDS = (
+    (35, "APPROVE", "Low"),  # 0-35: Düşük Risk
+    (55, "REVIEW", "Medium"),  # 36-55: Orta Risk
+    (100, "REJECT", "High"),  # 56-100: Yüksek Risk
+)
+
+# Aday (challenger) modelin canlı trafikle arka planda karşılaştırılması
+shadow_evaluator = ShadowEvaluator(DECISION_BANDS)
+
+# /model-performance yanıtı: her snapshot yayınında bir kez serileştirilir (PerformancePayload)
+performance_payload = None
+
+# Model yaşam döngüsü durumu (MODEL_STATES); /health eğitim başlatmadan buradan okur.
+# Servis yalnızca "ready" durumunda (model yüklü ve ısınmış) hazır sayılır.
+MODEL_STATES = ("not_loaded", "loading", "training", "warming_up", "ready", "failed")
+model_status: Dict[str, Any] = {"state": "not_loaded", "since": None, "error": None}
+
+# Başlangıçta ısınma için skorlanan sentetik başvuru sayısı (0: ısınma yok)
+WARMUP_ROWS = int(os.getenv("CREDITGUARD_WARMUP_ROWS", "64"))
 
 # Model ağırlık ayarı: Riskli müşteriyi (1) kaçırmak ne kadar kötü?
 # Örnek: RISK_WEIGHT = 10.0 -> Bir riskli müşteriyi kaçırmak, 10 iyi müşteriyi üzmekten daha kötü
@@ -47,196 +112,1114 @@ RISK_WEIGHT = 10.0  # Bu değeri artırarak Recall'ı yükseltebilirsiniz (5.0,
 # Düşük threshold = Daha fazla riskli yakalama, daha fazla yanlış alarm
 PREDICTION_THRESHOLD = 0.35  # 0.5 yerine 0.35 kullanarak daha fazla riskli yakalayalım
 
+# Threshold arama hedefi (thresholds.THRESHOLD_OBJECTIVES):
+# "recall_f1": Recall >= TARGET_MIN_RECALL iken F1 en yüksek
+# "cost": FN * RISK_WEIGHT + FP en düşük
+# "precision_floor": Precision >= TARGET_MIN_PRECISION iken Recall en yüksek
+THRESHOLD_OBJECTIVE = os.getenv("CREDITGUARD_THRESHOLD_OBJECTIVE", "recall_f1")
+TARGET_MIN_RECALL = 0.80
+TARGET_MIN_PRECISION = 0.60
+
+# Varsayılan model hiperparametreleri; tuning çıktısı (TUNED_CONFIG_PATH) varsa üzerine yazılır
+DEFAULT_TRAINING_CONFIG = {
+    'risk_weight': RISK_WEIGHT,       # class_weight: {0: 1, 1: risk_weight}
+    'n_estimators': 200,              # Stabilite için artırıldı
+    'max_depth': None,                # Derinliği serbest bırak (karmaşık riskleri yakalasın)
+    'min_samples_leaf': 2,            # Ezberlemeyi (overfitting) önlemek için yaprak başına min 2 örnek
+    'max_features': 'sqrt',           # RandomForestClassifier varsayılanı
+    'target_min_recall': TARGET_MIN_RECALL,
+}
+TUNED_CONFIG_PATH = os.getenv(
+    "CREDITGUARD_TUNED_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "tuned_config.json")
+)
+
+# Toplu (stream) skorlamada bir seferde skorlanan satır sayısı
+STREAM_CHUNK_SIZE = 1000
+# Ağdan akan girdide tek bir kaydın (CSV'de tırnak içi satır sonları dahil) en fazla uzunluğu
+STREAM_MAX_RECORD_CHARS = 1024 * 1024
+
+# Eğitilmiş model artifact'ı: train_model tarafından yazılır, başlangıçta memory-map ile yüklenir
+# Format değiştiğinde sürüm artırılır; uyumsuz artifact'lar yüklenmez (model yeniden eğitilir)
+ARTIFACT_FORMAT_VERSION = 1
+MODEL_ARTIFACT_PATH = os.getenv(
+    "CREDITGUARD_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "credit_model.joblib")
+)
+
+# Artımlı eğitim için eğitim satırlarının (incremental.TrainingRows) yazıldığı dizin;
+# artifact yalnızca dosya adını ve satır sayısını saklar
+TRAINING_ROWS_DIR = os.getenv("CREDITGUARD_TRAINING_ROWS_DIR", f"{MODEL_ARTIFACT_PATH}.rows")
+
+# Gölge (challenger) model artifact'ı: verilmişse başlangıçta yüklenir ve canlı trafikle karşılaştırılır
+SHADOW_MODEL_PATH = os.getenv("CREDITGUARD_SHADOW_MODEL_PATH")
 
-def train_model():
+# Worker'ların yayındaki artifact'ın sürüm dosyasını kontrol etme aralığı (0: kapalı)
+MODEL_SYNC_SECONDS = float(os.getenv("CREDITGUARD_MODEL_SYNC_SECONDS", "2"))
+
+# Çıkarım motoru: "sklearn" (model.predict_proba) veya "flat" (düzleştirilmiş dizi motoru, FlatForest)
+INFERENCE_ENGINE = os.getenv("CREDITGUARD_INFERENCE_ENGINE", "sklearn")
+
+# Frontend'den gelen feature isimlerini veri setindeki gerçek feature isimlerine map et
+# German Credit Data feature mapping
+FEATURE_NAME_MAPPING = {
+    'saving_status': 'savings_status',  # Frontend'de 'saving_status', veri setinde 'savings_status'
+}
+
+# Eksik özellikleri doldurmak için varsayılan değerler (model eğitimi sırasında kullanılan tüm feature'lar için)
+# Önemli: Eksik feature'lar için veri setindeki en yaygın (median/mode) değerler kullanılır
+DEFAULT_VALUES: Dict[str, Any] = {
+    'credit_history': 'existing paid',  # En yaygın değer
+    'employment': '1<=X<4',  # En yaygın değer
+    'installment_commitment': 3,  # Ortalama değer
+    'personal_status': 'male single',  # En yaygın değer
+    'other_parties': 'none',  # En yaygın değer
+    'residence_since': 2,  # Ortalama değer
+    'property_magnitude': 'real estate',  # En yaygın değer
+    'age': 35,  # Ortalama yaş
+    'other_payment_plans': 'none',  # En yaygın değer
+    'housing': 'own',  # En yaygın değer
+    'existing_credits': 1,  # Ortalama değer
+    'job': 'skilled',  # En yaygın değer
+    'num_dependents': 1,  # Ortalama değer
+    'own_telephone': 'none',  # En yaygın değer
+    'foreign_worker': 'yes'  # En yaygın değer
+}
+
+# create_domain_features ile üretilen oran feature'ları: (feature, pay, payda)
+DERIVED_FEATURES = [
+    ('payment_per_month', 'credit_amount', 'duration'),
+    ('credit_age_ratio', 'credit_amount', 'age'),
+]
+
+
+class FeaturePlan:
     """
-    German Credit Data ile model eğitir ve performans metriklerini hesaplar.
+    Tek satırlık tahmin için önceden derlenmiş özellik planı.
+
+    train_model sonunda bir kez oluşturulur. Giriş verisini DataFrame kurmadan,
+    sözlük tabanlı kategori -> kod tabloları ve önceden hesaplanmış varsayılan
+    kodlarla doğrudan float32 NumPy satırına çevirir. Çıktısı pandas referans
+    yolu (encode_input_frame) ile birebir aynıdır.
     """
-    global trained_model, encoders, model_metrics, feature_names, original_dataset
+
+    def __init__(self, feature_names: List[str], encoders: Dict[str, LabelEncoder],
+                 default_values: Dict[str, Any] = DEFAULT_VALUES):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+
+        # Kategori -> kod tabloları (LabelEncoder.transform ile aynı kodlar).
+        # Bilinmeyen değerler ilk sınıfa (kod 0) düşer.
+        self.category_codes: Dict[str, Dict[str, np.int64]] = {
+            col: {str(cls): np.int64(code) for code, cls in enumerate(encoder.classes_)}
+            for col, encoder in encoders.items()
+            if col in self.index
+        }
+
+        # Varsayılan satır ve DataFrame yolundaki sütun skalerleri (açıklama için)
+        self.default_row = np.zeros(self.n_features, dtype=np.float32)
+        self.default_values: Dict[str, Any] = {}
+        for name, slot in self.index.items():
+            value = np.int64(0)  # Bilinmeyen feature için 0
+            if name in default_values:
+                default_val = default_values[name]
+                if name in self.category_codes:
+                    value = self.category_codes[name].get(str(default_val), np.int64(0))
+                else:
+                    value = np.asarray(default_val)[()]
+            self.default_row[slot] = value
+            self.default_values[name] = value
+
+        self.derived = [
+            (name, numerator, denominator)
+            for name, numerator, denominator in DERIVED_FEATURES
+            if name in self.index
+        ]
+
+    def encode(self, input_data: Dict[str, Any]):
+        """
+        Giriş verisini modelin beklediği (1, n_features) float32 satırına çevirir.
+
+        Returns:
+            (row, values): float32 satır ve açıklama için feature -> değer sözlüğü
+            (değerler DataFrame yolundaki sütun skalerleriyle aynı tiptedir)
+        """
+        for frontend_name, dataset_name in FEATURE_NAME_MAPPING.items():
+            if frontend_name in input_data and dataset_name in self.index:
+                input_data = dict(input_data)
+                input_data[dataset_name] = input_data.pop(frontend_name)
+
+        row = self.default_row.copy()
+        values = dict(self.default_values)
+        index = self.index
+        category_codes = self.category_codes
+
+        for name, value in input_data.items():
+            slot = index.get(name)
+            if slot is None:
+                continue
+            codes = category_codes.get(name)
+            if codes is not None:
+                value = codes.get(str(value), np.int64(0))
+            else:
+                value = np.asarray(value)[()]
+            row[slot] = value
+            values[name] = value
+
+        # Alan bilgisi ile özellik mühendisliği (create_domain_features ile aynı)
+        for name, numerator, denominator in self.derived:
+            if numerator in input_data and denominator in input_data:
+                value = np.float64(input_data[numerator]) / np.float64(input_data[denominator])
+                row[index[name]] = value
+                values[name] = value
+
+        return row.reshape(1, -1), values
+
+    def encode_batch(self, records: List[Dict[str, Any]]):
+        """
+        Birden çok başvuruyu sütun bazlı tek geçişte (n, n_features) float32 matrise çevirir.
+
+        Her satır için encode() ile aynı sonucu üretir.
+
+        Returns:
+            (X, values): float32 matris ve satır başına açıklama değerleri sözlükleri
+        """
+        records = list(records)
+        for frontend_name, dataset_name in FEATURE_NAME_MAPPING.items():
+            if dataset_name in self.index:
+                records = [
+                    {**{k: v for k, v in record.items() if k != frontend_name},
+                     dataset_name: record[frontend_name]}
+                    if frontend_name in record else record
+                    for record in records
+                ]
+
+        n_rows = len(records)
+        X = np.tile(self.default_row, (n_rows, 1))
+        values = [dict(self.default_values) for _ in range(n_rows)]
+
+        for name, slot in self.index.items():
+            rows = [i for i, record in enumerate(records) if name in record]
+            if not rows:
+                continue
+            codes = self.category_codes.get(name)
+            if codes is not None:
+                column = [codes.get(str(records[i][name]), np.int64(0)) for i in rows]
+            else:
+                column = [np.asarray(records[i][name])[()] for i in rows]
+            X[rows, slot] = column
+            for i, value in zip(rows, column):
+                values[i][name] = value
+
+        # Alan bilgisi ile özellik mühendisliği (vektörel)
+        for name, numerator, denominator in self.derived:
+            rows = [i for i, record in enumerate(records) if numerator in record and denominator in record]
+            if not rows:
+                continue
+            column = (
+                np.array([records[i][numerator] for i in rows], dtype=np.float64)
+                / np.array([records[i][denominator] for i in rows], dtype=np.float64)
+            )
+            X[rows, self.index[name]] = column
+            for i, value in zip(rows, column):
+                values[i][name] = value
+
+        return X, values
+
+    def unknown_categories(self, records: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+        """
+        Encoder sözlüğünde olmayan kategorik değerleri bulur (encode'da koda 0 düşenler).
+
+        Verilmeyen (varsayılanla doldurulan) alanlar bilinmeyen sayılmaz.
+
+        Returns:
+            Her bilinmeyen değer için (feature sırası, değer) çiftleri
+        """
+        aliases = {frontend_name: dataset_name for frontend_name, dataset_name in FEATURE_NAME_MAPPING.items()
+                   if dataset_name in self.index}
+        unknown = []
+        for record in records:
+            for name, value in record.items():
+                name = aliases.get(name, name)
+                codes = self.category_codes.get(name)
+                if codes is not None and str(value) not in codes:
+                    unknown.append((self.index[name], str(value)))
+        return unknown
+
+
+def build_scorer(forest: FlatForest, engine: str = None):
+    """
+    Dağıtımda seçilen çıkarım motorunu döndürür; her ikisi de predict_proba(X) sunar.
     
-    # Eğer model zaten eğitilmişse tekrar eğitme
-    if trained_model is not None:
-        print("Model zaten eğitilmiş, tekrar eğitiliyor...")
+    "flat": ağaçlar bitişik dizilere aktarılır ve tek satırlık tahminlerde
+    joblib dağıtımı olmadan vektörel olarak dolaşılır (FlatForest).
+    "sklearn": modelin kendi predict_proba'sı kullanılır.
+    """
+    engine = engine or INFERENCE_ENGINE
+    model = forest.model
+    if engine == "flat":
+        return forest
+    if engine != "sklearn":
+        logger.warning("Bilinmeyen çıkarım motoru, sklearn kullanılıyor", extra=log_fields(engine=engine))
+    return model
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    Tahmin için gereken her şeyi bir arada tutan değişmez model anlık görüntüsü.
     
-    print("Veri seti yükleniyor... (Bu işlem birkaç saniye sürebilir)")
-    # German Credit Data'yı yükle (data_id=31 kullanarak daha güvenilir)
-    data = None
-    last_error = None
+    Model, encoder'lar, threshold ve metrikler birlikte üretilir ve tek bir
+    referans ataması ile yayınlanır. Tahmin fonksiyonları snapshot'ı bir kez
+    okuyup yalnızca onu kullandığı için, yeniden eğitim sırasında gelen
+    istekler her zaman ya tamamen eski ya da tamamen yeni modeli görür.
+    """
+    model: RandomForestClassifier
+    encoders: Dict[str, LabelEncoder]
+    feature_names: List[str]
+    optimal_threshold: float
+    model_metrics: Dict[str, Any]
+    feature_plan: FeaturePlan
+    sample_store: Optional[SampleStore]  # Örnek satırlar (tam veri seti kopyası tutulmaz)
+    model_version: str
+    dataset_fingerprint: str
+    forest: FlatForest  # Düzleştirilmiş ağaç dizileri ve yerel katkı yol istatistikleri
+    scorer: Any  # predict_proba sunan çıkarım motoru (model veya forest)
+    explainer: ExplanationEngine  # Model başına derlenmiş açıklama motoru
+    training_state: Optional[TrainingState] = None  # Artımlı yeniden eğitim için eğitim/holdout satırları
+    drift_baseline: Optional[DriftBaseline] = None  # Eğitim dağılımının kovalanmış özeti (drift izleme)
+
+
+@dataclass(frozen=True)
+class PerformancePayload:
+    """Snapshot'ın /model-performance yanıtı: hazır JSON baytları ve ETag."""
+    body: bytes
+    etag: str
+    model_version: str
+
+
+def build_performance_payload(snapshot: ModelSnapshot) -> Optional[PerformancePayload]:
+    """
+    Performans yanıtını bir kez serileştirir (FastAPI'nin JSON biçimiyle aynı).
+
+    ETag gövdenin özetidir; aynı metrikler için istekler 304 ile cevaplanabilir.
+    Metrikleri olmayan snapshot için None döner.
+    """
+    try:
+        performance = get_model_metrics(snapshot)
+    except ValueError:
+        return None
+    body = json.dumps(performance, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return PerformancePayload(body=body, etag=etag, model_version=snapshot.model_version)
+
+
+def set_model_state(state: str, error: str = None, **details) -> None:
+    """Model yaşam döngüsü durumunu günceller (tek referans ataması)."""
+    global model_status
+    model_status = {"state": state, "since": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "error": error, **details}
+
+
+def publish_snapshot(snapshot: ModelSnapshot) -> None:
+    """
+    Yeni model snapshot'ını atomik olarak yayına alır.
     
-    # Önce data_id=31 ile deneyelim (daha güvenilir)
+    Tek referans ataması CPython'da atomiktir; devam eden tahminler ellerindeki
+    eski snapshot ile tamamlanır, sonraki istekler yenisini kullanır.
+    """
+    global current_snapshot, trained_model, encoders, model_metrics, feature_names, sample_store
+    global feature_plan, optimal_threshold, model_version, dataset_fingerprint, performance_payload
+    
+    # Performans yanıtı snapshot ile birlikte hazırlanır; istek yolunda serileştirme yapılmaz
+    payload = build_performance_payload(snapshot)
+    current_snapshot = snapshot
+    performance_payload = payload
+    
+    # Geriye dönük uyumluluk için tekil değişkenleri güncelle
+    trained_model = snapshot.model
+    encoders = snapshot.encoders
+    model_metrics = snapshot.model_metrics
+    feature_names = snapshot.feature_names
+    sample_store = snapshot.sample_store
+    feature_plan = snapshot.feature_plan
+    optimal_threshold = snapshot.optimal_threshold
+    model_version = snapshot.model_version
+    dataset_fingerprint = snapshot.dataset_fingerprint
+    
+    # Önceki modelin önbelleğe alınmış tahminleri artık geçersiz
+    prediction_cache.clear()
+    # Baseline değiştiyse (tam yeniden eğitim) drift pencereleri sıfırlanır
+    drift_monitor.reset(snapshot.drift_baseline, snapshot.feature_plan, snapshot.model_version)
+
+
+def get_snapshot() -> ModelSnapshot:
+    """Yayındaki model snapshot'ını döndürür; model yoksa ValueError fırlatır."""
+    snapshot = current_snapshot
+    if snapshot is None:
+        raise ValueError("Model henüz eğitilmemiş. Önce train_model() çağrılmalı.")
+    return snapshot
+
+
+# İlk model yüklemesi/eğitiminin tek seferde yapılması için kilit
+_model_lock = threading.Lock()
+
+
+def artifact_lock(path: str = None):
+    """
+    Aynı artifact'ı yükleyen/eğiten süreçler arasında özel dosya kilidi.
+    
+    uvicorn --workers N ile başlayan worker'lardan yalnızca biri eğitim yapar;
+    diğerleri kilidi bekler ve yazılan artifact'ı yükler. fcntl olmayan
+    platformlarda veya kilit dosyası açılamazsa kilitsiz devam edilir.
+    """
+    return file_lock(path or MODEL_ARTIFACT_PATH)
+
+
+def _load_or_train() -> ModelSnapshot:
+    """Artifact'ı yükler, yoksa eğitip yazar (_model_lock altında çağrılır)."""
     try:
-        print("  -> data_id=31 ile deneniyor...")
-        data = fetch_openml(data_id=31, as_frame=True, parser='auto')
-        print("  -> Veri seti başarıyla yüklendi (data_id=31)")
-    except Exception as e1:
-        last_error = e1
-        print(f"  -> data_id=31 başarısız, name ile deneniyor...")
-        try:
-            # Alternatif: name ile version olmadan
-            data = fetch_openml(name='credit-g', as_frame=True, parser='auto')
-            print("  -> Veri seti başarıyla yüklendi (name='credit-g')")
-        except Exception as e2:
-            last_error = e2
-            print(f"  -> name ile yükleme başarısız, data_id=42402 deneniyor...")
+        set_model_state("loading")
+        with artifact_lock():
+            # Kilit beklenirken başka bir worker artifact'ı yazmış olabilir
+            if not load_model_artifact():
+                logger.info("Model henüz eğitilmemiş, eğitim başlatılıyor")
+                set_model_state("training")
+                train_model()
+                logger.info("Model eğitimi tamamlandı")
+    except Exception as e:
+        set_model_state("failed", error=str(e))
+        raise
+    return current_snapshot
+
+
+def check_model_source() -> None:
+    """
+    Yüklenecek artifact da eğitilecek veri seti de yoksa hemen hata verir.
+
+    Depoda veri seti bulunmaz; yeni bir kurulumda sunucu hazır olmayı beklemek
+    yerine başlangıçta ne yapılması gerektiğini söyleyerek durur.
+
+    Raises:
+        RuntimeError: Artifact ve yerel veri seti yoksa (ve indirme kapalıysa)
+    """
+    if os.path.exists(MODEL_ARTIFACT_PATH) or dataset_available():
+        return
+    message = f"Model artifact'ı yok ({MODEL_ARTIFACT_PATH}) ve eğitim için {missing_dataset_message()}"
+    set_model_state("failed", error=message)
+    logger.error("Model hazırlanamaz", extra=log_fields(error=message))
+    raise RuntimeError(message)
+
+
+def ensure_model() -> ModelSnapshot:
+    """
+    Model yüklü değilse artifact'tan yükler, o da yoksa eğitir (lazy loading).
+    
+    Aynı anda gelen istekler tek bir yükleme/eğitim bekler; ikinci bir eğitim başlatılmaz.
+    """
+    snapshot = current_snapshot
+    if snapshot is not None:
+        return snapshot
+    
+    with _model_lock:
+        if current_snapshot is not None:
+            return current_snapshot
+        snapshot = _load_or_train()
+        set_model_state("ready")
+        return snapshot
+
+
+def prepare_model(warmup_rows: int = None) -> ModelSnapshot:
+    """
+    Başlangıç yaşam döngüsü: modeli yükler/eğitir, ısıtır ve hazır işaretler.
+    
+    Hazır olma (model_status "ready") ısınma bittikten sonra bildirilir; böylece
+    yük dengeleyici /health üzerinden yalnızca ısınmış worker'lara istek yönlendirir.
+    """
+    warmup_rows = WARMUP_ROWS if warmup_rows is None else warmup_rows
+    with _model_lock:
+        snapshot = current_snapshot or _load_or_train()
+        if model_status["state"] == "ready":
+            return snapshot
+        if SHADOW_MODEL_PATH and not shadow_evaluator.enabled:
             try:
-                # Son alternatif: farklı data_id
-                data = fetch_openml(data_id=42402, as_frame=True, parser='auto')
-                print("  -> Veri seti başarıyla yüklendi (data_id=42402)")
-            except Exception as e3:
-                last_error = e3
-                raise Exception(f"Veri seti yüklenemedi. Tüm yöntemler başarısız oldu. Son hata: {str(e3)}")
+                load_shadow_model(SHADOW_MODEL_PATH)
+            except ValueError as e:
+                # Gölge model olmadan hizmet verilir
+                logger.warning("Gölge model yüklenemedi", extra=log_fields(error=str(e)))
+        set_model_state("warming_up")
+        try:
+            warmup_ms = warm_up_model(snapshot, warmup_rows)
+        except Exception as e:
+            # Isınma hatası modeli kullanılamaz yapmaz; ilk istekler yolları ısıtır
+            logger.exception("Model ısınması başarısız")
+            set_model_state("ready", error=f"Isınma başarısız: {str(e)}")
+            return snapshot
+        set_model_state("ready", warmup_ms=warmup_ms)
+        logger.info("Model hazır", extra=log_fields(model_version=snapshot.model_version, warmup_ms=warmup_ms))
+        return snapshot
+
+
+def warmup_records(snapshot: ModelSnapshot, rows: int) -> List[Dict[str, Any]]:
+    """Encoder sözlüklerini sırayla dolaşan deterministik sentetik başvurular."""
+    records = []
+    for i in range(rows):
+        record = {
+            'duration': 6 + (i * 7) % 60,
+            'credit_amount': float(500 + (i * 997) % 15000),
+            'age': 20 + (i * 13) % 55,
+        }
+        for col, encoder in snapshot.encoders.items():
+            record[col] = encoder.classes_[i % len(encoder.classes_)]
+        records.append(record)
+    return records
+
+
+def warm_up_model(snapshot: ModelSnapshot, rows: int = WARMUP_ROWS) -> float:
+    """
+    Tahmin yollarını (encode, predict_proba, açıklama, yerel katkılar, batch)
+    istek gelmeden önce çalıştırır: memory-map edilmiş dizilerin sayfaları,
+    çıkarım thread havuzu ve tembel ilklendirmeler ilk kullanıcıyı bekletmez.
     
-    if data is None:
-        raise Exception(f"Veri seti yüklenemedi: {str(last_error)}")
+    Sonuçlar tahmin önbelleğine ve tahmin metriklerine yazılmaz.
     
-    df = data.frame
+    Returns:
+        Isınma süresi (ms)
+    """
+    started = time.perf_counter()
+    if rows <= 0:
+        return 0.0
+    records = warmup_records(snapshot, rows)
+    for record in records[:8]:
+        X_input, feature_values = snapshot.feature_plan.encode(record)
+        risk_proba = snapshot.scorer.predict_proba(X_input)[0, 1]
+        explanation = snapshot.explainer.explain(feature_values, record)
+        build_prediction_result(snapshot, risk_proba, feature_values, record, explanation)
+    X_batch, _ = snapshot.feature_plan.encode_batch(records)
+    snapshot.scorer.predict_proba(X_batch)
+    compute_local_attributions(snapshot, X_batch[:1])
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+@contextlib.contextmanager
+def record_training(mode: str):
+    """Eğitim süresini ve sonucunu (succeeded / failed) metriklere yazar."""
+    started = time.perf_counter()
+    status = "failed"
+    try:
+        yield
+        status = "succeeded"
+    finally:
+        labels = (("mode", mode),)
+        metrics.registry.observe("creditguard_training_duration_seconds", time.perf_counter() - started, labels)
+        metrics.registry.inc("creditguard_trainings_total", labels + (("status", status),))
+
+
+def train_model(save_artifact: bool = True, source_path: str = None, chunk_size: int = None,
+                work_dir: str = None):
+    """
+    German Credit Data ile model eğitir, yeni modeli yayına alır ve performans metriklerini döndürür.
     
-    # Alan bilgisi ile özellik mühendisliği uygula
-    df = create_domain_features(df)
+    Args:
+        save_artifact: True ise eğitilen model MODEL_ARTIFACT_PATH'e yazılır
+        source_path: Verilirse bu CSV / Parquet dosyası belleğe yüklenmeden
+            parça parça eğitilir (chunked_training); chunk_size ve work_dir bu modda kullanılır
+    """
+    # Eğer model zaten eğitilmişse tekrar eğitme
+    if current_snapshot is not None:
+        logger.info("Model zaten eğitilmiş, tekrar eğitiliyor")
+    
+    if source_path is None:
+        with record_training("full"):
+            snapshot = fit_model_snapshot()
+    else:
+        from chunked_training import fit_chunked_snapshot
+        with record_training("chunked"):
+            snapshot = fit_chunked_snapshot(source_path, chunk_size=chunk_size, work_dir=work_dir)
+    publish_snapshot(snapshot)
     
-    # Orijinal veri setini global olarak sakla (örnek veri için)
-    original_dataset = df.copy()
+    if save_artifact:
+        try:
+            save_model_artifact(snapshot=snapshot)
+        except OSError as e:
+            # Artifact yazılamazsa model bellekte kullanılmaya devam eder
+            logger.warning("Model artifact'ı yazılamadı", extra=log_fields(error=str(e)))
     
-    print(f"Veri seti yüklendi: {len(df)} örnek, {len(df.columns)} özellik")
-    print(f"  -> Veri seti sütunları: {list(df.columns)}")
+    return snapshot.model_metrics
+
+
+def encode_categorical_column(series: pd.Series):
+    """
+    Kategorik sütunu LabelEncoder().fit_transform(series.astype(str)) ile aynı
+    sonuçla encode eder.
+    
+    Kategorik tipte sütunlar için tüm sütunun string kopyası oluşturulmaz:
+    encoder yalnızca veride geçen kategoriler (ve varsa eksik değer) üzerinde
+    fit edilir, satırların pandas kategori kodları bir arama tablosuyla
+    encoder sınıf indekslerine çevrilir.
+    
+    Returns:
+        (codes, encoder): satır başına sınıf indeksi ve fit edilmiş LabelEncoder
+    """
+    encoder = LabelEncoder()
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return encoder.fit_transform(series.astype(str)), encoder
+    
+    codes = series.cat.codes.to_numpy()
+    n_categories = len(series.cat.categories)
+    present = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=n_categories))
+    missing = bool((codes < 0).any())
+    # Her farklı değerden bir temsilci: string dönüşümü ve sıralama LabelEncoder'a bırakılır
+    representatives = pd.Series(pd.Categorical.from_codes(
+        np.append(present, -1) if missing else present, dtype=series.dtype))
+    representative_codes = encoder.fit_transform(representatives.astype(str))
+    
+    # Son eleman eksik değerlerin (kod -1) karşılığıdır
+    lookup = np.zeros(n_categories + 1, dtype=np.int16)
+    lookup[present] = representative_codes[:len(present)]
+    if missing:
+        lookup[-1] = representative_codes[-1]
+    return lookup[codes], encoder
+
+
+def prepare_training_data():
+    """
+    Veri setini yükler, alan özelliklerini ekler ve kategorik sütunları encode eder.
+    
+    Eğitim (fit_model_snapshot) ve hiperparametre araması (tuning) aynı
+    hazırlığı kullanır.
+    
+    Bellek: DataFrame kopyalanmaz (alan özellikleri yerinde eklenir),
+    kategorik sütunlar kategori kodlarından encode edilir ve feature matrisi
+    tek seferde ayrılan float32 bir diziye sütun sütun yazılır.
+    
+    Returns:
+        (df, X, y, encoders, feature_names, fingerprint): df alan özellikleri
+        eklenmiş, encode edilmemiş veri seti; X float32 (satır, feature)
+        matrisi; y int8 hedef (1 = Riskli, 0 = Güvenli)
+    """
+    logger.info("Veri seti yükleniyor")
+    # German Credit Data'yı yerel kaynaktan / önbellekten yükle (gerekirse OpenML'e düşer)
+    df = load_credit_dataset()
+    fingerprint = compute_dataset_fingerprint(df)
+    
+    # Alan bilgisi ile özellik mühendisliği uygula
+    create_domain_features(df, inplace=True)
+    
+    logger.info("Veri seti yüklendi", extra=log_fields(rows=len(df), columns=len(df.columns)))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Veri seti sütunları", extra=log_fields(columns=list(df.columns)))
     
     # Target değişkenini hazırla: 'bad' -> 1 (Riskli), 'good' -> 0 (Güvenli)
-    df['target'] = df['class'].map({'bad': 1, 'good': 0})
+    y = (df['class'] == 'bad').to_numpy(dtype=np.int8)
     
     # Kategorik sütunları belirle
     categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
     if 'class' in categorical_columns:
         categorical_columns.remove('class')
     
-    print(f"  -> Kategorik sütunlar: {categorical_columns}")
+    logger.debug("Kategorik sütunlar", extra=log_fields(columns=categorical_columns))
     
-    # Kategorik verileri encode et
+    # Tüm feature'ları kullan (kategorik encode edilmiş + numeric), veri setindeki sırayla
+    feature_columns = [col for col in df.columns if col not in ['target', 'class']]
+    X = np.empty((len(df), len(feature_columns)), dtype=np.float32)
     encoders = {}
-    df_encoded = df.copy()
-    
-    for col in categorical_columns:
-        le = LabelEncoder()
-        df_encoded[col] = le.fit_transform(df[col].astype(str))
-        encoders[col] = le
-        # Her kategorik sütunun benzersiz değerlerini göster
-        unique_values = df[col].unique()
-        print(f"  -> {col} benzersiz değerleri ({len(unique_values)} adet): {list(unique_values)[:10]}...")  # İlk 10 değer
-    
-    # Tüm feature'ları kullan (kategorik encode edilmiş + numeric)
-    feature_columns = [col for col in df_encoded.columns if col not in ['target', 'class']]
-    X = df_encoded[feature_columns]
-    y = df_encoded['target']
-    
-    feature_names = feature_columns
-    print(f"  -> Model eğitimi için {len(feature_columns)} feature kullanılıyor")
-    print(f"  -> Feature isimleri: {feature_columns}")
-    
-    # Veriyi %80 eğitim, %20 test olarak ayır
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
     
-    print(f"Eğitim seti: {len(X_train)} örnek")
-    print(f"Test seti: {len(X_test)} örnek")
+    for index, col in enumerate(feature_columns):
+        if col not in categorical_columns:
+            X[:, index] = df[col].to_numpy()
+            continue
+        X[:, index], encoders[col] = encode_categorical_column(df[col])
+        # Her kategorik sütunun benzersiz değerleri (yalnızca DEBUG açıkken hesaplanır)
+        if logger.isEnabledFor(logging.DEBUG):
+            unique_values = df[col].unique()
+            logger.debug("Kategorik sütun değerleri", extra=log_fields(
+                column=col, unique=len(unique_values), values=[str(v) for v in unique_values[:10]]))
+    
+    logger.info("Model eğitimi için feature'lar hazırlandı",
+                extra=log_fields(features=len(feature_columns), matrix_bytes=X.nbytes))
+    logger.debug("Feature isimleri", extra=log_fields(feature_names=feature_columns))
+    
+    return df, X, y, encoders, feature_columns, fingerprint
+
+
+def split_train_test(X, y):
+    """Eğitim/test ayrımı (%80 / %20, stratified, sabit seed); tuning de yalnızca eğitim kısmını kullanır."""
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+def load_training_config(path: str = None) -> Dict[str, Any]:
+    """
+    Model hiperparametrelerini döndürür.
     
-    # Model eğitimi
-    print("Model eğitiliyor...")
-    # Manuel ağırlık: Riskli müşteriyi (1) kaçırmak, RISK_WEIGHT iyi müşteriyi (0) üzmekten daha kötü
-    class_weights = {0: 1.0, 1: RISK_WEIGHT}  # İyi: 1.0, Riskli: RISK_WEIGHT kat daha önemli
-    print(f"  -> Manuel class_weight kullanılıyor: {class_weights}")
-    print(f"  -> Riskli müşteriyi kaçırmak, {RISK_WEIGHT} iyi müşteriyi üzmekten daha kötü!")
-    trained_model = RandomForestClassifier(
-        n_estimators=200,      # Stabilite için artırıldı
-        max_depth=None,        # Derinliği serbest bırak (karmaşık riskleri yakalasın)
-        min_samples_leaf=2,    # Ezberlemeyi (overfitting) önlemek için yaprak başına min 2 örnek
-        random_state=42,
-        n_jobs=-1,
-        class_weight=class_weights
+    TUNED_CONFIG_PATH'te tuning çıktısı (python -m cli tune) varsa
+    oradaki değerler varsayılanların üzerine yazılır; bilinmeyen anahtarlar yok sayılır.
+    """
+    path = path or TUNED_CONFIG_PATH
+    config = dict(DEFAULT_TRAINING_CONFIG)
+    if not os.path.exists(path):
+        return config
+    try:
+        with open(path, encoding='utf-8') as f:
+            tuned = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Tuning yapılandırması okunamadı", extra=log_fields(path=path, error=str(e)))
+        return config
+    params = tuned.get('params', tuned)
+    config.update({key: params[key] for key in DEFAULT_TRAINING_CONFIG if key in params})
+    logger.info("Tuning yapılandırması kullanılıyor", extra=log_fields(path=path, config=config))
+    return config
+
+
+def build_model(config: Dict[str, Any], n_jobs: int = -1, n_estimators: int = None,
+                random_state: int = 42) -> RandomForestClassifier:
+    """
+    Verilen hiperparametrelerle (eğitilmemiş) RandomForest modelini kurar.
+    n_estimators verilirse config'deki ağaç sayısının yerine kullanılır (artımlı eğitim).
+    """
+    return RandomForestClassifier(
+        n_estimators=n_estimators or config['n_estimators'],
+        max_depth=config['max_depth'],
+        min_samples_leaf=config['min_samples_leaf'],
+        max_features=config['max_features'],
+        random_state=random_state,
+        n_jobs=n_jobs,
+        class_weight={0: 1.0, 1: config['risk_weight']}
     )
-    trained_model.fit(X_train, y_train)
-    
-    print("Model eğitimi tamamlandı. Test seti üzerinde değerlendiriliyor...")
+
+
+def evaluate_holdout(y_test, y_pred_proba, config: Dict[str, Any]):
+    """
+    Test (holdout) olasılıkları üzerinde threshold'u seçer ve metrikleri hesaplar.
     
-    # Test seti üzerinde olasılık tahminleri yap
-    y_pred_proba = trained_model.predict_proba(X_test)[:, 1]
+    Tam eğitim ve artımlı eğitim aynı değerlendirmeyi kullanır.
     
-    # --- YENİ AGRESİF THRESHOLD AYARI ---
-    print(f"   -> Optimal threshold aranıyor (Hedef Recall >= %80)...")
+    Returns:
+        (optimal_threshold, metrics): metrics; accuracy, precision, recall, f1,
+        confusion_matrix, test_samples ve threshold_curve içerir
+    """
+    # --- THRESHOLD ARAMA: tüm farklı olasılıklar tek sıralı geçişte ---
+    logger.info("Optimal threshold aranıyor", extra=log_fields(objective=THRESHOLD_OBJECTIVE))
     
-    best_threshold = 0.20 
-    best_score_f1 = -1.0
-    target_min_recall = 0.80
-    found_target_recall = False
-    best_recall = 0.0
+    curve = threshold_curve(y_test, y_pred_proba, risk_weight=RISK_WEIGHT)
+    return evaluate_curve(curve, config)
 
-    # Daha hassas arama yap
-    thresholds_to_test = np.arange(0.1, 0.61, 0.02)
 
-    for threshold in thresholds_to_test:
-        y_pred_thresh = (y_pred_proba >= threshold).astype(int)
-        recall_val = recall_score(y_test, y_pred_thresh, zero_division=0)
-        f1_val = f1_score(y_test, y_pred_thresh, zero_division=0)
-        
-        # Öncelik 1: Hedef Recall'a ulaşmak. Öncelik 2: F1'i maksimize etmek.
-        if recall_val >= target_min_recall:
-            found_target_recall = True
-            if f1_val > best_score_f1:
-                best_score_f1 = f1_val
-                best_threshold = threshold
-                best_recall = recall_val
-        # Hedefe henüz ulaşamadıysak, en iyi F1'i yine de takip et
-        elif not found_target_recall and f1_val > best_score_f1:
-             best_score_f1 = f1_val
-             best_threshold = threshold
-             best_recall = recall_val
-
-    if not found_target_recall:
-         print(f"   -> UYARI: %80 Recall hedefine ulaşılamadı. Güvenli (düşük) threshold seçiliyor.")
-         best_threshold = 0.25 # Manuel güvenli liman
-
-    global optimal_threshold
-    optimal_threshold = best_threshold
-    print(f"  -> Optimal threshold bulundu: {optimal_threshold:.2f} (Recall: {best_recall:.2%})")
-    # --- THRESHOLD SONU ---
+def evaluate_curve(curve: Dict[str, np.ndarray], config: Dict[str, Any]):
+    """
+    Threshold eğrisi üzerinde threshold'u seçer ve metrikleri hesaplar.
     
-    # Optimal threshold ile tahmin yap
-    y_pred = (y_pred_proba >= optimal_threshold).astype(int)
+    evaluate_holdout ve parça parça skorlanan holdout (kova sayımlarından
+    çıkarılan eğri, chunked_training) aynı seçimi kullanır.
     
-    # Metrikleri hesapla
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred, zero_division=0)
-    recall = recall_score(y_test, y_pred, zero_division=0)
-    f1 = f1_score(y_test, y_pred, zero_division=0)
-    cm = confusion_matrix(y_test, y_pred).tolist()
+    Returns:
+        evaluate_holdout ile aynı (optimal_threshold, metrics)
+    """
+    target_min_recall = config['target_min_recall']
+    best_index = select_threshold(
+        curve, THRESHOLD_OBJECTIVE,
+        min_recall=target_min_recall,
+        min_precision=TARGET_MIN_PRECISION
+    )
+    optimal_threshold = float(curve['thresholds'][best_index])
     
-    # Metrikleri global değişkende sakla
-    model_metrics = {
+    if THRESHOLD_OBJECTIVE == "recall_f1" and not (curve['recall'] >= target_min_recall).any():
+        # Eğri noktası yalnızca metrikler için; servis edilen threshold sabit güvenli değerdir
+        optimal_threshold = RECALL_FALLBACK_THRESHOLD
+        logger.warning("Recall hedefine ulaşılamadı, güvenli (düşük) threshold seçildi",
+                       extra=log_fields(target_min_recall=target_min_recall, threshold=optimal_threshold))
+    
+    logger.info("Optimal threshold bulundu", extra=log_fields(
+        threshold=round(optimal_threshold, 4), recall=round(float(curve['recall'][best_index]), 4),
+        candidates=len(curve['thresholds'])))
+    # --- THRESHOLD SONU ---
+    
+    # Seçilen threshold'daki metrikler eğriden okunur (yeniden tahmin/sayım yok)
+    accuracy = curve['accuracy'][best_index]
+    precision = curve['precision'][best_index]
+    recall = curve['recall'][best_index]
+    f1 = curve['f1'][best_index]
+    cm = [
+        [int(curve['tn'][best_index]), int(curve['fp'][best_index])],
+        [int(curve['fn'][best_index]), int(curve['tp'][best_index])]
+    ]
+    
+    logger.info("Model performans metrikleri", extra=log_fields(
+        accuracy=round(float(accuracy), 4), precision=round(float(precision), 4),
+        recall=round(float(recall), 4), f1=round(float(f1), 4), confusion_matrix=cm))
+    
+    return optimal_threshold, {
         'accuracy': float(accuracy),
         'precision': float(precision),
         'recall': float(recall),
         'f1': float(f1),
         'confusion_matrix': cm,
-        'test_samples': int(len(X_test)),
+        'test_samples': int(curve['tp'][best_index] + curve['fp'][best_index]
+                            + curve['tn'][best_index] + curve['fn'][best_index]),
+        'threshold_curve': curve_to_json(curve, best_index, THRESHOLD_OBJECTIVE, threshold=optimal_threshold),
+    }
+
+
+def fit_model_snapshot() -> ModelSnapshot:
+    """
+    Veri setini yükler, modeli eğitir ve yeni bir ModelSnapshot döndürür.
+    
+    Global durumu değiştirmez; yayına alma publish_snapshot ile ayrıca yapılır.
+    Böylece yeniden eğitim arka planda, mevcut model hizmet vermeye devam
+    ederken çalışabilir.
+    """
+    df, X, y, encoders, feature_names, fingerprint = prepare_training_data()
+    
+    # Örnek veri için kompakt depo; encode edilmemiş DataFrame model eğitiminden önce bırakılır
+    samples = SampleStore.from_frame(df)
+    logger.info("Örnek veri deposu oluşturuldu", extra=log_fields(rows=len(samples), bytes=samples.nbytes))
+    total_samples = len(df)
+    del df
+    
+    # Veriyi %80 eğitim, %20 test olarak ayır; tam matris ayrımdan sonra tutulmaz
+    X_train, X_test, y_train, y_test = split_train_test(X, y)
+    del X, y
+    
+    logger.info("Eğitim/test ayrımı", extra=log_fields(train_samples=len(X_train), test_samples=len(X_test)))
+    
+    # Hiperparametreler: tuning çıktısı varsa oradan, yoksa varsayılanlar
+    config = load_training_config()
+    
+    # Model eğitimi
+    # Manuel ağırlık: Riskli müşteriyi (1) kaçırmak, risk_weight iyi müşteriyi (0) üzmekten daha kötü
+    risk_weight = config['risk_weight']
+    class_weights = {0: 1.0, 1: risk_weight}  # İyi: 1.0, Riskli: risk_weight kat daha önemli
+    logger.info("Model eğitiliyor", extra=log_fields(class_weight=class_weights))
+    model = build_model(config, n_jobs=-1)
+    model.fit(X_train, y_train)
+    
+    logger.info("Model eğitimi tamamlandı, test seti üzerinde değerlendiriliyor")
+    
+    # Test seti üzerinde olasılık tahminleri yap
+    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    
+    optimal_threshold, holdout_metrics = evaluate_holdout(y_test, y_pred_proba, config)
+    
+    # Metrikleri snapshot ile birlikte sakla
+    model_metrics = {
+        **holdout_metrics,
         'train_samples': int(len(X_train)),
-        'total_samples': int(len(df))
+        'total_samples': int(total_samples),
+        'training_config': config
+    }
+    
+    peak_rss = metrics.peak_rss_bytes()
+    if peak_rss is not None:
+        model_metrics['training_peak_rss_mb'] = round(peak_rss / 1e6, 1)
+        logger.info("Eğitim bellek kullanımı", extra=log_fields(
+            peak_rss_mb=model_metrics['training_peak_rss_mb'], train_matrix_bytes=X_train.nbytes))
+    
+    # Ağaç dizileri ve yerel katkı yol istatistikleri model başına bir kez çıkarılır
+    forest = FlatForest(model)
+    
+    return ModelSnapshot(
+        model=model,
+        encoders=encoders,
+        feature_names=feature_names,
+        optimal_threshold=optimal_threshold,
+        model_metrics=model_metrics,
+        # Tek satırlık tahmin yolu için özellik planını derle
+        feature_plan=FeaturePlan(feature_names, encoders),
+        sample_store=samples,
+        model_version=f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{fingerprint[:8]}",
+        dataset_fingerprint=fingerprint,
+        forest=forest,
+        scorer=build_scorer(forest),
+        explainer=ExplanationEngine(feature_names, model.feature_importances_),
+        # Artımlı yeniden eğitim yeni satırları bu ayrımın üzerine ekler
+        training_state=TrainingState.from_training(X_train, y_train, X_test, y_test, y_pred_proba,
+                                                   len(model.estimators_), TRAINING_ROWS_DIR),
+        drift_baseline=DriftBaseline.from_training(X_train, feature_names, encoders)
+    )
+
+
+def fit_incremental_snapshot(snapshot: ModelSnapshot, records: List[Dict[str, Any]],
+                             labels: List[int]) -> ModelSnapshot:
+    """
+    Yeni etiketli başvurularla modeli artımlı olarak günceller ve yeni bir ModelSnapshot döndürür.
+    
+    Tüm geçmiş yeniden eğitilmez: en eski ağaçların bir kısmı (INCREMENTAL_TREE_FRACTION),
+    yeni satırlar ve geçmişten orantılı bir örnek üzerinde eğitilen ağaçlarla
+    değiştirilir (incremental.rolling_update). Holdout metrikleri ve threshold,
+    yalnızca değişen ağaçlar ve yeni holdout satırları skorlanarak, üst sınırlı
+    holdout penceresi üzerinde yeniden hesaplanır. Eğitim satırları TRAINING_ROWS_DIR
+    altındaki dosyanın sonuna eklenir.
+    Encoder'lar değişmez; bilinmeyen kategoriler tahmindeki gibi ilk sınıfa düşer.
+    
+    Args:
+        snapshot: Güncellenecek (yayındaki) snapshot; değiştirilmez
+        records: Doğrulanmış başvuru giriş sözlükleri
+        labels: Gerçekleşen sonuçlar (1 = riskli, 0 = güvenli)
+    
+    Raises:
+        ValueError: Snapshot'ta eğitim durumu yoksa (eski artifact) veya pencere tek sınıflıysa
+    """
+    state = snapshot.training_state
+    if state is None:
+        raise ValueError("Modelin eğitim durumu yok (eski artifact veya parça parça eğitim); "
+                         "önce tam yeniden eğitim gerekli.")
+    
+    config = snapshot.model_metrics.get('training_config') or load_training_config()
+    n_trees = len(snapshot.model.estimators_)
+    n_replaced = trees_to_replace(n_trees)
+    seed = 42 + state.rounds + 1
+    
+    logger.info("Artımlı eğitim başladı", extra=log_fields(new_rows=len(records), trees_replaced=n_replaced,
+                                                             trees=n_trees))
+    X_new, _ = snapshot.feature_plan.encode_batch(records)
+    new_trees = build_model(config, n_jobs=-1, n_estimators=n_replaced, random_state=seed)
+    model, new_state, info = rolling_update(snapshot.model, state, X_new, np.asarray(labels), new_trees, seed,
+                                             rows_dir=TRAINING_ROWS_DIR)
+    logger.info("Artımlı eğitim penceresi", extra=log_fields(
+        window_rows=info['window_rows'], new_train_rows=info['new_train_rows'],
+        holdout_rows=new_state.n_holdout, new_holdout_rows=info['new_holdout_rows'],
+        holdout_dropped_rows=info['holdout_dropped_rows']))
+    
+    y_pred_proba = new_state.holdout_proba_sum / n_trees
+    optimal_threshold, holdout_metrics = evaluate_holdout(new_state.y_holdout, y_pred_proba, config)
+    model_metrics = {
+        **holdout_metrics,
+        'train_samples': new_state.n_train,
+        'total_samples': snapshot.model_metrics['total_samples'] + info['new_rows'],
+        'training_config': config,
+        'incremental': info
     }
     
-    print(f"Model Performans Metrikleri:")
-    print(f"  Doğruluk (Accuracy): {accuracy:.4f}")
-    print(f"  Keskinlik (Precision): {precision:.4f}")
-    print(f"  Duyarlılık (Recall): {recall:.4f}")
-    print(f"  F1 Skoru: {f1:.4f}")
-    print(f"  Karışıklık Matrisi:\n{np.array(cm)}")
+    # Veri seti özeti zincirlenir: önceki özet + yeni satırlar (geçmiş yeniden okunmaz)
+    digest = hashlib.sha256(snapshot.dataset_fingerprint.encode("utf-8"))
+    digest.update(np.ascontiguousarray(X_new, dtype=np.float32).tobytes())
+    digest.update(np.asarray(labels, dtype=np.int8).tobytes())
+    fingerprint = digest.hexdigest()
+    
+    forest = FlatForest(model)
+    return ModelSnapshot(
+        model=model,
+        encoders=snapshot.encoders,
+        feature_names=snapshot.feature_names,
+        optimal_threshold=optimal_threshold,
+        model_metrics=model_metrics,
+        feature_plan=snapshot.feature_plan,
+        sample_store=snapshot.sample_store,
+        model_version=f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{fingerprint[:8]}",
+        dataset_fingerprint=fingerprint,
+        forest=forest,
+        scorer=build_scorer(forest),
+        explainer=ExplanationEngine(snapshot.feature_names, model.feature_importances_),
+        training_state=new_state,
+        # Drift eğitim dağılımına göre izlenir; artımlı turlar baseline'ı değiştirmez
+        drift_baseline=snapshot.drift_baseline
+    )
+
+
+def compute_dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Veri setinin içerik özetini (sha256) hesaplar.
+    Artifact'ın hangi veriyle eğitildiğini izlemek için kullanılır.
+    """
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def save_model_artifact(path: str = None, snapshot: ModelSnapshot = None) -> str:
+    """
+    Eğitilmiş modeli; encoder'lar, feature isimleri, threshold, metrikler ve
+    veri seti özeti ile birlikte sürümlü tek bir artifact dosyasına yazar.
+    
+    Dosya önce geçici isimle yazılıp atomik olarak yerine taşınır; böylece
+    aynı anda yükleme yapan worker'lar yarım yazılmış dosya görmez.
+    
+    Returns:
+        Artifact dosyasının yolu
+    """
+    snapshot = snapshot or get_snapshot()
+    path = path or MODEL_ARTIFACT_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    
+    artifact = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'model_version': snapshot.model_version,
+        'dataset_fingerprint': snapshot.dataset_fingerprint,
+        'model': snapshot.model,
+        'encoders': snapshot.encoders,
+        'feature_names': snapshot.feature_names,
+        'optimal_threshold': snapshot.optimal_threshold,
+        'model_metrics': snapshot.model_metrics,
+        'sample_store': snapshot.sample_store,
+        'training_state': snapshot.training_state,
+        'drift_baseline': snapshot.drift_baseline,
+    }
+    
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    # Diğer worker'lar sürüm dosyasındaki değişikliği görüp artifact'ı yeniden yükler
+    write_published_version(path, snapshot.model_version)
+    logger.info("Model artifact'ı kaydedildi", extra=log_fields(path=path, model_version=snapshot.model_version))
+    return path
+
+
+def load_model_artifact(path: str = None, mmap_mode: Optional[str] = 'r') -> bool:
+    """
+    Kaydedilmiş model artifact'ını yükler (eğitim yapmadan) ve yayına alır.
+    
+    Numpy dizileri memory-map ile açılır; böylece aynı artifact'ı yükleyen
+    uvicorn worker'ları bu sayfaları işletim sistemi üzerinden paylaşır.
+    
+    Returns:
+        Artifact yüklendiyse True; dosya yoksa veya uyumsuzsa False
+    """
+    path = path or MODEL_ARTIFACT_PATH
+    started = time.perf_counter()
+    snapshot = read_model_artifact(path, mmap_mode)
+    if snapshot is None:
+        return False
+    publish_snapshot(snapshot)
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("Model artifact'ı yüklendi", extra=log_fields(
+        path=path, model_version=snapshot.model_version, elapsed_ms=round(elapsed_ms, 1)))
+    return True
+
+
+def read_model_artifact(path: str, mmap_mode: Optional[str] = 'r') -> Optional[ModelSnapshot]:
+    """
+    Artifact dosyasından ModelSnapshot oluşturur; yayına almaz (gölge model için de kullanılır).
+    
+    Returns:
+        Snapshot; dosya yoksa, okunamıyorsa veya uyumsuzsa None
+    """
+    if not os.path.exists(path):
+        logger.info("Model artifact'ı bulunamadı", extra=log_fields(path=path))
+        return None
+    
+    try:
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+    except Exception as e:
+        logger.warning("Model artifact'ı okunamadı", extra=log_fields(path=path, error=str(e)))
+        return None
+    
+    if artifact.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        logger.warning("Artifact formatı uyumsuz, yüklenmedi", extra=log_fields(
+            expected=ARTIFACT_FORMAT_VERSION, found=artifact.get('format_version')))
+        return None
+    if artifact.get('sklearn_version') != sklearn.__version__:
+        logger.warning("Artifact farklı scikit-learn sürümüyle kaydedilmiş, yüklenmedi", extra=log_fields(
+            artifact_sklearn=artifact.get('sklearn_version'), installed_sklearn=sklearn.__version__))
+        return None
+    
+    feature_names_loaded = list(artifact['feature_names'])
+    forest = FlatForest(artifact['model'])
+    samples = artifact.get('sample_store')
+    if samples is None and artifact.get('sample_dataset') is not None:
+        # Eski artifact'larda örnek veri DataFrame olarak saklanır
+        samples = SampleStore.from_frame(artifact['sample_dataset'])
+    training_state = artifact.get('training_state')
+    drift_baseline = artifact.get('drift_baseline')
+    if drift_baseline is None and training_state is not None:
+        # Baseline'ı olmayan eski artifact: eğitim satırlarından hesaplanır
+        drift_baseline = DriftBaseline.from_training(training_state.X_train, feature_names_loaded,
+                                                     artifact['encoders'])
+    return ModelSnapshot(
+        model=artifact['model'],
+        encoders=artifact['encoders'],
+        feature_names=feature_names_loaded,
+        optimal_threshold=artifact['optimal_threshold'],
+        model_metrics=artifact['model_metrics'],
+        feature_plan=FeaturePlan(feature_names_loaded, artifact['encoders']),
+        sample_store=samples,
+        model_version=artifact['model_version'],
+        dataset_fingerprint=artifact['dataset_fingerprint'],
+        forest=forest,
+        scorer=build_scorer(forest),
+        explainer=ExplanationEngine(feature_names_loaded, artifact['model'].feature_importances_),
+        # Eski artifact'larda yok: artımlı eğitim yerine tam yeniden eğitim yapılır
+        training_state=training_state,
+        # Yoksa drift izlenmez (/drift baseline olmadığını bildirir)
+        drift_baseline=drift_baseline
+    )
+
+
+# Son görülen sürüm dosyası imzası; değişmediyse artifact okunmaz
+_published_signature = None
+_model_sync_thread: Optional[threading.Thread] = None
+_model_sync_stop = threading.Event()
+
+
+def sync_published_model(path: str = None) -> bool:
+    """
+    Başka bir worker artifact'ı yeniden yazdıysa (yeniden eğitim, gölge modelin
+    yayına alınması) onu yükler, ısıtır ve yayına alır.
+    
+    Sürüm dosyası değişmediyse yalnızca bir stat çağrısı yapılır. Bu worker'ın
+    kendi yazdığı sürüm zaten yayında olduğu için yeniden yüklenmez. Yükleme veya
+    yayına alma sürerken (_model_lock tutuluyorsa) bir sonraki kontrole bırakılır.
+    
+    Returns:
+        Yeni model yayına alındıysa True
+    """
+    global _published_signature
+    path = path or MODEL_ARTIFACT_PATH
+    signature = published_version_signature(path)
+    if signature is None or signature == _published_signature:
+        return False
+    if not _model_lock.acquire(blocking=False):
+        return False
+    try:
+        current = current_snapshot
+        if current is None:
+            return False
+        _published_signature = signature
+        version = read_published_version(path)
+        if version is None or version == current.model_version:
+            return False
+        snapshot = read_model_artifact(path)
+        if snapshot is None:
+            return False
+        warm_up_model(snapshot)
+        publish_snapshot(snapshot)
+        logger.info("Başka bir worker'ın yayına aldığı model yüklendi", extra=log_fields(
+            previous_version=current.model_version, model_version=snapshot.model_version))
+        return True
+    finally:
+        _model_lock.release()
+
+
+def start_model_sync() -> None:
+    """Sürüm dosyasını MODEL_SYNC_SECONDS aralıklarla kontrol eden arka plan iş parçacığını başlatır."""
+    global _model_sync_thread
+    if MODEL_SYNC_SECONDS <= 0 or (_model_sync_thread is not None and _model_sync_thread.is_alive()):
+        return
+    _model_sync_stop.clear()
+    
+    def run():
+        while not _model_sync_stop.wait(MODEL_SYNC_SECONDS):
+            try:
+                sync_published_model()
+            except Exception as e:
+                logger.warning("Yayındaki model senkronize edilemedi", extra=log_fields(error=str(e)))
     
-    return model_metrics
+    _model_sync_thread = threading.Thread(target=run, name="model-sync", daemon=True)
+    _model_sync_thread.start()
+
+
+def stop_model_sync() -> None:
+    _model_sync_stop.set()
 
 
 def generate_risk_explanation(
     model: RandomForestClassifier,
     feature_names: List[str],
-    X_input_row: pd.Series,
+    feature_values: Dict[str, Any],
     original_input_data: Dict[str, Any],
-    input_df_with_features: pd.DataFrame,
     encoders: Dict[str, LabelEncoder],
     risk_score: int
 ) -> str:
@@ -246,253 +1229,63 @@ def generate_risk_explanation(
     Args:
         model: Eğitilmiş RandomForest modeli
         feature_names: Feature isimleri listesi
-        X_input_row: Model'e gönderilen encode edilmiş veri (pandas Series)
+        feature_values: Model'e gönderilen feature değerleri (create_domain_features uygulanmış, encode edilmiş)
         original_input_data: Orijinal giriş verisi (decode edilmemiş)
-        input_df_with_features: create_domain_features uygulanmış DataFrame
         encoders: Label encoder'lar
         risk_score: Hesaplanan risk skoru
         
     Returns:
         Türkçe risk açıklaması
     """
-    # Feature importance'ları al
-    feature_importances = model.feature_importances_
-    
-    # Feature isimleri ile importance'ları eşleştir ve sırala
-    feature_importance_dict = dict(zip(feature_names, feature_importances))
-    sorted_features = sorted(feature_importance_dict.items(), key=lambda x: x[1], reverse=True)
-    
-    # En önemli 3-5 feature'ı seç (toplam importance'ın %60'ını kapsayan)
-    top_features = []
-    cumulative_importance = 0.0
-    target_importance = 0.6  # Toplam importance'ın %60'ı
-    
-    for feature_name, importance in sorted_features:
-        if cumulative_importance < target_importance and len(top_features) < 5:
-            top_features.append((feature_name, importance))
-            cumulative_importance += importance
-        else:
-            break
-    
-    # Feature Türkçe isimleri mapping
-    feature_turkish_names = {
-        'payment_per_month': 'Aylık Ödeme Yükü',
-        'credit_age_ratio': 'Yaş/Kredi Oranı',
-        'checking_status': 'Hesap Durumu',
-        'savings_status': 'Tasarruf Durumu',
-        'credit_history': 'Kredi Geçmişi',
-        'credit_amount': 'Kredi Tutarı',
-        'duration': 'Kredi Süresi',
-        'age': 'Yaş',
-        'employment': 'İstihdam Durumu',
-        'purpose': 'Kredi Amacı',
-        'housing': 'Konut Durumu',
-        'installment_commitment': 'Taksit Taahhüdü',
-        'personal_status': 'Kişisel Durum',
-        'other_parties': 'Diğer Taraflar',
-        'residence_since': 'İkamet Süresi',
-        'property_magnitude': 'Mülkiyet Büyüklüğü',
-        'other_payment_plans': 'Diğer Ödeme Planları',
-        'existing_credits': 'Mevcut Krediler',
-        'job': 'Meslek',
-        'num_dependents': 'Bağımlı Sayısı',
-        'own_telephone': 'Telefon Sahipliği',
-        'foreign_worker': 'Yabancı İşçi',
-    }
-    
-    # Risk açıklamaları oluştur
-    explanations = []
-    
-    for feature_name, importance in top_features:
-        turkish_name = feature_turkish_names.get(feature_name, feature_name)
-        
-        # Önce create_domain_features ile oluşturulan feature'ları kontrol et
-        original_value = None
-        if feature_name in input_df_with_features.columns:
-            original_value = input_df_with_features[feature_name].iloc[0]
-        elif feature_name in original_input_data:
-            original_value = original_input_data[feature_name]
-        else:
-            # Encoded değeri decode etmeye çalış
-            if feature_name in X_input_row.index:
-                encoded_value = X_input_row[feature_name]
-                # Decode etmeye çalış
-                if feature_name in encoders:
-                    try:
-                        # Encoder'dan geri çevir
-                        original_value = encoders[feature_name].inverse_transform([int(encoded_value)])[0]
-                    except:
-                        original_value = None
-                else:
-                    # Numeric feature
-                    original_value = encoded_value
-        
-        if original_value is None:
-            continue
-        
-        # Feature'a göre risk açıklaması oluştur
-        risk_reason = None
-        
-        # Numeric feature'lar için
-        if feature_name == 'payment_per_month':
-            # Aylık ödeme yükü yüksekse riskli
-            if isinstance(original_value, (int, float)):
-                if original_value > 500:  # Yüksek aylık ödeme
-                    risk_reason = f"{turkish_name} fazla"
-                elif original_value > 300:
-                    risk_reason = f"{turkish_name} orta seviyede"
-        
-        elif feature_name == 'credit_amount':
-            if isinstance(original_value, (int, float)):
-                if original_value > 10000:  # Yüksek kredi tutarı
-                    risk_reason = f"{turkish_name} yüksek"
-        
-        elif feature_name == 'credit_age_ratio':
-            if isinstance(original_value, (int, float)):
-                if original_value > 200:  # Yaşa göre yüksek kredi
-                    risk_reason = f"{turkish_name} dengesiz"
-        
-        elif feature_name == 'age':
-            if isinstance(original_value, (int, float)):
-                if original_value < 25 or original_value > 65:  # Genç veya yaşlı
-                    risk_reason = f"{turkish_name} riskli aralıkta"
-        
-        # Kategorik feature'lar için
-        elif feature_name == 'checking_status':
-            risk_values = ['<0', 'no checking']  # Negatif bakiye veya hesap yok
-            if str(original_value) in risk_values:
-                risk_reason = f"{turkish_name} zayıf"
-            elif str(original_value) == '0<=X<200':
-                risk_reason = f"{turkish_name} düşük"
-        
-        elif feature_name == 'savings_status':
-            risk_values = ['<100', 'no known savings']  # Düşük tasarruf
-            if str(original_value) in risk_values:
-                risk_reason = f"{turkish_name} yetersiz"
-        
-        elif feature_name == 'credit_history':
-            risk_values = ['delayed previously', 'critical/other existing credit']  # Kötü geçmiş
-            if str(original_value) in risk_values:
-                risk_reason = f"{turkish_name} sorunlu"
-        
-        elif feature_name == 'employment':
-            risk_values = ['unemployed', '<1']  # İşsiz veya kısa süreli
-            if str(original_value) in risk_values:
-                risk_reason = f"{turkish_name} belirsiz"
-        
-        elif feature_name == 'housing':
-            if str(original_value) == 'rent':  # Kirada oturuyor
-                risk_reason = f"{turkish_name} kirada"
-        
-        elif feature_name == 'existing_credits':
-            if isinstance(original_value, (int, float)):
-                if original_value >= 3:  # Çok fazla mevcut kredi
-                    risk_reason = f"{turkish_name} fazla"
-        
-        # Eğer özel bir risk nedeni bulunamadıysa, genel bir açıklama yap
-        if risk_reason is None:
-            # Feature importance'a göre genel açıklama
-            if importance > 0.1:  # Çok önemli feature
-                risk_reason = f"{turkish_name} önemli faktör"
-            else:
-                risk_reason = f"{turkish_name} etkili"
-        
-        explanations.append(risk_reason)
-    
-    # Açıklamaları birleştir
-    if explanations:
-        explanation_text = ", ".join(explanations[:3])  # En fazla 3 açıklama
-    else:
-        explanation_text = "Genel risk faktörleri"
-    
-    return explanation_text
+    # Kurallar ve Türkçe isimler explanations modülündedir. Bu fonksiyon her çağrıda
+    # motoru yeniden derler; tahmin yolları snapshot.explainer'ı (model başına bir kez) kullanır.
+    engine = ExplanationEngine(feature_names, model.feature_importances_)
+    return engine.explain(feature_values, original_input_data)
 
 
-def predict_risk(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def encode_input_frame(input_data: Dict[str, Any]):
     """
-    Yeni bir kredi başvurusu için risk skoru hesaplar.
+    Giriş verisini pandas DataFrame üzerinden encode eder (referans yol).
+    
+    FeaturePlan ile birebir aynı sonucu üretir; parite kontrolleri ve
+    benchmark karşılaştırmaları için tutulur.
     
-    Args:
-        input_data: Kredi başvuru bilgileri
-        
     Returns:
-        Risk skoru, karar ve risk seviyesi
+        (X_input, input_df): Model'e gönderilecek DataFrame ve
+        create_domain_features uygulanmış, encode edilmiş DataFrame
     """
-    global trained_model, encoders, feature_names
-    
-    if trained_model is None:
-        raise ValueError("Model henüz eğitilmemiş. Önce train_model() çağrılmalı.")
-    
     # Giriş verisini DataFrame'e çevir
     input_df = pd.DataFrame([input_data])
     
     # Alan bilgisi ile özellik mühendisliği uygula
     input_df = create_domain_features(input_df)
     
-    # Debug: Gelen veriyi logla
-    print(f"  -> Tahmin için gelen veri: {input_data}")
-    print(f"  -> Gelen veri sütunları ({len(input_df.columns)}): {list(input_df.columns)}")
-    print(f"  -> Model feature'ları ({len(feature_names)}): {feature_names}")
-    
-    # Frontend'den gelen feature isimlerini veri setindeki gerçek feature isimlerine map et
-    # German Credit Data feature mapping
-    feature_mapping = {
-        'saving_status': 'savings_status',  # Frontend'de 'saving_status', veri setinde 'savings_status'
-    }
-    
     # Feature isimlerini düzelt
-    for frontend_name, dataset_name in feature_mapping.items():
+    for frontend_name, dataset_name in FEATURE_NAME_MAPPING.items():
         if frontend_name in input_df.columns and dataset_name in feature_names:
             input_df[dataset_name] = input_df[frontend_name]
             if frontend_name != dataset_name:
                 input_df = input_df.drop(columns=[frontend_name])
     
-    # Not: Frontend artık veri setindeki gerçek değerleri gönderiyor, mapping gerekmiyor
-    
     # Kategorik değişkenleri encode et
     for col, encoder in encoders.items():
         if col in input_df.columns:
             try:
                 # Değeri string'e çevir (encoder string bekliyor)
                 value = str(input_df[col].iloc[0])
-                # Eğer değer encoder'da yoksa, en sık kullanılan değeri kullan
                 if value in encoder.classes_:
                     input_df[col] = encoder.transform([value])[0]
-                    print(f"  -> {col}: '{value}' -> {input_df[col].iloc[0]}")
                 else:
                     # Bilinmeyen değer için varsayılan (ilk sınıf)
-                    print(f"  -> Uyarı: '{value}' değeri encoder'da bulunamadı. Mevcut değerler: {list(encoder.classes_)[:5]}...")
-                    print(f"  -> Varsayılan olarak '{encoder.classes_[0]}' kullanılıyor")
                     input_df[col] = encoder.transform([encoder.classes_[0]])[0]
-            except Exception as e:
-                print(f"  -> Hata: {col} encode edilemedi: {str(e)}")
+            except Exception:
                 input_df[col] = 0
     
-    # Eksik özellikleri varsayılan değerlerle doldur (model eğitimi sırasında kullanılan tüm feature'lar için)
-    # Önemli: Eksik feature'lar için veri setindeki en yaygın (median/mode) değerleri kullan
-    default_values = {
-        'credit_history': 'existing paid',  # En yaygın değer
-        'employment': '1<=X<4',  # En yaygın değer
-        'installment_commitment': 3,  # Ortalama değer
-        'personal_status': 'male single',  # En yaygın değer
-        'other_parties': 'none',  # En yaygın değer
-        'residence_since': 2,  # Ortalama değer
-        'property_magnitude': 'real estate',  # En yaygın değer
-        'age': 35,  # Ortalama yaş
-        'other_payment_plans': 'none',  # En yaygın değer
-        'housing': 'own',  # En yaygın değer
-        'existing_credits': 1,  # Ortalama değer
-        'job': 'skilled',  # En yaygın değer
-        'num_dependents': 1,  # Ortalama değer
-        'own_telephone': 'none',  # En yaygın değer
-        'foreign_worker': 'yes'  # En yaygın değer
-    }
-    
-    missing_features = []
+    # Eksik özellikleri varsayılan değerlerle doldur
     for col in feature_names:
         if col not in input_df.columns:
-            if col in default_values:
-                default_val = default_values[col]
+            if col in DEFAULT_VALUES:
+                default_val = DEFAULT_VALUES[col]
                 # Eğer kategorik bir feature ise ve encoder varsa, encode et
                 if col in encoders:
                     try:
@@ -501,65 +1294,224 @@ def predict_risk(input_data: Dict[str, Any]) -> Dict[str, Any]:
                         else:
                             # Varsayılan değer encoder'da yoksa, ilk sınıfı kullan
                             input_df[col] = encoders[col].transform([encoders[col].classes_[0]])[0]
-                    except:
+                    except Exception:
                         input_df[col] = 0
                 else:
                     # Numeric feature
                     input_df[col] = default_val
-                missing_features.append(f"{col}={default_val}")
             else:
                 # Bilinmeyen feature için 0
                 input_df[col] = 0
-                missing_features.append(f"{col}=0")
-    
-    if missing_features:
-        print(f"  -> Eksik feature'lar varsayılan değerlerle dolduruldu: {', '.join(missing_features[:5])}...")
     
     # Sadece eğitim sırasında kullanılan özellikleri seç ve sırala
     X_input = input_df[feature_names].copy()
+    return X_input, input_df
+
+
+def predict_risk(input_data: Dict[str, Any], include_attributions: bool = False) -> Dict[str, Any]:
+    """
+    Yeni bir kredi başvurusu için risk skoru hesaplar.
     
-    # Debug: Model'e giden veriyi logla
-    print(f"  -> Model'e gönderilen feature sayısı: {len(X_input.columns)}")
-    print(f"  -> Model feature sırası: {list(X_input.columns)}")
-    print(f"  -> Model'e gönderilen değerler (ilk 10): {dict(zip(X_input.columns[:10], X_input.iloc[0, :10].values))}")
-    if len(X_input.columns) > 10:
-        print(f"  -> Model'e gönderilen değerler (son 10): {dict(zip(X_input.columns[-10:], X_input.iloc[0, -10:].values))}")
+    Args:
+        input_data: Kredi başvuru bilgileri
+        include_attributions: True ise başvuruya özel feature katkıları da eklenir
+            (bkz. compute_local_attributions)
+        
+    Returns:
+        Risk skoru, karar ve risk seviyesi
+    """
+    # Snapshot bir kez okunur: yeniden eğitim sırasında bile tutarlı model kullanılır
+    snapshot = get_snapshot()
+    
+    # Hata ayıklama içerikleri (giriş, feature vektörü) yalnızca DEBUG açıkken üretilir
+    debug = logger.isEnabledFor(logging.DEBUG)
+    timer = metrics.StageTimer("single")
+    
+    # Giriş verisini derlenmiş plan ile doğrudan float32 satıra çevir
+    # (saving_status mapping, kategorik encode ve eksik feature doldurma dahil)
+    X_input, feature_values = snapshot.feature_plan.encode(input_data)
+    # Drift sayaçları için kuyruğa ekle (önbellekten dönen tahminler de sayılır; bloklamaz)
+    drift_monitor.observe(snapshot.drift_baseline, X_input, [input_data])
+    timer.mark("encoding")
+    if debug:
+        logger.debug("Başvuru encode edildi", extra=log_fields(
+            input=input_data, features=feature_value_dump(feature_values)))
+    
+    # Aynı encode edilmiş başvuru bu model ile daha önce skorlandıysa önbellekten dön
+    cache_key = None
+    if prediction_cache.enabled:
+        cache_key = feature_vector_key(snapshot.feature_names, feature_values)
+        cached = prediction_cache.get(snapshot, cache_key)
+        timer.mark("cache")
+        if cached is not None:
+            metrics.registry.inc("creditguard_predictions_total", (("path", "single"), ("source", "cache")))
+            if debug:
+                logger.debug("Tahmin sonucu önbellekten", extra=log_fields(risk_score=cached['risk_score']))
+            shadow_evaluator.submit(snapshot, X_input, [input_data], [cached])
+            if include_attributions:
+                cached["attributions"] = compute_local_attributions(snapshot, X_input)[0]
+            return cached
     
     # Tahmin yap (optimal threshold kullanarak)
-    risk_proba = trained_model.predict_proba(X_input)[0, 1]  # Riskli olma olasılığı (0-1 arası)
+    risk_proba = snapshot.scorer.predict_proba(X_input)[0, 1]  # Riskli olma olasılığı (0-1 arası)
+    timer.mark("predict_proba")
+    if debug:
+        logger.debug("predict_proba tamamlandı", extra=log_fields(risk_proba=float(risk_proba)))
+    
+    explanation = snapshot.explainer.explain(feature_values, input_data)
+    timer.mark("explanation")
+    if debug:
+        logger.debug("Açıklama üretildi", extra=log_fields(explanation=explanation))
+    
+    result = build_prediction_result(snapshot, risk_proba, feature_values, input_data, explanation)
+    metrics.registry.inc("creditguard_predictions_total", (("path", "single"), ("source", "model")))
+    
+    if cache_key is not None:
+        prediction_cache.put(snapshot, cache_key, result)
+    # Gölge model (varsa) aynı başvuruyu yanıttan sonra arka planda skorlar
+    shadow_evaluator.submit(snapshot, X_input, [input_data], [result])
+    
+    if include_attributions:
+        result["attributions"] = compute_local_attributions(snapshot, X_input)[0]
     
+    if debug:
+        logger.debug("Tahmin sonucu", extra=log_fields(
+            risk_score=result['risk_score'], decision=result['decision'], model_version=snapshot.model_version))
+    
+    return result
+
+
+def feature_value_dump(feature_values: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode edilmiş feature değerlerini loglanabilir (JSON uyumlu) sözlüğe çevirir."""
+    return {name: value.item() if hasattr(value, 'item') else value for name, value in feature_values.items()}
+
+
+def predict_risk_batch(records: List[Dict[str, Any]], use_cache: bool = True,
+                       include_attributions: bool = False,
+                       trace_ids: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Birden çok kredi başvurusu için risk skorlarını tek seferde hesaplar.
+    
+    Tüm başvurular sütun bazlı tek geçişte encode edilir ve predict_proba
+    önbellekte bulunmayan satırlar için bir kez çağrılır.
+    
+    Args:
+        records: Kredi başvuru bilgileri listesi
+        use_cache: False ise tahmin önbelleği okunmaz ve yazılmaz (dosya skorlama gibi tek seferlik işler)
+        include_attributions: True ise her sonuca başvuruya özel feature katkıları eklenir
+        trace_ids: Kayıtların ait olduğu isteklerin trace id'leri (mikro-batch; yalnızca loglama için)
+        
+    Returns:
+        Giriş sırasıyla, her başvuru için predict_risk ile aynı formatta sonuçlar
+    """
+    snapshot = get_snapshot()
+    
+    if not records:
+        return []
+    
+    timer = metrics.StageTimer("batch")
+    X_batch, batch_values = snapshot.feature_plan.encode_batch(records)
+    drift_monitor.observe(snapshot.drift_baseline, X_batch, records)
+    timer.mark("encoding")
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    cache_keys = None
+    if use_cache and prediction_cache.enabled:
+        cache_keys = [feature_vector_key(snapshot.feature_names, values) for values in batch_values]
+        for i, key in enumerate(cache_keys):
+            results[i] = prediction_cache.get(snapshot, key)
+        timer.mark("cache")
+    
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        rows = X_batch if len(missing) == len(records) else X_batch[missing]
+        risk_probas = snapshot.scorer.predict_proba(rows)[:, 1]
+        timer.mark("predict_proba")
+        explanations = snapshot.explainer.explain_batch([batch_values[i] for i in missing],
+                                                        [records[i] for i in missing])
+        timer.mark("explanation")
+        for i, risk_proba, explanation in zip(missing, risk_probas, explanations):
+            results[i] = build_prediction_result(snapshot, risk_proba, batch_values[i], records[i], explanation)
+            if cache_keys is not None:
+                prediction_cache.put(snapshot, cache_keys[i], results[i])
+    
+    shadow_evaluator.submit(snapshot, X_batch, records, results)
+    
+    if include_attributions:
+        # Katkılar önbelleğe yazılmaz; önbellekten dönen satırlar için de hesaplanır
+        attributions = compute_local_attributions(snapshot, X_batch)
+        results = [{**result, "attributions": attribution} for result, attribution in zip(results, attributions)]
+    
+    metrics.registry.inc("creditguard_predictions_total", (("path", "batch"), ("source", "model")), len(missing))
+    if len(missing) < len(records):
+        metrics.registry.inc("creditguard_predictions_total", (("path", "batch"), ("source", "cache")),
+                             len(records) - len(missing))
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Toplu tahmin", extra=log_fields(
+            rows=len(records), cached=len(records) - len(missing), trace_ids=trace_ids,
+            risk_scores=[result['risk_score'] for result in results]))
+    
+    return results
+
+
+def compute_local_attributions(snapshot: ModelSnapshot, X: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Encode edilmiş satırlar için başvuruya özel feature katkılarını hesaplar (Saabas yöntemi).
+    
+    Her ağaçta satırın izlediği yol boyunca riskli olasılığındaki değişim,
+    o adımda bölünen feature'a yazılır ve ağaçlar üzerinden ortalanır. Yol
+    istatistikleri model eğitilirken/yüklenirken bir kez çıkarılır (FlatForest);
+    türetilmiş feature'lar (payment_per_month, credit_age_ratio) da kendi
+    katkılarını alır.
+    
+    Gecikme bütçesi (200 ağaç, p99): tek satır < 1 ms, 256 satırlık batch < 40 ms;
+    ölçüm için benchmarks/bench_attributions.py.
+    
+    Returns:
+        Satır başına {"base_value": taban olasılık, "contributions": {feature: katkı}};
+        katkılar mutlak değere göre büyükten küçüğe sıralıdır, pozitif katkı riski artırır.
+        base_value + katkıların toplamı = risk_probability
+    """
+    contributions = snapshot.forest.contributions(X)
+    names = snapshot.feature_names
+    base_value = snapshot.forest.bias
+    attributions = []
+    for row in contributions:
+        order = np.argsort(-np.abs(row), kind='stable')
+        attributions.append({
+            "base_value": base_value,
+            "contributions": {names[j]: float(row[j]) for j in order}
+        })
+    return attributions
+
+
+def build_prediction_result(snapshot: ModelSnapshot, risk_proba: float, feature_values: Dict[str, Any],
+                            input_data: Dict[str, Any], explanation: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Riskli olma olasılığından skor, karar, risk seviyesi ve açıklamayı oluşturur.
+    Açıklama verilmezse snapshot'ın açıklama motoru ile üretilir.
+    """
     # Risk skorunu hesapla: Model'in "riskli" olma olasılığını 0-100 arası skora çevir
     # risk_proba = 0.0 -> risk_score = 0 (Çok Güvenli)
     # risk_proba = 0.5 -> risk_score = 50 (Orta Risk)
     # risk_proba = 1.0 -> risk_score = 100 (Çok Riskli)
     risk_score = int(risk_proba * 100)
     
-    print(f"  -> Tahmin sonucu: risk_proba={risk_proba:.4f}, risk_score={risk_score}")
-    
-    # Risk skoruna göre karar verme (0-100 arası skor)
+    # Risk skoruna göre karar verme (0-100 arası skor, DECISION_BANDS)
     # 0-35: Düşük Risk -> APPROVE
     # 36-55: Orta Risk -> REVIEW
     # 56-100: Yüksek Risk -> REJECT
-    if risk_score <= 35:
-        decision = "APPROVE"
-        risk_level = "Low"
-    elif risk_score <= 55:
-        decision = "REVIEW"
-        risk_level = "Medium"
-    else:
-        decision = "REJECT"
-        risk_level = "High"
-    
-    # Feature importance analizi ile açıklama oluştur
-    explanation = generate_risk_explanation(
-        trained_model, 
-        feature_names, 
-        X_input.iloc[0], 
-        input_data, 
-        input_df,  # create_domain_features uygulanmış DataFrame
-        encoders,
-        risk_score
-    )
+    for max_score, decision, risk_level in DECISION_BANDS:
+        if risk_score <= max_score:
+            break
+    
+    # Feature importance analizi ile açıklama oluştur (top feature'lar model başına önceden seçilmiş)
+    if explanation is None:
+        explanation = snapshot.explainer.explain(
+            feature_values,  # create_domain_features uygulanmış, encode edilmiş değerler
+            input_data
+        )
     
     return {
         "risk_score": risk_score,
@@ -570,14 +1522,356 @@ def predict_risk(input_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def get_model_metrics() -> Dict[str, Any]:
+def read_application_records(lines: Iterable[str], input_format: str) -> Iterator[Any]:
     """
-    Eğitilmiş modelin performans metriklerini döndürür.
+    CSV veya NDJSON satırlarını tembel olarak başvuru kayıtlarına çevirir.
+    
+    Bellekte yalnızca o an okunan satır tutulur. CSV'deki boş hücreler eksik
+    alan sayılır. Okunamayan NDJSON satırları ValueError nesnesi olarak döner,
+    böylece skorlama sırasında yalnızca o satır için hata raporlanır.
+    
+    Args:
+        lines: Metin satırları (dosya nesnesi veya liste)
+        input_format: 'csv' veya 'ndjson'
+    """
+    if input_format == 'csv':
+        for record in csv.DictReader(lines):
+            yield {k: v for k, v in record.items() if k is not None and v not in ('', None)}
+    elif input_format == 'ndjson':
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ValueError(f"Geçersiz JSON satırı: {str(e)}")
+    else:
+        raise ValueError(f"Desteklenmeyen format: {input_format} (csv veya ndjson olmalı)")
+
+
+class RecordLineSplitter:
+    """
+    Parça parça gelen metni tam kayıt satırlarına böler (ağdan akan istek gövdesi için).
+    
+    Parçalar satır ortasında bitebilir; yarım kalan satır bir sonraki parçaya
+    taşınır. CSV'de tırnak içindeki satır sonları kaydı bölmez: satır, o ana
+    kadarki tırnak sayısı çiftse tamamlanmış sayılır. Kapanmayan tırnak belleği
+    büyütmesin diye tek kayıt STREAM_MAX_RECORD_CHARS ile sınırlıdır.
+    """
+    
+    def __init__(self, input_format: str, max_record_chars: int = STREAM_MAX_RECORD_CHARS):
+        self.quoted = input_format == 'csv'
+        self.max_record_chars = max_record_chars
+        self._partial: List[str] = []
+        self._partial_chars = 0
+        self._open_quote = False
+    
+    def _append(self, piece: str) -> None:
+        if self.quoted and piece.count('"') % 2:
+            self._open_quote = not self._open_quote
+        self._partial.append(piece)
+        self._partial_chars += len(piece)
+        if self._partial_chars > self.max_record_chars:
+            raise ValueError(f"Kayıt {self.max_record_chars} karakterden uzun (kapanmamış tırnak olabilir)")
+    
+    def _take(self) -> str:
+        line = ''.join(self._partial)
+        self._partial.clear()
+        self._partial_chars = 0
+        return line
+    
+    def feed(self, text: str) -> List[str]:
+        """Metin parçasını ekler, tamamlanan satırları döndürür."""
+        pieces = text.split('\n')
+        lines = []
+        for piece in pieces[:-1]:
+            self._append(piece + '\n')
+            if not self._open_quote:
+                lines.append(self._take())
+        if pieces[-1]:
+            self._append(pieces[-1])
+        return lines
+    
+    def close(self) -> List[str]:
+        """Girdi bittiğinde satır sonu olmadan kalan son satırı döndürür."""
+        line = self._take()
+        return [line] if line.strip() else []
+
+
+def score_record_lines(lines: List[str], input_format: str, start_index: int = 0,
+                       header: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Akıştan gelen tam satırları ayrıştırıp tek parça olarak skorlar.
+    
+    CSV'de başlık satırı her parçanın önüne eklenir; ayrıştırma da skorlama ile
+    birlikte çıkarım havuzunda çalışır.
+    """
+    if header is not None:
+        lines = [header, *lines]
+    return score_records_chunk(list(read_application_records(lines, input_format)), start_index)
+
+
+def score_records_chunk(records: List[Any], start_index: int = 0,
+                        validate=validate_application) -> List[Dict[str, Any]]:
+    """
+    Bir parça başvuru kaydını doğrular ve predict_risk_batch ile tek seferde skorlar.
+    
+    Args:
+        records: Ham başvuru kayıtları (read_application_records çıktısı)
+        start_index: Parçanın ilk kaydının akıştaki sırası
+        validate: Ham kaydı giriş sözlüğüne çeviren fonksiyon (hatada ValueError)
+        
+    Returns:
+        Giriş sırasıyla {"index", "status", ...sonuç} veya {"index", "status", "error"} kayıtları
+    """
+    outputs: List[Dict[str, Any]] = [None] * len(records)
+    valid_positions = []
+    valid_inputs = []
+    
+    for position, raw in enumerate(records):
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            input_data = validate(raw)
+        except ValueError as e:
+            outputs[position] = {"index": start_index + position, "status": "error", "error": str(e)}
+            continue
+        valid_positions.append(position)
+        valid_inputs.append(input_data)
+    
+    for position, result in zip(valid_positions, predict_risk_batch(valid_inputs, use_cache=False)):
+        outputs[position] = {"index": start_index + position, "status": "ok", **result}
+    
+    return outputs
+
+
+def score_application_stream(records: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE,
+                             validate=validate_application) -> Iterator[Dict[str, Any]]:
+    """
+    Başvuru kayıtlarını sabit boyutlu parçalar halinde skorlar ve sonuçları üretildikçe döndürür.
+    
+    Bellek kullanımı girdi boyutundan bağımsızdır; aynı anda en fazla bir parça tutulur.
+    """
+    iterator = iter(records)
+    start_index = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        yield from score_records_chunk(chunk, start_index, validate)
+        start_index += len(chunk)
+
+
+# Arka plan yeniden eğitim işleri: tek işçili havuz, aynı anda tek eğitim
+_retrain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrain")
+MAX_RETRAIN_JOB_HISTORY = 20
+RETRAIN_MODES = ("full", "incremental")
+RETRAIN_TARGETS = ("champion", "shadow")
+
+# İş kayıtları ve artımlı eğitimi bekleyen etiketli başvurular artifact'ın yanında tutulur;
+# çok worker'lı dağıtımda tüm worker'lar aynı kayıtları görür
+retrain_jobs = RetrainJobStore(f"{MODEL_ARTIFACT_PATH}.jobs", MAX_RETRAIN_JOB_HISTORY)
+labeled_outcomes = LabeledOutcomeStore(f"{MODEL_ARTIFACT_PATH}.labeled.jsonl")
+
+
+def add_labeled_outcomes(records: List[Dict[str, Any]], labels: List[int]) -> int:
+    """
+    Gerçekleşen sonucu bilinen başvuruları bir sonraki artımlı eğitim için biriktirir.
+    
+    Satırlar artifact'ın yanındaki ortak kuyruğa yazılır; artımlı eğitimle modele
+    eklendikten sonra eğitim durumu ile birlikte artifact'a yazılır.
+    
+    Returns:
+        Bekleyen etiketli satır sayısı (tüm worker'lar)
+    """
+    return labeled_outcomes.add(records, labels)
+
+
+def pending_labeled_outcomes() -> int:
+    return labeled_outcomes.count()
+
+
+def start_retrain_job(mode: str = "full", target: str = "champion") -> Dict[str, Any]:
+    """
+    Modeli arka planda yeniden eğitecek bir iş başlatır ve hemen döner.
+    
+    Eğitim sırasında mevcut model hizmet vermeye devam eder; yeni model,
+    encoder'lar, threshold ve metrikler hazır olduğunda tek bir snapshot
+    olarak atomik şekilde yayına alınır. Diğer worker'lar yeni artifact'ı
+    sync_published_model ile yükler. Herhangi bir worker'da bekleyen veya
+    çalışan bir iş varsa yeni iş açılmaz, mevcut iş döndürülür.
+    
+    Args:
+        mode: "full" veri setiyle baştan eğitim, "incremental" bekleyen etiketli
+            satırlarla ağaçların bir kısmını yenileme (bkz. fit_incremental_snapshot)
+        target: "champion" yeni modeli yayına alır, "shadow" gölge model olarak
+            canlı trafikle karşılaştırır (yayına alma: promote_shadow_model)
+    
+    Returns:
+        İş kaydı (job_id, status, mode, target, ...)
+    
+    Raises:
+        ValueError: Bilinmeyen mod veya hedef
+    """
+    if mode not in RETRAIN_MODES:
+        raise ValueError(f"Bilinmeyen yeniden eğitim modu: {mode} (seçenekler: {', '.join(RETRAIN_MODES)})")
+    if target not in RETRAIN_TARGETS:
+        raise ValueError(f"Bilinmeyen yeniden eğitim hedefi: {target} (seçenekler: {', '.join(RETRAIN_TARGETS)})")
+    
+    job, created = retrain_jobs.create({
+        'job_id': uuid.uuid4().hex,
+        'status': 'queued',
+        'mode': mode,
+        'target': target,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'started_at': None,
+        'finished_at': None,
+        'model_version': None,
+        'metrics': None,
+        'error': None
+    })
+    if created:
+        _retrain_executor.submit(_run_retrain_job, job['job_id'], mode, target)
+    return job
+
+
+def get_retrain_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Yeniden eğitim işinin durumunu döndürür (işi hangi worker çalıştırırsa çalıştırsın); yoksa None."""
+    return retrain_jobs.get(job_id)
+
+
+def _update_retrain_job(job_id: str, **fields) -> None:
+    retrain_jobs.update(job_id, **fields)
+
+
+def _run_retrain_job(job_id: str, mode: str = "full", target: str = "champion") -> None:
+    """Arka plan iş parçacığında modeli eğitir; yeni snapshot'ı yayına alır veya gölge model yapar."""
+    _update_retrain_job(job_id, status='running', started_at=datetime.now(timezone.utc).isoformat())
+    logger.info("Model yeniden eğitiliyor", extra=log_fields(job_id=job_id, mode=mode, target=target))
+    taken = []
+    try:
+        if mode == "incremental":
+            # Artımlı eğitim başka bir worker'ın en son yayına aldığı modelden başlar
+            sync_published_model()
+            current = ensure_model()
+            # Gölge eğitimde satırlar kuyrukta kalır: gölge model yayına alınmayabilir
+            pending = labeled_outcomes.take(remove=target == "champion")
+            if target == "champion":
+                taken = pending
+            if not pending:
+                raise ValueError("Artımlı eğitim için bekleyen etiketli başvuru yok.")
+            records, labels = zip(*pending)
+            with record_training(mode):
+                snapshot = fit_incremental_snapshot(current, list(records), list(labels))
+        else:
+            with record_training(mode):
+                snapshot = fit_model_snapshot()
+        if target == "shadow":
+            shadow_evaluator.set_challenger(snapshot, source=f"retrain:{mode}")
+        else:
+            # Yayına alma ve artifact yazımı arasında sync_published_model eski sürümü geri yüklemesin
+            with _model_lock:
+                publish_snapshot(snapshot)
+                set_model_state("ready")
+                taken = []  # Etiketli satırlar artık yayındaki modelin eğitim durumunda
+                try:
+                    save_model_artifact(snapshot=snapshot)
+                except OSError as e:
+                    logger.warning("Model artifact'ı yazılamadı", extra=log_fields(error=str(e)))
+        _prune_training_rows()
+        _update_retrain_job(
+            job_id,
+            status='succeeded',
+            finished_at=datetime.now(timezone.utc).isoformat(),
+            model_version=snapshot.model_version,
+            metrics=get_model_metrics(snapshot)
+        )
+        logger.info("Model yeniden eğitimi tamamlandı", extra=log_fields(
+            job_id=job_id, mode=mode, target=target, model_version=snapshot.model_version))
+    except Exception as e:
+        logger.exception("Model yeniden eğitimi başarısız", extra=log_fields(job_id=job_id, mode=mode))
+        # Kullanılamayan etiketli satırlar bir sonraki artımlı eğitim için geri konur
+        labeled_outcomes.restore(taken)
+        _update_retrain_job(
+            job_id,
+            status='failed',
+            finished_at=datetime.now(timezone.utc).isoformat(),
+            error=str(e)
+        )
+
+
+def _prune_training_rows() -> None:
+    """Yayındaki ve gölge modelin kullanmadığı eski eğitim satırı dosyalarını siler."""
+    protected = [snapshot.training_state.rows.name
+                 for snapshot in (current_snapshot, shadow_evaluator.challenger)
+                 if snapshot is not None and snapshot.training_state is not None
+                 and snapshot.training_state.rows is not None]
+    try:
+        prune_training_rows(TRAINING_ROWS_DIR, protected=protected)
+    except OSError as e:
+        logger.warning("Eski eğitim satırları silinemedi", extra=log_fields(error=str(e)))
+
+
+def load_shadow_model(path: str = None) -> Dict[str, Any]:
+    """
+    Artifact dosyasındaki modeli gölge (challenger) model olarak ayarlar; yayındaki model değişmez.
+    
+    Returns:
+        Gölge değerlendirme raporu (shadow_evaluator.report)
+    
+    Raises:
+        ValueError: Yol verilmemişse veya artifact yüklenemiyorsa
+    """
+    path = path or SHADOW_MODEL_PATH
+    if not path:
+        raise ValueError("Gölge model artifact yolu verilmemiş (CREDITGUARD_SHADOW_MODEL_PATH).")
+    snapshot = read_model_artifact(path)
+    if snapshot is None:
+        raise ValueError(f"Gölge model artifact'ı yüklenemedi: {path}")
+    shadow_evaluator.set_challenger(snapshot, source="artifact")
+    return shadow_evaluator.report()
+
+
+def clear_shadow_model() -> bool:
+    """Gölge modeli kaldırır; kaldırılacak model yoksa False."""
+    challenger = shadow_evaluator.clear_challenger()
+    if challenger is not None:
+        logger.info("Gölge model kaldırıldı", extra=log_fields(challenger_version=challenger.model_version))
+    return challenger is not None
+
+
+def promote_shadow_model() -> ModelSnapshot:
     """
-    global model_metrics
+    Gölge modeli yayına alır (champion yapar) ve artifact'a yazar; gölge model kaldırılır.
     
-    if not model_metrics:
+    Raises:
+        ValueError: Gölge model yoksa
+    """
+    challenger = shadow_evaluator.clear_challenger()
+    if challenger is None:
+        raise ValueError("Yayına alınacak gölge model yok.")
+    with _model_lock:
+        publish_snapshot(challenger)
+        set_model_state("ready")
+        logger.info("Gölge model yayına alındı", extra=log_fields(model_version=challenger.model_version))
+        try:
+            save_model_artifact(snapshot=challenger)
+        except OSError as e:
+            logger.warning("Model artifact'ı yazılamadı", extra=log_fields(error=str(e)))
+    return challenger
+
+
+def get_model_metrics(snapshot: ModelSnapshot = None) -> Dict[str, Any]:
+    """
+    Eğitilmiş modelin performans metriklerini döndürür.
+    
+    Args:
+        snapshot: Metrikleri okunacak snapshot (varsayılan: yayındaki model)
+    """
+    snapshot = snapshot or current_snapshot
+    if snapshot is None or not snapshot.model_metrics:
         raise ValueError("Model henüz eğitilmemiş veya metrikler hesaplanmamış.")
+    model_metrics = snapshot.model_metrics
     
     return {
         "metrics": {
@@ -587,46 +1881,44 @@ def get_model_metrics() -> Dict[str, Any]:
             "f1": model_metrics['f1']
         },
         "confusion_matrix": model_metrics['confusion_matrix'],
-        "dataset_info": f"German Credit Data ({model_metrics['total_samples']} Samples)"
+        "dataset_info": f"German Credit Data ({model_metrics['total_samples']} Samples)",
+        # Eğitimde hesaplanan threshold eğrisi (eski artifact'larda yok)
+        "threshold_curve": model_metrics.get('threshold_curve')
     }
 
 
-def get_sample_data(include_target: bool = False) -> Dict[str, Any]:
+def get_sample_data_json(include_target: bool = False, risk: Optional[str] = None,
+                         seed: Optional[int] = None) -> bytes:
     """
-    Veri setinden rastgele bir örnek döndürür (formu otomatik doldurmak için).
+    Veri setinden rastgele bir örneğin hazır JSON gövdesini döndürür (formu otomatik doldurmak için).
     
     Args:
         include_target: True ise, gerçek risk durumunu da döndürür (test için)
+        risk: 'bad' / 'good' verilirse yalnızca o sınıftan örnek seçilir
+        seed: Verilirse aynı örnek döner (tekrarlanabilir demo / test)
         
     Returns:
-        Örnek veri (encode edilmemiş, frontend'e gönderilebilir format)
+        Örnek veri (encode edilmemiş, frontend'e gönderilebilir JSON baytları)
     """
-    global original_dataset
+    snapshot = current_snapshot
+    store = snapshot.sample_store if snapshot is not None else None
     
-    if original_dataset is None or len(original_dataset) == 0:
+    if store is None or len(store) == 0:
         raise ValueError("Veri seti henüz yüklenmemiş. Önce train_model() çağrılmalı.")
     
-    # Rastgele bir satır seç
-    random_idx = np.random.randint(0, len(original_dataset))
-    sample = original_dataset.iloc[random_idx].to_dict()
-    
-    # 'class' ve 'target' sütunlarını kaldır (frontend'e göndermeye gerek yok)
-    result = {}
-    for key, value in sample.items():
-        if key not in ['class', 'target']:
-            result[key] = value
-    
-    # Eğer istenirse, gerçek risk durumunu da ekle
-    if include_target and 'class' in sample:
-        result['actual_risk'] = 'bad' if sample['class'] == 'bad' else 'good'
-        result['actual_risk_label'] = 'Riskli' if sample['class'] == 'bad' else 'Güvenli'
-    
-    return result
+    return store.row_json(store.pick(risk=risk, seed=seed), include_target=include_target)
+
+
+def get_sample_data(include_target: bool = False, risk: Optional[str] = None,
+                    seed: Optional[int] = None) -> Dict[str, Any]:
+    """get_sample_data_json ile aynı örneği sözlük olarak döndürür."""
+    return json.loads(get_sample_data_json(include_target=include_target, risk=risk, seed=seed))
 
 
 # Model eğitimi lazy loading ile yapılacak (ilk API çağrısında)
-# Uygulama başlatıldığında modeli eğitme - sadece test için
+# Komut satırı arayüzü cli.py'dedir; bu modül doğrudan çalıştırılırsa oraya devredilir.
+# cli, ml_service'i normal import ile yükler: tuning / chunked_training ile aynı modül örneği kullanılır.
 if __name__ == "__main__":
-    train_model()
+    from cli import run_cli
+    run_cli()
 # Modül import edildiğinde modeli eğitme - lazy loading kullanılacak
-
@@ -0,0 +1,131 @@
+"""
+CreditGuard AI - Tahmin Önbelleği
+Aynı başvurunun tekrar tekrar skorlanmasını önleyen LRU + TTL önbellek.
+
+Anahtar, ham istek gövdesi değil, FeaturePlan.encode sonrası tamamen
+encode edilmiş feature vektörüdür (saving_status -> savings_status eşlemesi ve
+varsayılan doldurma uygulanmış). Böylece alan sırası, eşlenen alan isimleri
+veya varsayılan değerin açıkça gönderilmesi gibi farklar aynı kayda düşer.
+Önbellek, yayındaki model snapshot'ı değiştiğinde (yeniden eğitim, artifact
+yükleme) kendiliğinden boşaltılır.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Önbellek ayarları: PREDICTION_CACHE_SIZE=0 önbelleği kapatır
+PREDICTION_CACHE_SIZE = int(os.getenv("CREDITGUARD_PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("CREDITGUARD_PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+
+def feature_vector_key(feature_names: List[str], feature_values: Dict[str, Any]) -> bytes:
+    """
+    Encode edilmiş feature değerlerinden sabit uzunluklu önbellek anahtarı üretir.
+
+    Değerler float32 satır yerine float64 olarak alınır ve her feature için
+    değerin float olup olmadığı da anahtara eklenir: açıklama kuralları bu iki
+    bilgiye de bakar (ör. 10000.0001 float32'de 10000'e yuvarlanır ama
+    "Kredi Tutarı yüksek" kuralını tetikler), aynı anahtar aynı yanıtı garanti eder.
+    """
+    values = [feature_values[name] for name in feature_names]
+    vector = np.array(values, dtype=np.float64)
+    float_flags = np.array([isinstance(value, float) for value in values], dtype=np.bool_)
+    return hashlib.blake2b(vector.tobytes() + float_flags.tobytes(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU + TTL tahmin önbelleği.
+
+    En fazla max_size kayıt tutar; dolduğunda en uzun süredir kullanılmayan
+    kayıt atılır (eviction), ttl_seconds'ı aşan kayıtlar okunurken düşürülür
+    (expiration). Her işlemde verilen snapshot önceki ile aynı nesne değilse
+    tüm önbellek boşaltılır (invalidation).
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._owner: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _check_owner(self, snapshot: Any) -> None:
+        # Kilit altında çağrılır
+        if snapshot is not self._owner:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._owner = snapshot
+
+    def get(self, snapshot: Any, key: bytes) -> Optional[Dict[str, Any]]:
+        """Kayıt varsa ve süresi dolmadıysa sonucun bir kopyasını döndürür."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_owner(snapshot)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, result = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(result)
+
+    def put(self, snapshot: Any, key: bytes, result: Dict[str, Any]) -> None:
+        """Sonucu önbelleğe yazar; kapasite aşılırsa en eski kaydı atar."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._check_owner(snapshot)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Tüm kayıtları atar (yeni model yayına alındığında); kayıt varsa invalidation sayılır."""
+        with self._lock:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._owner = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction sayaçları ve doluluk."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,205 @@
+"""
+CreditGuard AI - Örnek Veri Deposu
+/sample-data için eğitimde bir kez oluşturulan kompakt, indeksli örnek satırlar.
+
+- Kategorik sütunlar küçük tamsayı kod dizileri (int8/int16) ve kategori
+  listeleri, numeric sütunlar en küçük uygun tamsayı tipinde veya float64
+  dizilerde tutulur; tam DataFrame kopyası süreç boyunca saklanmaz.
+- Her satırın JSON gövdesi (hedef alanları olmadan) tek bir bayt dizisinde
+  önceden serileştirilir; istek anında yalnızca bir dilim okunur. Gerçek risk
+  durumu istenirse önceden hazırlanmış sonek eklenir.
+- Satırlar sınıf bazında (good / bad) indekslenir; seçim sınıfa göre
+  (stratified) ve seed ile tekrarlanabilir yapılabilir.
+- Veri seti SAMPLE_STORE_MAX_ROWS'tan büyükse sınıf oranları korunarak bu
+  kadar satır saklanır (bellek veri seti boyutundan bağımsızdır).
+
+Diziler numpy olduğu için artifact memory-map ile yüklendiğinde worker'lar
+arasında paylaşılır.
+"""
+
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Saklanacak en fazla örnek satır sayısı
+SAMPLE_STORE_MAX_ROWS = int(os.getenv("CREDITGUARD_SAMPLE_STORE_MAX_ROWS", "10000"))
+
+# Hedef sütunu değerleri ve yanıttaki karşılıkları
+RISK_LABELS = {'bad': 1, 'good': 0}
+RISK_LABEL_NAMES = {1: ('bad', 'Riskli'), 0: ('good', 'Güvenli')}
+
+# Örnek gövdesine girmeyen sütunlar
+EXCLUDED_COLUMNS = ('class', 'target')
+
+
+def _smallest_int_dtype(values: np.ndarray) -> np.dtype:
+    """Değerleri kayıpsız tutan en küçük işaretli tamsayı tipi."""
+    if len(values) == 0:
+        return np.dtype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _json_ready(values: List[Any]) -> List[Any]:
+    """NaN değerlerini JSON null'a çevirir (geçerli JSON için)."""
+    return [None if isinstance(value, float) and value != value else value for value in values]
+
+
+class SampleStore:
+    """
+    Kompakt örnek satır deposu.
+
+    Satır i'nin JSON gövdesi blob[offsets[i]:offsets[i + 1]] aralığıdır.
+    Değişmezdir; snapshot'lar ve artifact ile birlikte paylaşılır.
+    """
+
+    def __init__(self, columns: List[str], categorical: Dict[str, Tuple[np.ndarray, List[str]]],
+                 numeric: Dict[str, np.ndarray], labels: Optional[np.ndarray], offsets: np.ndarray,
+                 blob: np.ndarray, source_rows: int):
+        self.columns = columns
+        self.categorical = categorical  # sütun -> (kodlar, kategoriler); -1 = eksik
+        self.numeric = numeric
+        self.labels = labels  # 1 = bad, 0 = good; hedef sütunu yoksa None
+        self.offsets = offsets
+        self.blob = blob
+        self.source_rows = source_rows  # Deponun oluşturulduğu veri setindeki satır sayısı
+        self._rows_by_label = {} if labels is None else {
+            label: np.flatnonzero(labels == label) for label in RISK_LABEL_NAMES
+        }
+        self._target_suffixes = {
+            label: (',' + json.dumps({'actual_risk': risk, 'actual_risk_label': name},
+                                     ensure_ascii=False, separators=(",", ":"))[1:]).encode("utf-8")
+            for label, (risk, name) in RISK_LABEL_NAMES.items()
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, target_column: str = 'class',
+                   max_rows: int = SAMPLE_STORE_MAX_ROWS, seed: int = 42,
+                   source_rows: Optional[int] = None) -> "SampleStore":
+        """
+        Encode edilmemiş veri setinden depo oluşturur.
+
+        Hedef dışındaki sütunlar veri setindeki sırayla saklanır; DataFrame
+        bu çağrıdan sonra tutulmaz. df veri setinin kendisi değil bir
+        örneğiyse (parça parça eğitim) source_rows veri setinin satır sayısıdır.
+        """
+        labels = None
+        if target_column in df.columns:
+            labels = (df[target_column].astype(str).to_numpy() == 'bad').astype(np.int8)
+
+        frame_rows = len(df)
+        rows = np.arange(frame_rows)
+        if frame_rows > max_rows:
+            rng = np.random.default_rng(seed)
+            if labels is None:
+                rows = np.sort(rng.choice(frame_rows, size=max_rows, replace=False))
+            else:
+                # Sınıf oranları korunarak örneklenir
+                picked = []
+                for label in np.unique(labels):
+                    class_rows = np.flatnonzero(labels == label)
+                    size = max(1, int(round(max_rows * len(class_rows) / frame_rows)))
+                    picked.append(rng.choice(class_rows, size=min(size, len(class_rows)), replace=False))
+                rows = np.sort(np.concatenate(picked))
+            labels = labels[rows] if labels is not None else None
+
+        columns = [col for col in df.columns if col not in EXCLUDED_COLUMNS]
+        categorical: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        numeric: Dict[str, np.ndarray] = {}
+        decoded: List[List[Any]] = []
+        for col in columns:
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.to_numpy()[rows]
+                if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+                    values = values.astype(_smallest_int_dtype(values))
+                else:
+                    values = values.astype(np.float64)
+                numeric[col] = values
+                decoded.append(_json_ready(values.tolist()))
+            else:
+                categories = series.astype('category')
+                codes = categories.cat.codes.to_numpy()[rows]
+                names = [str(name) for name in categories.cat.categories]
+                codes = codes.astype(np.int8 if len(names) < 127 else np.int16)
+                categorical[col] = (codes, names)
+                decoded.append([names[code] if code >= 0 else None for code in codes.tolist()])
+
+        bodies = [
+            json.dumps(dict(zip(columns, values)), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            for values in zip(*decoded)
+        ] if columns else [b"{}"] * len(rows)
+        offsets = np.zeros(len(bodies) + 1, dtype=np.int64)
+        np.cumsum([len(body) for body in bodies], out=offsets[1:])
+        blob = np.frombuffer(b"".join(bodies), dtype=np.uint8)
+        return cls(columns, categorical, numeric, labels, offsets, blob,
+                   frame_rows if source_rows is None else source_rows)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Dizilerin toplam boyutu (bayt)."""
+        arrays = [self.offsets, self.blob, *self.numeric.values()]
+        arrays += [codes for codes, _ in self.categorical.values()]
+        if self.labels is not None:
+            arrays.append(self.labels)
+        return int(sum(array.nbytes for array in arrays))
+
+    def pick(self, risk: Optional[str] = None, seed: Optional[int] = None) -> int:
+        """
+        Rastgele bir satır indeksi seçer.
+
+        Args:
+            risk: 'bad' / 'good' verilirse yalnızca o sınıftan seçilir
+            seed: Verilirse aynı seed her zaman aynı satırı döndürür
+
+        Raises:
+            ValueError: Depo boşsa, risk geçersizse veya o sınıfta satır yoksa
+        """
+        if risk is None:
+            candidates = None
+            size = len(self)
+        else:
+            if risk not in RISK_LABELS:
+                raise ValueError(f"risk 'bad' veya 'good' olmalı, gelen: {risk}")
+            if self.labels is None:
+                raise ValueError("Örnek veride gerçek risk bilgisi yok.")
+            candidates = self._rows_by_label[RISK_LABELS[risk]]
+            size = len(candidates)
+        if size == 0:
+            raise ValueError("Örnek veri bulunamadı.")
+
+        position = (random.Random(seed) if seed is not None else random).randrange(size)
+        return int(position if candidates is None else candidates[position])
+
+    def row_json(self, index: int, include_target: bool = False) -> bytes:
+        """Satırın hazır JSON gövdesi; include_target ise actual_risk alanları eklenir."""
+        body = self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes()
+        if include_target and self.labels is not None:
+            body = body[:-1] + self._target_suffixes[int(self.labels[index])]
+        return body
+
+    def row(self, index: int, include_target: bool = False) -> Dict[str, Any]:
+        return json.loads(self.row_json(index, include_target))
+
+    def records(self, indices: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """Satırları tipli dizilerden sözlük olarak çözer (hedef sütunu hariç)."""
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        decoded = []
+        for col in self.columns:
+            if col in self.categorical:
+                codes, names = self.categorical[col]
+                decoded.append([names[code] if code >= 0 else None for code in codes[indices].tolist()])
+            else:
+                decoded.append(self.numeric[col][indices].tolist())
+        return [dict(zip(self.columns, values)) for values in zip(*decoded)]
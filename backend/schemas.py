@@ -0,0 +1,119 @@
+"""
+CreditGuard AI - Veri Şemaları
+Kredi başvurusu doğrulama şeması; API ve toplu skorlama (CLI) tarafından ortak kullanılır.
+"""
+
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, Dict, Any, Tuple
+
+
+# Tahmin için zorunlu alanlar (saving_status -> savings_status mapping sonrası)
+REQUIRED_FIELDS = ['duration', 'credit_amount', 'age', 'housing', 'checking_status', 'purpose', 'savings_status']
+
+
+class CreditApplication(BaseModel):
+    # Zorunlu numeric feature'lar
+    duration: int = Field(..., ge=1, le=120, description="Kredi süresi (ay)")
+    credit_amount: float = Field(..., ge=0, description="Kredi tutarı")
+    age: int = Field(..., ge=18, le=100, description="Yaş")
+    
+    # Zorunlu categorical feature'lar
+    housing: str = Field(..., description="Konut durumu")
+    savings_status: Optional[str] = Field(None, description="Tasarruf durumu")  # Veri setinde 'savings_status'
+    saving_status: Optional[str] = Field(None, description="Tasarruf durumu (alternatif isim, frontend uyumluluğu için)")  # Frontend'den gelebilir
+    checking_status: str = Field(..., description="Hesap durumu")
+    purpose: str = Field(..., description="Kredi amacı")
+    
+    # Opsiyonel numeric feature'lar
+    installment_commitment: Optional[int] = Field(None, ge=1, le=4, description="Taksit taahhüdü")
+    residence_since: Optional[int] = Field(None, ge=1, le=4, description="İkamet süresi")
+    existing_credits: Optional[int] = Field(None, ge=1, le=4, description="Mevcut krediler")
+    num_dependents: Optional[int] = Field(None, ge=1, le=2, description="Bağımlı sayısı")
+    
+    # Opsiyonel categorical feature'lar
+    credit_history: Optional[str] = Field(None, description="Kredi geçmişi")
+    employment: Optional[str] = Field(None, description="İstihdam durumu")
+    personal_status: Optional[str] = Field(None, description="Kişisel durum")
+    other_parties: Optional[str] = Field(None, description="Diğer taraflar")
+    property_magnitude: Optional[str] = Field(None, description="Mülkiyet büyüklüğü")
+    other_payment_plans: Optional[str] = Field(None, description="Diğer ödeme planları")
+    job: Optional[str] = Field(None, description="Meslek")
+    own_telephone: Optional[str] = Field(None, description="Telefon")
+    foreign_worker: Optional[str] = Field(None, description="Yabancı işçi")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "duration": 24,
+                "credit_amount": 5000,
+                "age": 35,
+                "housing": "own",
+                "savings_status": "100<=X<500",
+                "checking_status": "0<=X<200",
+                "purpose": "new car"
+            }
+        }
+
+
+def application_to_input(application: CreditApplication) -> Dict[str, Any]:
+    """
+    Doğrulanmış başvuruyu ml_service'in beklediği giriş sözlüğüne çevirir.
+    Eksik zorunlu alan varsa ValueError fırlatır.
+    """
+    # Giriş verisini dict'e çevir (None değerleri filtrele)
+    input_data = {k: v for k, v in application.dict().items() if v is not None}
+    
+    # saving_status -> savings_status mapping (frontend uyumluluğu için)
+    if 'saving_status' in input_data and 'savings_status' not in input_data:
+        input_data['savings_status'] = input_data.pop('saving_status')
+    
+    # Temel alanların varlığını kontrol et
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in input_data]
+    if missing_fields:
+        raise ValueError(f"Eksik alanlar: {', '.join(missing_fields)}")
+    
+    return input_data
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Pydantic doğrulama hatasını tek satırlık mesaja çevirir."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def validate_application(raw: Any) -> Dict[str, Any]:
+    """
+    Ham başvuru kaydını (JSON nesnesi veya CSV satırı) doğrulayıp giriş sözlüğüne çevirir.
+    Geçersiz kayıtlarda okunabilir mesajla ValueError fırlatır.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Başvuru bir JSON nesnesi olmalı.")
+    try:
+        application = CreditApplication(**raw)
+    except ValidationError as e:
+        raise ValueError(format_validation_error(e))
+    return application_to_input(application)
+
+
+# Etiketli başvurularda gerçekleşen sonuç alanı: 'bad' -> 1 (Riskli), 'good' -> 0 (Güvenli)
+OUTCOME_FIELD = 'actual_risk'
+OUTCOME_LABELS = {'bad': 1, 'good': 0}
+
+
+def validate_labeled_application(raw: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Gerçekleşen sonucu bilinen başvuruyu (actual_risk: 'bad' / 'good') doğrular.
+    Geçersiz kayıtlarda ValueError fırlatır.
+    
+    Returns:
+        (input_data, label): validate_application çıktısı ve etiket (1 = riskli)
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Başvuru bir JSON nesnesi olmalı.")
+    raw = dict(raw)
+    outcome = raw.pop(OUTCOME_FIELD, None)
+    if outcome not in OUTCOME_LABELS:
+        raise ValueError(f"{OUTCOME_FIELD}: 'bad' veya 'good' olmalı")
+    return validate_application(raw), OUTCOME_LABELS[outcome]
@@ -0,0 +1,348 @@
+"""
+CreditGuard AI - Gölge (Shadow) Model Değerlendirmesi
+Aday modeli (challenger) yayındaki modelin (champion) canlı trafiğiyle, yanıt yolunu yavaşlatmadan karşılaştırır.
+
+- İstek yolunda yalnızca champion'ın encode ettiği satırlar ve sonuçları
+  sınırlı bir kuyruğa eklenir (~1 µs); challenger yoksa hiçbir şey yapılmaz.
+- Challenger skorlaması ayrı bir iş parçacığında, SHADOW_BATCH_SIZE satırlık
+  mikro-batch'lerle yapılır. Encoder'lar aynıysa champion'ın satırları
+  yeniden kullanılır, değilse kayıtlar challenger'ın planı ile encode edilir.
+- Yük altında gölge iş düşürülür, tahmin yolu beklemez:
+  kuyruk doluysa yeni gözlemler ("queue_full"), yük sondası (load_probe)
+  meşgul dediği sürece bekleyip SHADOW_MAX_DELAY_SECONDS'tan eski kalan
+  gözlemler ("stale") sayılarak atılır.
+- Karşılaştırma: API kararı (APPROVE / REVIEW / REJECT) ve her modelin kendi
+  optimal threshold'una göre sınıflandırma uyuşmazlıkları, olasılık
+  farklarının (challenger - champion) ortalaması ve mutlak farkın dağılımı.
+  Farklar sabit kovalı histogramda tutulur; bellek trafikten bağımsızdır.
+
+Champion veya challenger değişince istatistikler sıfırlanır.
+Çok worker'lı dağıtımda her worker kendi challenger'ını ve istatistiklerini tutar.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app_logging import get_logger, log_fields
+
+logger = get_logger("shadow")
+
+# Skorlanmayı bekleyen en fazla satır; dolunca yeni gözlemler düşürülür
+SHADOW_QUEUE_SIZE = int(os.getenv("CREDITGUARD_SHADOW_QUEUE_SIZE", "2048"))
+
+# Challenger'ın tek seferde skorladığı en fazla satır: mikro-batch sürerken gelen istek en fazla
+# bu kadar satırın skorlanmasını bekler (200 ağaç, flat motor, 8 satır ~0.6 ms)
+SHADOW_BATCH_SIZE = int(os.getenv("CREDITGUARD_SHADOW_BATCH_SIZE", "8"))
+
+# Yük altında bekleyen gözlemlerin atılmadan önce en fazla bekleme süresi
+SHADOW_MAX_DELAY_SECONDS = float(os.getenv("CREDITGUARD_SHADOW_MAX_DELAY_SECONDS", "2"))
+
+# İş parçacığının kuyruğu kontrol etme aralığı
+SHADOW_POLL_SECONDS = float(os.getenv("CREDITGUARD_SHADOW_POLL_MS", "20")) / 1000
+
+# Mutlak olasılık farkı histogramının kova sayısı ([0, 1] aralığı; kova 0 yalnızca tam eşitlik)
+DELTA_BINS = 1000
+
+DROP_REASONS = ("queue_full", "stale")
+
+
+class ShadowStats:
+    """Bir champion / challenger çifti için birikimli karşılaştırma sayaçları."""
+
+    def __init__(self, champion_version: str, champion_threshold: float, n_decisions: int):
+        self.champion_version = champion_version
+        self.champion_threshold = champion_threshold
+        self.since = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.rows = 0
+        self.decision_changes = np.zeros((n_decisions, n_decisions), dtype=np.int64)  # [champion, challenger]
+        self.threshold_disagreements = 0
+        self.champion_positive = 0
+        self.challenger_positive = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.abs_delta_counts = np.zeros(DELTA_BINS + 1, dtype=np.int64)
+
+    def update(self, champion_proba: np.ndarray, challenger_proba: np.ndarray,
+               champion_decisions: np.ndarray, challenger_decisions: np.ndarray,
+               champion_threshold: float, challenger_threshold: float) -> None:
+        n_decisions = len(self.decision_changes)
+        np.add.at(self.decision_changes.reshape(-1), champion_decisions * n_decisions + challenger_decisions, 1)
+        champion_positive = champion_proba >= champion_threshold
+        challenger_positive = challenger_proba >= challenger_threshold
+        self.threshold_disagreements += int(np.count_nonzero(champion_positive != challenger_positive))
+        self.champion_positive += int(np.count_nonzero(champion_positive))
+        self.challenger_positive += int(np.count_nonzero(challenger_positive))
+
+        delta = challenger_proba - champion_proba
+        abs_delta = np.abs(delta)
+        self.delta_sum += float(delta.sum())
+        self.abs_delta_sum += float(abs_delta.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max()))
+        self.abs_delta_counts += np.bincount(np.minimum(np.ceil(abs_delta * DELTA_BINS).astype(np.int64), DELTA_BINS),
+                                             minlength=DELTA_BINS + 1)
+        self.rows += len(delta)
+
+    def abs_delta_quantile(self, q: float) -> float:
+        """Histogramdan mutlak farkın q quantile'ı (kova üst sınırı, 1/DELTA_BINS çözünürlük)."""
+        if not self.rows:
+            return 0.0
+        return int(np.searchsorted(np.cumsum(self.abs_delta_counts), q * self.rows)) / DELTA_BINS
+
+
+class ShadowEvaluator:
+    """
+    Challenger snapshot'ını champion'ın canlı trafiğiyle arka planda skorlar.
+
+    Args:
+        decision_bands: (risk_score üst sınırı, karar, risk seviyesi) bantları; yanıttaki
+            kararla aynı kural (ml_service.DECISION_BANDS)
+    """
+
+    def __init__(self, decision_bands: Sequence[Tuple[int, str, str]], queue_size: int = SHADOW_QUEUE_SIZE,
+                 batch_size: int = SHADOW_BATCH_SIZE, max_delay: float = SHADOW_MAX_DELAY_SECONDS):
+        self.decision_labels = [decision for _, decision, _ in decision_bands]
+        self._band_limits = np.array([max_score for max_score, _, _ in decision_bands[:-1]], dtype=np.int64)
+        self._decision_index = {label: i for i, label in enumerate(self.decision_labels)}
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        # Tahmin yolu meşgulse True döndüren fonksiyon (API çıkarım havuzuna bağlar)
+        self.load_probe: Optional[Callable[[], bool]] = None
+        self.challenger = None
+        self.source: Optional[str] = None
+        self.dropped = dict.fromkeys(DROP_REASONS, 0)
+        self.errors = 0
+        self._pending = deque()
+        self._pending_rows = 0
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats: Optional[ShadowStats] = None
+        self._compatible = (None, None, False)  # (champion planı, challenger planı, aynı encode mu)
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.challenger is not None
+
+    def set_challenger(self, snapshot, source: str) -> None:
+        """Challenger'ı değiştirir, istatistikleri sıfırlar ve gerekirse iş parçacığını başlatır."""
+        with self._lock:
+            self.challenger = snapshot
+            self.source = source
+            self._stats = None
+            self.dropped = dict.fromkeys(DROP_REASONS, 0)
+            self.errors = 0
+        self._clear_pending()
+        logger.info("Gölge model ayarlandı", extra=log_fields(
+            challenger_version=snapshot.model_version, source=source))
+        self.start()
+
+    def clear_challenger(self):
+        """Challenger'ı kaldırır ve bekleyen gözlemleri atar; kaldırılan snapshot'ı döndürür."""
+        with self._lock:
+            challenger, self.challenger, self.source, self._stats = self.challenger, None, None, None
+        self._clear_pending()
+        return challenger
+
+    def _clear_pending(self) -> None:
+        with self._pending_lock:
+            self._pending.clear()
+            self._pending_rows = 0
+
+    def submit(self, champion, X: np.ndarray, records: List[Dict[str, Any]],
+               results: List[Dict[str, Any]]) -> None:
+        """
+        Champion'ın skorladığı satırları challenger için kuyruğa ekler (bloklamaz).
+
+        X, records ve sonuçlar çağıran tarafından sonradan değiştirilmemelidir.
+        """
+        if self.challenger is None:
+            return
+        rows = len(results)
+        with self._pending_lock:
+            if self._pending_rows + rows > self.queue_size:
+                self.dropped["queue_full"] += rows
+                return
+            self._pending_rows += rows
+            self._pending.append((time.monotonic(), champion, X, records,
+                                  [result["risk_probability"] for result in results],
+                                  [result["decision"] for result in results]))
+
+    def decide(self, proba: np.ndarray) -> np.ndarray:
+        """Olasılıklardan karar kodları (risk_score = int(olasılık * 100), bant üst sınırı dahil)."""
+        return np.searchsorted(self._band_limits, (proba * 100).astype(np.int64), side='left')
+
+    def _busy(self) -> bool:
+        probe = self.load_probe
+        if probe is None:
+            return False
+        try:
+            return bool(probe())
+        except Exception:
+            return False
+
+    def _drop_stale(self) -> None:
+        """max_delay'den uzun süredir bekleyen gözlemleri atar (_pending_lock altında çağrılır)."""
+        deadline = time.monotonic() - self.max_delay
+        while self._pending and self._pending[0][0] < deadline:
+            stale = len(self._pending.popleft()[4])
+            self._pending_rows -= stale
+            self.dropped["stale"] += stale
+
+    def _take(self):
+        """Bayat gözlemleri atar ve en fazla batch_size satırlık gözlem grubunu kuyruktan alır."""
+        taken, rows = [], 0
+        with self._pending_lock:
+            self._drop_stale()
+            while self._pending and (not taken or rows + len(self._pending[0][4]) <= self.batch_size):
+                item = self._pending.popleft()
+                taken.append(item)
+                rows += len(item[4])
+            self._pending_rows -= rows
+        return taken
+
+    def process(self, respect_load: bool = True) -> int:
+        """
+        Kuyruktaki gözlemleri mikro-batch'lerle skorlar; skorlanan satır sayısını döndürür.
+
+        respect_load=True iken tahmin yolu meşgulse durur (gözlemler bekler veya bayatlar).
+        """
+        scored = 0
+        while self._pending:
+            if respect_load and self._busy():
+                # Yalnızca bayatlayanları at; kalanlar bir sonraki boş anda skorlanır
+                with self._pending_lock:
+                    self._drop_stale()
+                break
+            items = self._take()
+            if not items:
+                break
+            try:
+                scored += self._score(items)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Gölge skorlama başarısız", extra=log_fields(error=str(e)))
+        return scored
+
+    def _score(self, items) -> int:
+        challenger = self.challenger
+        if challenger is None:
+            return 0
+        # Gruplar champion'a göre ayrılır (yeniden eğitim sırasında iki champion karışabilir)
+        scored = 0
+        start = 0
+        while start < len(items):
+            champion = items[start][1]
+            end = start
+            while end < len(items) and items[end][1] is champion:
+                end += 1
+            group = items[start:end]
+            start = end
+
+            records = [record for item in group for record in item[3]]
+            if self._same_encoding(champion, challenger):
+                X = group[0][2] if len(group) == 1 else np.concatenate([item[2] for item in group])
+            else:
+                X, _ = challenger.feature_plan.encode_batch(records)
+            challenger_proba = challenger.scorer.predict_proba(X)[:, 1]
+            champion_proba = np.array([p for item in group for p in item[4]], dtype=np.float64)
+            champion_decisions = np.array([self._decision_index[d] for item in group for d in item[5]],
+                                          dtype=np.int64)
+            challenger_decisions = self.decide(challenger_proba)
+
+            with self._lock:
+                if self.challenger is not challenger:
+                    return scored
+                if self._stats is None or self._stats.champion_version != champion.model_version:
+                    self._stats = ShadowStats(champion.model_version, champion.optimal_threshold,
+                                              len(self.decision_labels))
+                self._stats.update(champion_proba, challenger_proba, champion_decisions, challenger_decisions,
+                                   champion.optimal_threshold, challenger.optimal_threshold)
+            scored += len(records)
+        return scored
+
+    def _same_encoding(self, champion, challenger) -> bool:
+        """İki snapshot aynı feature sırası ve kategori kodlarıyla mı encode ediyor? (çift başına bir kez)"""
+        champion_plan, challenger_plan = champion.feature_plan, challenger.feature_plan
+        cached_champion, cached_challenger, same = self._compatible
+        if cached_champion is champion_plan and cached_challenger is challenger_plan:
+            return same
+        same = champion_plan is challenger_plan or (
+            champion_plan.feature_names == challenger_plan.feature_names
+            and champion_plan.category_codes == challenger_plan.category_codes
+        )
+        self._compatible = (champion_plan, challenger_plan, same)
+        return same
+
+    def report(self) -> Dict[str, Any]:
+        """Uyuşmazlık oranları, olasılık farkları ve düşürülen gözlem sayıları."""
+        with self._lock:
+            challenger, stats = self.challenger, self._stats
+            report: Dict[str, Any] = {
+                'enabled': challenger is not None,
+                'challenger_version': challenger.model_version if challenger is not None else None,
+                'challenger_source': self.source,
+                'challenger_threshold': challenger.optimal_threshold if challenger is not None else None,
+                'pending_rows': self._pending_rows,
+                'dropped_rows': dict(self.dropped),
+                'errors': self.errors,
+            }
+            if stats is None:
+                report['scored_rows'] = 0
+                return report
+            rows = stats.rows
+            changes = {
+                f"{self.decision_labels[i]}->{self.decision_labels[j]}": int(stats.decision_changes[i, j])
+                for i in range(len(self.decision_labels)) for j in range(len(self.decision_labels))
+                if i != j and stats.decision_changes[i, j]
+            }
+            disagreements = int(stats.decision_changes.sum() - np.trace(stats.decision_changes))
+            report.update({
+                'champion_version': stats.champion_version,
+                'champion_threshold': stats.champion_threshold,
+                'since': stats.since,
+                'scored_rows': rows,
+                'decision_disagreements': disagreements,
+                'decision_disagreement_rate': round(disagreements / rows, 6) if rows else 0.0,
+                'decision_changes': changes,
+                'threshold_disagreements': stats.threshold_disagreements,
+                'threshold_disagreement_rate': round(stats.threshold_disagreements / rows, 6) if rows else 0.0,
+                'positive_rate': {
+                    'champion': round(stats.champion_positive / rows, 6) if rows else 0.0,
+                    'challenger': round(stats.challenger_positive / rows, 6) if rows else 0.0,
+                },
+                'score_delta': {
+                    'mean': round(stats.delta_sum / rows, 6) if rows else 0.0,
+                    'mean_abs': round(stats.abs_delta_sum / rows, 6) if rows else 0.0,
+                    'p50_abs': stats.abs_delta_quantile(0.5),
+                    'p95_abs': stats.abs_delta_quantile(0.95),
+                    'p99_abs': stats.abs_delta_quantile(0.99),
+                    'max_abs': round(stats.max_abs_delta, 6),
+                },
+            })
+            return report
+
+    def start(self) -> None:
+        """Kuyruğu SHADOW_POLL_SECONDS aralıklarla işleyen arka plan iş parçacığını başlatır."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(SHADOW_POLL_SECONDS):
+                if self.challenger is not None:
+                    self.process()
+
+        self._worker = threading.Thread(target=run, name="shadow-model", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,261 @@
+"""
+CreditGuard AI - Worker'lar Arası Paylaşılan Durum
+uvicorn --workers N ile her worker ayrı bir süreçtir; süreç içinde tutulan
+durum diğer worker'larda görünmez. Yeniden eğitimle ilgili durum bu yüzden
+model artifact'ının yanındaki dosyalarda tutulur:
+
+- <artifact>.version: Yayındaki modelin sürümü. Artifact her yazıldığında
+  güncellenir; worker'lar bu dosyayı düzenli aralıklarla kontrol edip değiştiyse
+  artifact'ı yeniden yükler (ml_service.sync_published_model).
+- <artifact>.labeled.jsonl: Artımlı eğitimi bekleyen etiketli başvurular.
+- <artifact>.jobs/<job_id>.json: Yeniden eğitim iş kayıtları; durum sorgusu
+  hangi worker'a giderse gitsin aynı kaydı okur.
+- <artifact>.rows/: Artımlı eğitimin yalnızca sonuna eklenen eğitim satırı
+  dosyaları (incremental.TrainingRows).
+
+Okuma-yazmalar dosya kilidi (fcntl) altında yapılır; JSON dosyaları geçici
+isimle yazılıp atomik olarak yerine taşınır.
+"""
+
+import contextlib
+import json
+import os
+import socket
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, yalnızca süreç içi kilit
+    fcntl = None
+
+from app_logging import get_logger, log_fields
+
+logger = get_logger("shared_state")
+
+# Süreç içi kilitler: fcntl olmayan platformlarda da aynı süreçteki thread'ler sıralanır
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    path için <path>.lock üzerinde süreçler arası özel kilit.
+
+    Kilit dosyası açılamazsa yalnızca süreç içi kilitle devam edilir.
+    """
+    with _local_locks_guard:
+        local_lock = _local_locks.setdefault(path, threading.Lock())
+    with local_lock:
+        if fcntl is None:
+            yield
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            lock_file = open(f"{path}.lock", "a")
+        except OSError as e:
+            logger.warning("Dosya kilidi açılamadı, kilitsiz devam ediliyor", extra=log_fields(
+                path=path, error=str(e)))
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """JSON'u geçici isimle yazar ve atomik olarak yerine taşır."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str) -> Optional[Any]:
+    """JSON dosyasını okur; yoksa veya bozuksa None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def version_file_path(artifact_path: str) -> str:
+    return f"{artifact_path}.version"
+
+
+def write_published_version(artifact_path: str, model_version: str) -> None:
+    """Artifact'ın sürümünü yazar (artifact yerine taşındıktan sonra çağrılır)."""
+    write_json_atomic(version_file_path(artifact_path), {"model_version": model_version})
+
+
+def published_version_signature(artifact_path: str) -> Optional[Tuple[int, int]]:
+    """Sürüm dosyasının (inode, mtime_ns) imzası; her yazımda değişir. Dosya yoksa None."""
+    try:
+        stat = os.stat(version_file_path(artifact_path))
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def read_published_version(artifact_path: str) -> Optional[str]:
+    data = read_json(version_file_path(artifact_path))
+    return data.get("model_version") if isinstance(data, dict) else None
+
+
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LabeledOutcomeStore:
+    """
+    Artımlı eğitimi bekleyen etiketli başvurular (her satır {"record", "label"} JSON'u).
+
+    Hangi worker'a gönderilirse gönderilsin satırlar aynı dosyaya eklenir;
+    artımlı eğitim hepsini birlikte görür.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Sayım dosya imzasına göre önbelleğe alınır (/health ve /metrics her çağrıda dosyayı okumaz)
+        self._counted: Tuple[Optional[Tuple[int, int, int]], int] = (None, 0)
+
+    def _read(self) -> List[Tuple[Dict[str, Any], int]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [(row["record"], int(row["label"])) for row in rows]
+
+    def _write(self, items: List[Tuple[Dict[str, Any], int]]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record, label in items:
+                f.write(json.dumps({"record": record, "label": int(label)}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _count(self) -> int:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        counted_signature, count = self._counted
+        if signature != counted_signature:
+            with open(self.path, "rb") as f:
+                count = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+            self._counted = (signature, count)
+        return count
+
+    def add(self, records: List[Dict[str, Any]], labels: List[int]) -> int:
+        """Satırları ekler; bekleyen satır sayısını döndürür."""
+        lines = "".join(json.dumps({"record": record, "label": int(label)}, ensure_ascii=False) + "\n"
+                        for record, label in zip(records, labels))
+        with file_lock(self.path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            return self._count()
+
+    def count(self) -> int:
+        return self._count()
+
+    def take(self, remove: bool = True) -> List[Tuple[Dict[str, Any], int]]:
+        """Bekleyen tüm satırları döndürür; remove=True ise kuyruktan alır."""
+        with file_lock(self.path):
+            items = self._read()
+            if remove and items:
+                self._write([])
+            return items
+
+    def restore(self, items: List[Tuple[Dict[str, Any], int]]) -> None:
+        """Kullanılamayan satırları (başarısız eğitim) kuyruğun başına geri koyar."""
+        if not items:
+            return
+        with file_lock(self.path):
+            self._write(list(items) + self._read())
+
+
+class RetrainJobStore:
+    """
+    Yeniden eğitim iş kayıtları (iş başına bir JSON dosyası).
+
+    Tüm worker'lar için aynı anda en fazla bir bekleyen/çalışan iş olur. İşi
+    çalıştıran worker sonlanmışsa (aynı makinede pid yok) iş başarısız sayılır.
+    """
+
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, directory: str, max_history: int = 20):
+        self.directory = directory
+        self.max_history = max_history
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _jobs(self) -> List[Dict[str, Any]]:
+        try:
+            entries = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        jobs = []
+        for entry in entries:
+            if entry.endswith(".json"):
+                job = read_json(os.path.join(self.directory, entry))
+                if isinstance(job, dict):
+                    jobs.append(self._check_owner(job))
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def _check_owner(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """İşi çalıştıran worker bu makinede artık yoksa kaydı başarısız olarak döndürür."""
+        if (job["status"] in self.ACTIVE_STATUSES and job.get("worker_host") == socket.gethostname()
+                and not _pid_alive(job.get("worker_pid"))):
+            return {**job, "status": "failed", "error": "İşi çalıştıran worker sonlandı."}
+        return job
+
+    def create(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        İşi kaydeder. Bekleyen veya çalışan bir iş varsa yeni iş açılmaz.
+
+        Returns:
+            (iş kaydı, yeni iş açıldıysa True)
+        """
+        with file_lock(self.directory):
+            jobs = self._jobs()
+            for existing in jobs:
+                if existing["status"] in self.ACTIVE_STATUSES:
+                    return existing, False
+            job = {**job, "worker_pid": os.getpid(), "worker_host": socket.gethostname()}
+            write_json_atomic(self._path(job["job_id"]), job)
+            # Eski tamamlanmış işleri temizle
+            for old in jobs[:max(0, len(jobs) + 1 - self.max_history)]:
+                with contextlib.suppress(OSError):
+                    os.remove(self._path(old["job_id"]))
+            return job, True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not job_id.isalnum():  # İş kimlikleri hex; yol karakterleri kabul edilmez
+            return None
+        job = read_json(self._path(job_id))
+        return self._check_owner(job) if isinstance(job, dict) else None
+
+    def update(self, job_id: str, **fields) -> None:
+        with file_lock(self.directory):
+            job = read_json(self._path(job_id)) or {}
+            job.update(fields)
+            write_json_atomic(self._path(job_id), job)
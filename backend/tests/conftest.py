@@ -0,0 +1,94 @@
+"""
+Test ortamı: backend modülleri düz import edilir; veri seti ve artifact yolları
+geçici bir klasöre yönlendirilir (ağa çıkılmaz, depodaki artifact'lara yazılmaz).
+
+Veri seti credit-g şemasında (aynı sütunlar ve kategoriler) sentetik olarak
+üretilir. Ortam değişkenleri ml_service import edilmeden önce ayarlanmalıdır.
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATEGORIES = {
+    'checking_status': ['<0', '0<=X<200', '>=200', 'no checking'],
+    'credit_history': ['no credits/all paid', 'all paid', 'existing paid', 'delayed previously',
+                       'critical/other existing credit'],
+    'purpose': ['new car', 'used car', 'furniture/equipment', 'radio/tv', 'domestic appliance', 'repairs',
+                'education', 'vacation', 'retraining', 'business', 'other'],
+    'savings_status': ['<100', '100<=X<500', '500<=X<1000', '>=1000', 'no known savings'],
+    'employment': ['unemployed', '<1', '1<=X<4', '4<=X<7', '>=7'],
+    'personal_status': ['male div/sep', 'female div/dep/mar', 'male single', 'male mar/wid', 'female single'],
+    'other_parties': ['none', 'co applicant', 'guarantor'],
+    'property_magnitude': ['real estate', 'life insurance', 'car', 'no known property'],
+    'other_payment_plans': ['bank', 'stores', 'none'],
+    'housing': ['rent', 'own', 'for free'],
+    'job': ['unemp/unskilled non res', 'unskilled resident', 'skilled', 'high qualif/self emp/mgmt'],
+    'own_telephone': ['none', 'yes'],
+    'foreign_worker': ['yes', 'no'],
+}
+NUMERIC_RANGES = {
+    'duration': (4, 72), 'credit_amount': (250, 18000), 'installment_commitment': (1, 4),
+    'residence_since': (1, 4), 'age': (19, 75), 'existing_credits': (1, 4), 'num_dependents': (1, 2),
+}
+COLUMNS = ['checking_status', 'duration', 'credit_history', 'purpose', 'credit_amount', 'savings_status',
+           'employment', 'installment_commitment', 'personal_status', 'other_parties', 'residence_since',
+           'property_magnitude', 'age', 'other_payment_plans', 'housing', 'existing_credits', 'job',
+           'num_dependents', 'own_telephone', 'foreign_worker', 'class']
+
+
+def synthetic_credit_frame(n: int = 1000, seed: int = 0) -> pd.DataFrame:
+    """credit-g şemasında, sınıfı birkaç feature'a bağlı sentetik veri seti (%30 riskli)."""
+    rng = np.random.default_rng(seed)
+    data = {name: rng.choice(values, n) for name, values in CATEGORIES.items()}
+    for name, (low, high) in NUMERIC_RANGES.items():
+        data[name] = rng.integers(low, high + 1, n)
+    score = (data['duration'] / 72 + data['credit_amount'] / 18000
+             + (data['checking_status'] == '<0') * 0.6 + rng.normal(0, 0.3, n))
+    data['class'] = np.where(score > np.quantile(score, 0.7), 'bad', 'good')
+    return pd.DataFrame({name: data[name] for name in COLUMNS})
+
+
+def random_applications(n: int, seed: int = 1):
+    """Eksik alanlar, bilinmeyen kategoriler, ondalıklı değerler ve saving_status takma adı içeren başvurular."""
+    rng = random.Random(seed)
+    applications = []
+    for _ in range(n):
+        application = {'duration': rng.randint(1, 120), 'age': rng.randint(18, 100),
+                       'credit_amount': float(rng.choice([rng.randint(0, 30000), rng.random() * 20000]))}
+        for name, values in CATEGORIES.items():
+            if name in ('housing', 'checking_status', 'purpose', 'savings_status') or rng.random() < 0.5:
+                application[name] = rng.choice(values + ['???'])
+        for name in ('installment_commitment', 'residence_since', 'existing_credits', 'num_dependents'):
+            if rng.random() < 0.5:
+                application[name] = rng.randint(*NUMERIC_RANGES[name])
+        if rng.random() < 0.2:
+            application['saving_status'] = application.pop('savings_status')
+        applications.append(application)
+    return applications
+
+
+_data_dir = tempfile.mkdtemp(prefix="creditguard-tests-")
+_dataset_path = os.path.join(_data_dir, "credit-g.csv")
+synthetic_credit_frame().to_csv(_dataset_path, index=False)
+os.environ["CREDITGUARD_DATASET_PATH"] = _dataset_path
+os.environ["CREDITGUARD_DATASET_CACHE"] = os.path.join(_data_dir, "cache", "credit-g.npz")
+os.environ["CREDITGUARD_MODEL_PATH"] = os.path.join(_data_dir, "artifacts", "credit_model.joblib")
+os.environ.setdefault("CREDITGUARD_LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture(scope="session")
+def snapshot():
+    """Sentetik veri setiyle eğitilip yayına alınmış model (oturum başına bir kez)."""
+    import ml_service
+
+    ml_service.train_model(save_artifact=False)
+    return ml_service.get_snapshot()
@@ -0,0 +1,30 @@
+"""Komut satırı: '-' ile verilen stdin/stdout skorlama sonunda kapatılmaz."""
+
+import io
+import json
+import sys
+
+import cli
+from conftest import random_applications
+
+
+def test_score_keeps_standard_streams_open(snapshot, monkeypatch):
+    applications = random_applications(5, seed=9)
+    stdin = io.StringIO("".join(json.dumps(application) + "\n" for application in applications))
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdin", stdin)
+    monkeypatch.setattr(sys, "stdout", stdout)
+    cli.run_cli(["score", "--input", "-", "--output", "-", "--chunk-size", "2"])
+    assert not stdin.closed and not stdout.closed
+    rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [row['index'] for row in rows] == list(range(len(applications)))
+
+
+def test_score_closes_files_it_opened(snapshot, tmp_path):
+    source = tmp_path / "apps.ndjson"
+    source.write_text("".join(json.dumps(application) + "\n" for application in random_applications(3)))
+    target = tmp_path / "scored.csv"
+    cli.run_cli(["score", "--input", str(source), "--output", str(target)])
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert lines[0].split(",") == cli.SCORED_CSV_COLUMNS
+    assert len(lines) == 4
@@ -0,0 +1,65 @@
+"""Veri seti önbelleği: kaynak kimliği eşleşmezse önbellek yeniden üretilir."""
+
+import os
+
+import pytest
+
+import dataset
+import ml_service
+from conftest import synthetic_credit_frame
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "credit-g.csv"
+    synthetic_credit_frame(50, seed=1).to_csv(path, index=False)
+    return str(path)
+
+
+def test_cache_is_used_while_source_is_unchanged(source, tmp_path):
+    cache = str(tmp_path / "cache.npz")
+    first = dataset.load_credit_dataset(source, cache)
+    assert dataset.read_cache_source(cache) == dataset.source_identity(source)
+    stamp = os.stat(cache).st_mtime_ns
+    assert dataset.load_credit_dataset(source, cache).equals(first)
+    assert os.stat(cache).st_mtime_ns == stamp
+
+
+def test_edited_source_rebuilds_cache(source, tmp_path):
+    cache = str(tmp_path / "cache.npz")
+    dataset.load_credit_dataset(source, cache)
+    synthetic_credit_frame(80, seed=2).to_csv(source, index=False)
+    assert len(dataset.load_credit_dataset(source, cache)) == 80
+    assert dataset.read_cache_source(cache) == dataset.source_identity(source)
+
+
+def test_changed_source_path_rebuilds_cache(source, tmp_path):
+    cache = str(tmp_path / "cache.npz")
+    dataset.load_credit_dataset(source, cache)
+    other = str(tmp_path / "other.csv")
+    synthetic_credit_frame(70, seed=3).to_csv(other, index=False)
+    assert len(dataset.load_credit_dataset(other, cache)) == 70
+
+
+def test_missing_source_uses_cache_only_from_same_path(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_OFFLINE", True)
+    cache = str(tmp_path / "cache.npz")
+    dataset.load_credit_dataset(source, cache)
+    os.remove(source)
+    assert len(dataset.load_credit_dataset(source, cache)) == 50
+    assert dataset.dataset_available(source, cache)
+    missing = str(tmp_path / "missing.csv")
+    assert not dataset.dataset_available(missing, cache)
+    with pytest.raises(FileNotFoundError, match="CREDITGUARD_DATASET_PATH"):
+        dataset.load_credit_dataset(missing, cache)
+
+
+def test_startup_check_fails_without_artifact_and_dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_OFFLINE", True)
+    monkeypatch.setattr(dataset, "DATASET_SOURCE_PATH", str(tmp_path / "missing.arff"))
+    monkeypatch.setattr(dataset, "DATASET_CACHE_PATH", str(tmp_path / "missing.npz"))
+    monkeypatch.setattr(ml_service, "MODEL_ARTIFACT_PATH", str(tmp_path / "model.joblib"))
+    monkeypatch.setattr(ml_service, "model_status", ml_service.model_status)
+    with pytest.raises(RuntimeError, match="CREDITGUARD_DATASET_OFFLINE=0"):
+        ml_service.check_model_source()
+    assert ml_service.model_status["state"] == "failed"
@@ -0,0 +1,45 @@
+"""FeaturePlan (tek satır ve batch) ile pandas referans yolu encode_input_frame'in paritesi."""
+
+import numpy as np
+import pytest
+
+import ml_service
+from conftest import random_applications
+
+
+@pytest.fixture(scope="module")
+def applications(snapshot):
+    dataset_rows = snapshot.sample_store.records(np.arange(min(len(snapshot.sample_store), 300)))
+    edge_cases = [
+        {'duration': 12, 'credit_amount': 3000, 'age': 22, 'housing': 'rent', 'savings_status': '<100',
+         'saving_status': '>=1000', 'checking_status': '<0', 'purpose': 'x', 'existing_credits': 4},
+        {'duration': 12, 'credit_amount': 30000.0, 'age': 22.0, 'housing': 'rent', 'savings_status': '<100',
+         'checking_status': '<0', 'purpose': 'x', 'existing_credits': 4.0},
+        {'duration': 0, 'credit_amount': 0, 'age': 0},
+    ]
+    return dataset_rows + random_applications(400) + edge_cases
+
+
+def reference_row(application):
+    X_frame, _ = ml_service.encode_input_frame(dict(application))
+    return X_frame.to_numpy(np.float32)
+
+
+def test_single_row_encoding_matches_reference(snapshot, applications):
+    for application in applications:
+        row, _ = snapshot.feature_plan.encode(dict(application))
+        np.testing.assert_array_equal(row, reference_row(application), err_msg=str(application))
+
+
+def test_batch_encoding_matches_reference(snapshot, applications):
+    X, _ = snapshot.feature_plan.encode_batch([dict(application) for application in applications])
+    expected = np.vstack([reference_row(application) for application in applications])
+    np.testing.assert_array_equal(X.astype(np.float32), expected)
+
+
+def test_single_and_batch_predictions_match(snapshot, applications):
+    applications = applications[::4]
+    ml_service.prediction_cache.clear()
+    batch = ml_service.predict_risk_batch([dict(application) for application in applications], use_cache=False)
+    for application, batch_result in zip(applications, batch):
+        assert ml_service.predict_risk(dict(application)) == batch_result
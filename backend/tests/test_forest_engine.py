@@ -0,0 +1,92 @@
+"""FlatForest.predict_proba ve yerel katkıların RandomForestClassifier ile paritesi."""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import FLAT_FOREST_MAX_ROWS, FlatForest
+
+# predict_proba ile izin verilen en büyük mutlak fark (ağaç olasılıkları aynı sırayla toplanır)
+TOLERANCE = 1e-12
+
+
+@pytest.fixture(scope="module")
+def forest():
+    X, y = make_classification(n_samples=600, n_features=12, n_informative=6, random_state=0)
+    # Tam sayı sütunlar: eşikler x.5 olur, tam sayı girdiler eşiğe yakın düşer
+    X[:, :4] = np.round(X[:, :4] * 10)
+    model = RandomForestClassifier(n_estimators=50, min_samples_leaf=2, class_weight={0: 1, 1: 10},
+                                   random_state=0).fit(X, y)
+    return model, X
+
+
+def threshold_rows(engine, base_row, n, seed=0):
+    """Rastgele düğüm eşiklerini ve float32 komşularını satırlara yerleştirir."""
+    rng = np.random.default_rng(seed)
+    internal = np.flatnonzero(engine.left != np.arange(len(engine.left)))
+    rows = np.repeat(base_row.reshape(1, -1), n, axis=0).astype(np.float32)
+    for i, node in enumerate(rng.choice(internal, size=n)):
+        value = np.float32(engine.threshold[node])
+        rows[i, engine.feature[node]] = (value, np.nextafter(value, np.float32(-np.inf)),
+                                          np.nextafter(value, np.float32(np.inf)))[i % 3]
+    return rows
+
+
+def assert_same_proba(model, engine, X):
+    expected = model.predict_proba(X)
+    actual = engine.predict_proba(X)
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=TOLERANCE)
+    # Risk skoru (int(p * 100)) hiçbir satırda değişmemeli
+    np.testing.assert_array_equal(np.floor(actual[:, 1] * 100), np.floor(expected[:, 1] * 100))
+
+
+def test_training_rows(forest):
+    model, X = forest
+    assert_same_proba(model, FlatForest(model, max_rows=None), X)
+
+
+def test_random_rows(forest):
+    model, X = forest
+    rng = np.random.default_rng(1)
+    random_X = rng.uniform(X.min(axis=0) - 1, X.max(axis=0) + 1, size=(500, X.shape[1]))
+    assert_same_proba(model, FlatForest(model, max_rows=None), random_X)
+
+
+def test_rows_on_split_thresholds(forest):
+    model, X = forest
+    engine = FlatForest(model, max_rows=None)
+    assert_same_proba(model, engine, threshold_rows(engine, X[0], 900))
+
+
+def test_float64_inputs_are_cast_like_sklearn(forest):
+    model, X = forest
+    engine = FlatForest(model, max_rows=None)
+    # float32'ye yuvarlanınca eşiğin diğer tarafına geçen değerler
+    rows = threshold_rows(engine, X[0], 300, seed=2).astype(np.float64)
+    rows += np.where(np.arange(rows.shape[1]) % 2, 1e-9, -1e-9)
+    assert_same_proba(model, engine, rows)
+
+
+def test_single_row(forest):
+    model, X = forest
+    engine = FlatForest(model)
+    for row in X[:20]:
+        assert_same_proba(model, engine, row.reshape(1, -1))
+
+
+def test_large_batch_falls_back_to_sklearn(forest):
+    model, X = forest
+    engine = FlatForest(model)
+    batch = X[:FLAT_FOREST_MAX_ROWS + 1]
+    np.testing.assert_array_equal(engine.predict_proba(batch), model.predict_proba(batch))
+    assert_same_proba(model, engine, X[:FLAT_FOREST_MAX_ROWS])
+
+
+def test_contributions_sum_to_probability(forest):
+    model, X = forest
+    engine = FlatForest(model, max_rows=None)
+    contributions = engine.contributions(X[:200])
+    np.testing.assert_allclose(engine.bias + contributions.sum(axis=1), model.predict_proba(X[:200])[:, 1],
+                               rtol=0, atol=1e-9)
@@ -0,0 +1,120 @@
+"""Artımlı yeniden eğitim: holdout penceresi, eğitim satırı dosyası ve olasılık toplamlarının paritesi."""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+import incremental
+import ml_service
+
+# Artımlı holdout olasılıkları ile predict_proba arasında izin verilen en büyük fark
+TOLERANCE = 1e-9
+
+
+def labeled_rows(snapshot, n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(snapshot.sample_store), size=n)
+    return snapshot.sample_store.records(rows), snapshot.sample_store.labels[rows].astype(int).tolist()
+
+
+def assert_holdout_parity(snapshot):
+    state = snapshot.training_state
+    expected = snapshot.model.predict_proba(state.X_holdout)[:, 1]
+    actual = state.holdout_proba_sum / len(snapshot.model.estimators_)
+    assert np.abs(actual - expected).max() <= TOLERANCE
+
+
+def test_rounds_append_rows_without_rewriting_history(snapshot):
+    state = snapshot.training_state
+    X_before = np.array(state.X_train)
+    current = snapshot
+    for round_index in range(3):
+        records, labels = labeled_rows(snapshot, 120, seed=round_index)
+        updated = ml_service.fit_incremental_snapshot(current, records, labels)
+        new_state = updated.training_state
+        info = updated.model_metrics['incremental']
+        assert new_state.n_train == current.training_state.n_train + info['new_train_rows']
+        assert new_state.rows.name == state.rows.name  # Aynı dosyaya eklendi
+        assert new_state.rows.size() == new_state.n_train
+        assert_holdout_parity(updated)
+        current = updated
+    np.testing.assert_array_equal(current.training_state.X_train[:state.n_train], X_before)
+    # Eski snapshot kendi önekini görmeye devam eder
+    np.testing.assert_array_equal(state.X_train, X_before)
+
+
+def test_holdout_is_capped_to_newest_rows(snapshot, monkeypatch):
+    cap = snapshot.training_state.n_holdout + 10
+    monkeypatch.setattr(incremental, "INCREMENTAL_MAX_HOLDOUT_ROWS", cap)
+    records, labels = labeled_rows(snapshot, 200, seed=7)
+    updated = ml_service.fit_incremental_snapshot(snapshot, records, labels)
+    state, info = updated.training_state, updated.model_metrics['incremental']
+    assert state.n_holdout == cap
+    assert info['holdout_dropped_rows'] == snapshot.training_state.n_holdout + info['new_holdout_rows'] - cap
+    np.testing.assert_array_equal(state.X_holdout[:-info['new_holdout_rows']],
+                                  snapshot.training_state.X_holdout[info['holdout_dropped_rows']:])
+    assert_holdout_parity(updated)
+
+
+def test_second_branch_from_same_state_copies_prefix(snapshot):
+    records, labels = labeled_rows(snapshot, 100, seed=11)
+    first = ml_service.fit_incremental_snapshot(snapshot, records, labels)
+    X_first = np.array(first.training_state.X_train)
+    records, labels = labeled_rows(snapshot, 100, seed=12)
+    second = ml_service.fit_incremental_snapshot(snapshot, records, labels)
+    assert second.training_state.rows.name != first.training_state.rows.name
+    np.testing.assert_array_equal(second.training_state.X_train[:snapshot.training_state.n_train],
+                                  snapshot.training_state.X_train)
+    # İlk dalın satırları bozulmadı
+    np.testing.assert_array_equal(first.training_state.X_train, X_first)
+
+
+def test_artifact_stores_row_reference_not_rows(snapshot):
+    state = pickle.loads(pickle.dumps(snapshot.training_state))
+    assert 'X_train' not in state.__dict__
+    np.testing.assert_array_equal(state.X_train, snapshot.training_state.X_train)
+    assert os.path.dirname(state.rows.x_path) == ml_service.TRAINING_ROWS_DIR
+
+
+def test_legacy_state_moves_rows_to_file(snapshot, tmp_path):
+    current = snapshot.training_state
+    legacy = incremental.TrainingState.__new__(incremental.TrainingState)
+    legacy.__setstate__({
+        'X_train': np.array(current.X_train), 'y_train': np.array(current.y_train),
+        'X_holdout': current.X_holdout, 'y_holdout': current.y_holdout,
+        'holdout_proba_sum': current.holdout_proba_sum, 'rounds': 0, 'appended_rows': 0,
+    })
+    assert legacy.n_train == current.n_train
+    X_new, _ = snapshot.feature_plan.encode_batch(labeled_rows(snapshot, 100, seed=3)[0])
+    y_new = np.asarray(labeled_rows(snapshot, 100, seed=3)[1])
+    new_trees = ml_service.build_model(snapshot.model_metrics['training_config'], n_estimators=5)
+    _, new_state, info = incremental.rolling_update(snapshot.model, legacy, X_new, y_new, new_trees,
+                                                    rows_dir=str(tmp_path))
+    assert new_state.rows.directory == str(tmp_path)
+    assert new_state.n_train == current.n_train + info['new_train_rows']
+    np.testing.assert_array_equal(new_state.X_train[:current.n_train], current.X_train)
+
+
+def test_missing_rows_file_requires_full_retrain(snapshot):
+    state = snapshot.training_state
+    missing = incremental.TrainingState(incremental.TrainingRows(state.rows.directory, "missing",
+                                                                 state.rows.n_features),
+                                        state.n_train, state.X_holdout, state.y_holdout,
+                                        state.holdout_proba_sum)
+    with pytest.raises(ValueError):
+        missing.X_train
+
+
+def test_prune_keeps_protected_and_newest_row_sets(tmp_path):
+    X, y = np.zeros((3, 2), dtype=np.float32), np.zeros(3, dtype=np.int8)
+    names = []
+    for index in range(5):
+        rows = incremental.TrainingRows.create(str(tmp_path), X, y)
+        os.utime(rows.y_path, ns=(index, index))
+        names.append(rows.name)
+    incremental.prune_training_rows(str(tmp_path), keep=2, protected=[names[0]])
+    remaining = sorted(entry[:-2] for entry in os.listdir(tmp_path) if entry.endswith(".y"))
+    assert remaining == sorted([names[0], names[3], names[4]])
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{name}{suffix}" for name in remaining for suffix in (".X", ".y"))
@@ -0,0 +1,89 @@
+"""Çıkarım havuzu ve mikro-batch: yuva muhasebesi ve tek kayıtlık batch yolu."""
+
+import asyncio
+import threading
+
+import pytest
+
+from inference_pool import BoundedExecutor, InferenceQueueFull, MicroBatcher
+
+
+def test_cancelled_request_keeps_slot_until_work_finishes():
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test-pool")
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return 1
+
+    async def scenario():
+        request = asyncio.ensure_future(executor.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        # İş hâlâ çalışıyor: kapasite dolu, yeni iş reddedilir
+        assert executor.is_full()
+        assert executor.stats()["running"] == 1
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: 2)
+        release.set()
+        for _ in range(100):
+            if not executor.is_full():
+                break
+            await asyncio.sleep(0.01)
+        assert await executor.run(lambda: 3) == 3
+
+    try:
+        asyncio.run(scenario())
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0 and stats["running"] == 0
+        assert stats["completed"] == 2 and stats["rejected"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_failed_work_releases_slot():
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test-pool")
+
+    def failing():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await executor.run(failing)
+        assert not executor.is_full()
+
+    try:
+        asyncio.run(scenario())
+        assert executor.stats()["failed"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_micro_batcher_uses_single_path_for_lone_requests():
+    executor = BoundedExecutor(max_workers=2, max_queue=8, name="test-batcher")
+    calls = []
+
+    def batch(items):
+        calls.append(("batch", len(items)))
+        return [item * 10 for item in items]
+
+    def single(item):
+        calls.append(("single", 1))
+        return item * 10
+
+    batcher = MicroBatcher(batch, executor, max_batch_size=8, max_wait_ms=20, single_func=single)
+
+    async def scenario():
+        assert await batcher.submit(1) == 10
+        assert await asyncio.gather(*(batcher.submit(i) for i in range(4))) == [0, 10, 20, 30]
+
+    try:
+        asyncio.run(scenario())
+        assert calls == [("single", 1), ("batch", 4)]
+    finally:
+        batcher.shutdown()
+        executor.shutdown()
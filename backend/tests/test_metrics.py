@@ -0,0 +1,59 @@
+"""Çok worker'lı /metrics birleştirmesi: sayaçlar toplanır, gauge'lar describe(aggregate=...) ile birleştirilir."""
+
+import json
+import os
+
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def write_worker(directory, pid, gauges, counters=()):
+    data = {'pid': pid, 'counters': [[name, [], value] for name, value in counters], 'histograms': [],
+            'gauges': [[name, [list(pair) for pair in labels], value] for name, labels, value in gauges]}
+    with open(os.path.join(directory, f"worker-{pid}.json"), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def sample(text, series):
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} yok:\n{text}")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = MetricsRegistry(metrics_dir=str(tmp_path))
+    registry.describe("queue_depth", "gauge", "worker başına kuyruk")
+    registry.describe("psi", "gauge", "PSI", aggregate="max")
+    registry.describe("ready", "gauge", "hazır", aggregate="min")
+    registry.describe("requests_total", "counter", "istek")
+    registry.register_collector(lambda: [("queue_depth", (), 2), ("psi", (("feature", "age"),), 0.05),
+                                         ("ready", (), 1)])
+    return registry
+
+
+def test_gauges_use_declared_aggregation(registry, tmp_path):
+    # Canlı iki worker daha (bu süreç ve üst süreç pid'leri)
+    write_worker(str(tmp_path), os.getppid(), [("queue_depth", (), 3), ("psi", (("feature", "age"),), 0.3),
+                                               ("ready", (), 0)], counters=[("requests_total", 5)])
+    registry.inc("requests_total", value=2)
+    text = registry.render()
+    assert sample(text, "queue_depth") == 5
+    assert sample(text, 'psi{feature="age"}') == 0.3
+    assert sample(text, "ready") == 0
+    assert sample(text, "requests_total") == 7
+
+
+def test_dead_worker_gauges_are_skipped_but_counters_kept(registry, tmp_path):
+    dead_pid = 2 ** 22 + 12345
+    write_worker(str(tmp_path), dead_pid, [("psi", (("feature", "age"),), 0.9)], counters=[("requests_total", 4)])
+    text = registry.render()
+    assert sample(text, 'psi{feature="age"}') == 0.05
+    assert sample(text, "requests_total") == 4
+
+
+def test_unknown_aggregation_is_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.describe("psi", "gauge", "PSI", aggregate="mean")
@@ -0,0 +1,30 @@
+"""Tahmin önbelleği: yeni model yayına alınınca boşaltılır ve invalidation sayılır."""
+
+import ml_service
+from conftest import random_applications
+from prediction_cache import PredictionCache
+
+
+def test_clear_counts_invalidation_only_when_entries_existed():
+    cache = PredictionCache(max_size=4, ttl_seconds=60)
+    owner = object()
+    cache.clear()
+    assert cache.stats()["invalidations"] == 0
+    cache.put(owner, b"k", {"risk_score": 1})
+    cache.clear()
+    assert cache.stats()["invalidations"] == 1
+    # clear sonrası aynı snapshot ile gelen işlem ikinci kez saymaz
+    cache.get(owner, b"k")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_publish_snapshot_invalidates_cache(snapshot):
+    cache = ml_service.prediction_cache
+    ml_service.publish_snapshot(snapshot)
+    before = cache.stats()["invalidations"]
+    ml_service.predict_risk(random_applications(1, seed=5)[0])
+    assert cache.stats()["size"] == 1
+    ml_service.publish_snapshot(snapshot)
+    stats = cache.stats()
+    assert stats["size"] == 0
+    assert stats["invalidations"] == before + 1
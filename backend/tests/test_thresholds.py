@@ -0,0 +1,106 @@
+"""Sıralı geçişle hesaplanan threshold eğrisinin sklearn metrikleri ve eski sabit grid ile paritesi."""
+
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
+
+from thresholds import (RECALL_FALLBACK_THRESHOLD, score_histogram, select_threshold, threshold_curve,
+                        threshold_curve_from_histogram)
+
+# Eski arama: 0.10-0.60 arası 0.02 adımlı grid, Recall >= %80 iken en yüksek F1
+LEGACY_GRID = np.arange(0.1, 0.61, 0.02)
+RISK_WEIGHT = 10.0
+
+
+def random_scores(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 150))
+    y = rng.integers(0, 2, n)
+    # Yuvarlama ile tekrarlanan skorlar (eşitlikler) oluşur
+    return y, np.round(rng.random(n), int(rng.integers(1, 4)))
+
+
+def legacy_grid_search(y, scores, min_recall=0.8):
+    """Eski grid aramasının seçtiği (threshold, F1); Recall hedefine ulaşılamazsa None."""
+    best = None
+    for threshold in LEGACY_GRID:
+        predicted = (scores >= threshold).astype(int)
+        if recall_score(y, predicted, zero_division=0) >= min_recall:
+            f1 = f1_score(y, predicted, zero_division=0)
+            if best is None or f1 > best[1]:
+                best = (threshold, f1)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_curve_matches_sklearn_metrics(seed):
+    y, scores = random_scores(seed)
+    curve = threshold_curve(y, scores, RISK_WEIGHT)
+    np.testing.assert_array_equal(curve["thresholds"], np.unique(scores))
+    for i, threshold in enumerate(curve["thresholds"]):
+        predicted = (scores >= threshold).astype(int)
+        tn, fp, fn, tp = confusion_matrix(y, predicted, labels=[0, 1]).ravel()
+        assert (curve["tp"][i], curve["fp"][i], curve["tn"][i], curve["fn"][i]) == (tp, fp, tn, fn)
+        assert curve["precision"][i] == pytest.approx(precision_score(y, predicted, zero_division=0))
+        assert curve["recall"][i] == pytest.approx(recall_score(y, predicted, zero_division=0))
+        assert curve["f1"][i] == pytest.approx(f1_score(y, predicted, zero_division=0))
+        assert curve["accuracy"][i] == pytest.approx(accuracy_score(y, predicted))
+        assert curve["cost"][i] == fn * RISK_WEIGHT + fp
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_curve_covers_legacy_grid(seed):
+    y, scores = random_scores(seed)
+    curve = threshold_curve(y, scores)
+    for threshold in LEGACY_GRID:
+        predicted = (scores >= threshold).astype(int)
+        # Grid threshold'u ile aynı tahminler, eğrideki ondan büyük/eşit en küçük skordur
+        above = np.flatnonzero(curve["thresholds"] >= threshold)
+        if len(above) == 0:
+            assert predicted.sum() == 0
+            continue
+        i = above[0]
+        assert curve["recall"][i] == pytest.approx(recall_score(y, predicted, zero_division=0))
+        assert curve["f1"][i] == pytest.approx(f1_score(y, predicted, zero_division=0))
+
+    legacy = legacy_grid_search(y, scores)
+    selected = select_threshold(curve, "recall_f1", min_recall=0.8)
+    if legacy is not None:
+        # Sıralı arama grid'in gördüğü tüm noktaları da görür: en az onun kadar iyi
+        assert curve["recall"][selected] >= 0.8
+        assert curve["f1"][selected] >= legacy[1] - 1e-12
+
+
+def test_histogram_curve_matches_exact_curve_on_bin_edges():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 5000)
+    scores = rng.integers(0, 101, 5000) / 100  # Skorlar kova sınırlarında: kova eğrisi kesin olmalı
+    exact = threshold_curve(y, scores, RISK_WEIGHT)
+    binned = threshold_curve_from_histogram(*score_histogram(y, scores, 100), risk_weight=RISK_WEIGHT)
+    np.testing.assert_allclose(binned["thresholds"], exact["thresholds"])
+    for key in ("tp", "fp", "tn", "fn", "cost"):
+        np.testing.assert_array_equal(binned[key], exact[key])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_unmet_recall_target_falls_back_to_fixed_threshold(seed):
+    y, scores = random_scores(seed)
+    scores = np.r_[scores, 0.9]
+    y = np.zeros(len(scores), dtype=int)  # Riskli örnek yok: Recall her threshold'da 0
+    curve = threshold_curve(y, scores)
+    selected = select_threshold(curve, "recall_f1", min_recall=0.8)
+    # Eski grid aramasındaki gibi sabit threshold; seçilen nokta onunla aynı kararları verir
+    predicted = (scores >= RECALL_FALLBACK_THRESHOLD).astype(int)
+    assert curve["thresholds"][selected] == scores[scores >= RECALL_FALLBACK_THRESHOLD].min()
+    assert curve["fp"][selected] == predicted.sum()
+
+
+def test_training_serves_fixed_threshold_when_recall_target_unmet():
+    import ml_service
+
+    y = np.zeros(50, dtype=int)
+    curve = threshold_curve(y, np.linspace(0.0, 0.98, 50))
+    threshold, metrics = ml_service.evaluate_curve(curve, {'target_min_recall': 0.8})
+    assert threshold == RECALL_FALLBACK_THRESHOLD
+    assert metrics['threshold_curve']['optimal_threshold'] == RECALL_FALLBACK_THRESHOLD
+    assert metrics['confusion_matrix'][0][1] == int((np.linspace(0.0, 0.98, 50) >= threshold).sum())
@@ -0,0 +1,200 @@
+"""
+CreditGuard AI - Threshold Arama
+Test seti olasılıkları üzerinde tüm farklı threshold'ları tek sıralı geçişte değerlendirir.
+
+Olasılıklar bir kez büyükten küçüğe sıralanır; kümülatif TP/FP sayıları her
+farklı olasılık değeri için karışıklık matrisini O(n log n) sürede verir.
+Sabit bir grid yerine gerçek optimum bulunur ve tüm eğri (precision, recall,
+F1, maliyet) saklanarak /model-performance tarafından yeniden hesaplanmadan sunulur.
+
+Bellekte tutulamayacak kadar büyük holdout'lar için skorlar sabit kovalara
+sayılır (score_histogram); eğri kova sayımlarından aynı metriklerle çıkarılır.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+# recall_f1: recall hedefine hiçbir threshold ulaşamazsa kullanılan güvenli (düşük) threshold
+RECALL_FALLBACK_THRESHOLD = 0.25
+
+
+def threshold_curve(y_true, y_score, risk_weight: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Her farklı skor değeri için (skor >= threshold -> riskli) karışıklık matrisi ve metrikler.
+
+    Args:
+        y_true: Gerçek etiketler (1 = riskli)
+        y_score: Riskli olma olasılıkları
+        risk_weight: Maliyet için bir riskli müşteriyi kaçırmanın (FN) ağırlığı; FP ağırlığı 1
+
+    Returns:
+        Küçükten büyüğe threshold sırasıyla diziler: thresholds, tp, fp, tn, fn,
+        precision, recall, f1, accuracy, cost
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+
+    order = np.argsort(-y_score, kind='mergesort')
+    sorted_score = y_score[order]
+    sorted_true = y_true[order]
+    tp_cum = np.cumsum(sorted_true)
+    fp_cum = np.cumsum(~sorted_true)
+
+    # Her farklı skorun son konumu: o skor ve üstü riskli sayıldığında biriken sayılar
+    last = np.r_[np.flatnonzero(np.diff(sorted_score)), len(sorted_score) - 1][::-1]
+    positives = int(sorted_true.sum())
+    return _curve_from_counts(sorted_score[last], tp_cum[last], fp_cum[last],
+                              positives, len(sorted_true) - positives, risk_weight)
+
+
+def score_histogram(y_true, y_score, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Skorları [i / bins, (i + 1) / bins) kovalarına sınıf bazında sayar (son kova yalnızca 1.0).
+
+    Parça parça skorlanan büyük holdout'larda sayımlar toplanır ve eğri
+    threshold_curve_from_histogram ile sabit bellekle çıkarılır.
+
+    Returns:
+        (positive_counts, negative_counts): bins + 1 uzunluğunda int64 diziler
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    edges = np.arange(bins + 1) / bins
+    index = np.clip(np.searchsorted(edges, np.asarray(y_score, dtype=np.float64), side='right') - 1, 0, bins)
+    return (np.bincount(index[y_true], minlength=bins + 1).astype(np.int64),
+            np.bincount(index[~y_true], minlength=bins + 1).astype(np.int64))
+
+
+def threshold_curve_from_histogram(positive_counts, negative_counts,
+                                   risk_weight: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    score_histogram sayımlarından threshold eğrisi (threshold_curve ile aynı alanlar).
+
+    Threshold'lar dolu kovaların alt sınırlarıdır; her threshold'daki
+    karışıklık matrisi kesindir (skor >= threshold -> riskli), çözünürlük 1 / bins.
+    """
+    positive_counts = np.asarray(positive_counts, dtype=np.int64)
+    negative_counts = np.asarray(negative_counts, dtype=np.int64)
+    bins = len(positive_counts) - 1
+    filled = np.flatnonzero(positive_counts + negative_counts)
+    # Kova ve üstündeki tüm skorlar riskli sayıldığında biriken sayılar
+    tp = np.cumsum(positive_counts[::-1])[::-1][filled]
+    fp = np.cumsum(negative_counts[::-1])[::-1][filled]
+    return _curve_from_counts((np.arange(bins + 1) / bins)[filled], tp, fp,
+                              int(positive_counts.sum()), int(negative_counts.sum()), risk_weight)
+
+
+def _curve_from_counts(thresholds: np.ndarray, tp: np.ndarray, fp: np.ndarray, positives: int,
+                       negatives: int, risk_weight: float) -> Dict[str, np.ndarray]:
+    """Threshold başına TP/FP sayılarından eğri metrikleri."""
+    fn = positives - tp
+    tn = negatives - fp
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # sklearn zero_division=0 ile aynı
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(positives > 0, tp / max(positives, 1), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    accuracy = (tp + tn) / max(positives + negatives, 1)
+    cost = fn * risk_weight + fp
+
+    return {
+        "thresholds": thresholds,
+        "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "accuracy": accuracy,
+        "cost": cost,
+    }
+
+
+def index_at_threshold(curve: Dict[str, np.ndarray], threshold: float) -> int:
+    """
+    Verilen threshold ile aynı kararları veren eğri noktasının indeksi.
+
+    Skor >= threshold riskli sayıldığından bu, threshold'a eşit ya da büyük ilk
+    farklı skordur; threshold tüm skorların üstündeyse en yüksek skor seçilir.
+    """
+    index = int(np.searchsorted(curve["thresholds"], threshold, side='left'))
+    return min(index, len(curve["thresholds"]) - 1)
+
+
+def select_recall_floor_f1(curve: Dict[str, np.ndarray], min_recall: float = 0.8,
+                           fallback_threshold: float = RECALL_FALLBACK_THRESHOLD, **_) -> int:
+    """
+    Öncelik 1: recall >= min_recall. Öncelik 2: F1'i maksimize et (eşitlikte düşük threshold).
+
+    Hiçbir nokta recall hedefine ulaşmazsa sabit, güvenli (düşük) fallback_threshold kullanılır.
+    """
+    eligible = curve["recall"] >= min_recall
+    if not eligible.any():
+        return index_at_threshold(curve, fallback_threshold)
+    return int(np.argmax(np.where(eligible, curve["f1"], -1.0)))
+
+
+def select_min_cost(curve: Dict[str, np.ndarray], **_) -> int:
+    """FN * risk_weight + FP maliyetini en aza indir (eşitlikte düşük threshold)."""
+    return int(np.argmin(curve["cost"]))
+
+
+def select_precision_floor(curve: Dict[str, np.ndarray], min_precision: float = 0.6, **_) -> int:
+    """precision >= min_precision olan noktalarda recall'ı maksimize et; yoksa en yüksek precision."""
+    eligible = curve["precision"] >= min_precision
+    if not eligible.any():
+        return int(np.argmax(curve["precision"]))
+    return int(np.argmax(np.where(eligible, curve["recall"], -1.0)))
+
+
+THRESHOLD_OBJECTIVES: Dict[str, Callable[..., int]] = {
+    "recall_f1": select_recall_floor_f1,
+    "cost": select_min_cost,
+    "precision_floor": select_precision_floor,
+}
+
+
+def select_threshold(curve: Dict[str, np.ndarray], objective: str = "recall_f1", **params) -> int:
+    """
+    Eğri üzerinde hedef fonksiyona göre en iyi noktanın indeksini döndürür.
+
+    Raises:
+        ValueError: Bilinmeyen hedef fonksiyon
+    """
+    if objective not in THRESHOLD_OBJECTIVES:
+        raise ValueError(f"Bilinmeyen threshold hedefi: {objective} "
+                         f"(seçenekler: {', '.join(THRESHOLD_OBJECTIVES)})")
+    return THRESHOLD_OBJECTIVES[objective](curve, **params)
+
+
+def objective_score(curve: Dict[str, np.ndarray], index: int, objective: str = "recall_f1") -> float:
+    """
+    Seçilen noktanın hedef fonksiyona göre skoru (büyük olan daha iyi).
+
+    recall_f1 -> F1, precision_floor -> Recall, cost -> -(örnek başına maliyet).
+    Hiperparametre araması farklı modelleri bu skorla karşılaştırır.
+    """
+    if objective == "cost":
+        n_samples = curve["tp"][index] + curve["fp"][index] + curve["tn"][index] + curve["fn"][index]
+        return -float(curve["cost"][index]) / max(int(n_samples), 1)
+    if objective == "precision_floor":
+        return float(curve["recall"][index])
+    return float(curve["f1"][index])
+
+
+def curve_to_json(curve: Dict[str, np.ndarray], selected: int, objective: str,
+                  threshold: float = None) -> Dict[str, Any]:
+    """
+    Eğriyi /model-performance yanıtında doğrudan sunulabilecek JSON uyumlu sözlüğe çevirir.
+
+    threshold verilirse (ör. recall fallback'i) seçilen noktanın skoru yerine o raporlanır.
+    """
+    return {
+        "objective": objective,
+        "optimal_threshold": float(curve["thresholds"][selected] if threshold is None else threshold),
+        "selected_index": int(selected),
+        "thresholds": curve["thresholds"].tolist(),
+        "precision": curve["precision"].tolist(),
+        "recall": curve["recall"].tolist(),
+        "f1": curve["f1"].tolist(),
+        "cost": curve["cost"].astype(float).tolist(),
+    }
@@ -0,0 +1,219 @@
+"""
+CreditGuard AI - Hiperparametre Araması
+RISK_WEIGHT ve RandomForest hiperparametrelerini stratified k-fold CV ile, süreç havuzunda paralel arar.
+
+- Veri train_model ile aynı şekilde hazırlanır (prepare_training_data) ve
+  yalnızca eğitim kısmı kullanılır; test seti aramaya sızmaz.
+- Encode edilmiş veri ve fold atamaları bir kez .npy olarak yazılır; worker'lar
+  bunları açılışta memory-map ile okur, deneme başına veri pickle'lanmaz.
+- Her denemede RandomForest tek thread ile eğitilir; paralellik süreçlerden
+  gelir, süre çekirdek sayısı ile ölçeklenir.
+- Fold'lar sırayla değerlendirilir; en az MIN_FOLDS_BEFORE_PRUNE fold sonra
+  ortalaması o ana kadarki en iyi skorun belirgin altında kalan denemeler budanır.
+- Sonuçlar leaderboard (JSON + CSV) olarak, en iyi yapılandırma ise
+  train_model'in okuduğu TUNED_CONFIG_PATH dosyasına yazılır.
+
+Kullanım (backend klasöründen):
+    python -m cli tune --folds 5 --max-trials 40 --workers 8
+"""
+
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+import ml_service
+from app_logging import get_logger, log_fields
+from thresholds import threshold_curve, select_threshold, objective_score
+
+logger = get_logger("tuning")
+
+# Aranan değerler; varsayılan yapılandırma her zaman ilk deneme olarak ölçülür
+SEARCH_SPACE: Dict[str, List[Any]] = {
+    'risk_weight': [3.0, 5.0, 7.5, 10.0, 15.0],
+    'n_estimators': [100, 200, 400],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 0.5],
+}
+
+# Budama: bu kadar fold tamamlanmadan deneme budanmaz
+MIN_FOLDS_BEFORE_PRUNE = 2
+
+TUNING_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "tuning")
+
+# Worker süreçlerinde açılışta bir kez doldurulur
+_worker_state: Dict[str, Any] = {}
+
+
+def sample_configs(space: Dict[str, List[Any]], max_trials: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Arama uzayından en fazla max_trials yapılandırma seçer (uzay küçükse tam grid)."""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+    baseline = {key: ml_service.DEFAULT_TRAINING_CONFIG[key] for key in keys}
+    rest = [config for config in grid if config != baseline]
+    if len(rest) > max_trials - 1:
+        rest = random.Random(seed).sample(rest, max(0, max_trials - 1))
+    return [baseline] + rest
+
+
+def _init_worker(data_dir: str, best_score) -> None:
+    _worker_state['X'] = np.load(os.path.join(data_dir, 'X.npy'), mmap_mode='r')
+    _worker_state['y'] = np.load(os.path.join(data_dir, 'y.npy'), mmap_mode='r')
+    _worker_state['folds'] = np.load(os.path.join(data_dir, 'folds.npy'), mmap_mode='r')
+    _worker_state['best'] = best_score
+
+
+def _run_trial(trial_id: int, params: Dict[str, Any], objective: str, prune_margin: float) -> Dict[str, Any]:
+    """Tek yapılandırmayı fold fold değerlendirir; gerekirse erken budar."""
+    X, y, folds = _worker_state['X'], _worker_state['y'], _worker_state['folds']
+    best_score = _worker_state['best']
+    config = {**ml_service.DEFAULT_TRAINING_CONFIG, **params}
+    n_folds = int(folds.max()) + 1
+
+    started = time.perf_counter()
+    scores = []
+    pruned = False
+    for fold in range(n_folds):
+        validation = np.asarray(folds == fold)
+        model = ml_service.build_model(config, n_jobs=1)
+        model.fit(X[~validation], y[~validation])
+        proba = model.predict_proba(X[validation])[:, 1]
+
+        curve = threshold_curve(y[validation], proba, risk_weight=ml_service.RISK_WEIGHT)
+        index = select_threshold(curve, objective, min_recall=config['target_min_recall'],
+                                 min_precision=ml_service.TARGET_MIN_PRECISION)
+        scores.append(objective_score(curve, index, objective))
+
+        if MIN_FOLDS_BEFORE_PRUNE <= len(scores) < n_folds and np.mean(scores) < best_score.value - prune_margin:
+            pruned = True
+            break
+
+    mean_score = float(np.mean(scores))
+    if not pruned:
+        with best_score.get_lock():
+            if mean_score > best_score.value:
+                best_score.value = mean_score
+
+    return {
+        'trial': trial_id,
+        'params': params,
+        'mean_score': mean_score,
+        'std_score': float(np.std(scores)),
+        'folds_completed': len(scores),
+        'pruned': pruned,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def run_tuning(folds: int = 5, max_trials: int = 40, workers: int = None, seed: int = 42,
+               objective: str = None, prune_margin: float = 0.05, output_dir: str = None,
+               config_path: str = None, write_config: bool = True) -> Dict[str, Any]:
+    """
+    Hiperparametre aramasını çalıştırır; leaderboard'u ve en iyi yapılandırmayı yazar.
+
+    Returns:
+        En iyi (budanmamış) denemenin sonucu
+    """
+    objective = objective or ml_service.THRESHOLD_OBJECTIVE
+    workers = workers or os.cpu_count() or 1
+    output_dir = output_dir or TUNING_OUTPUT_DIR
+    config_path = config_path or ml_service.TUNED_CONFIG_PATH
+
+    # X float32 / y int8 hazırlanır; ayrım satır indekslemesiyle bitişik (C-order) kopyalar üretir
+    _, X, y, _, _, fingerprint = ml_service.prepare_training_data()
+    X_train, _, y_train, _ = ml_service.split_train_test(X, y)
+    del X, y
+
+    fold_ids = np.empty(len(y_train), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for fold, (_, validation) in enumerate(splitter.split(X_train, y_train)):
+        fold_ids[validation] = fold
+
+    configs = sample_configs(SEARCH_SPACE, max_trials, seed)
+    logger.info("Hiperparametre araması başladı", extra=log_fields(
+        trials=len(configs), folds=folds, workers=workers, objective=objective))
+
+    started = time.perf_counter()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="creditguard-tuning-") as data_dir:
+        np.save(os.path.join(data_dir, 'X.npy'), X_train)
+        np.save(os.path.join(data_dir, 'y.npy'), y_train)
+        np.save(os.path.join(data_dir, 'folds.npy'), fold_ids)
+
+        best_score = multiprocessing.Value('d', float('-inf'))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_dir, best_score)) as executor:
+            futures = [
+                executor.submit(_run_trial, trial_id, params, objective, prune_margin)
+                for trial_id, params in enumerate(configs)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                logger.info("Deneme tamamlandı", extra=log_fields(
+                    done=len(results), trials=len(configs), score=round(result['mean_score'], 4),
+                    folds_completed=result['folds_completed'], pruned=result['pruned'],
+                    seconds=round(result['seconds'], 1), params=result['params']))
+
+    elapsed = time.perf_counter() - started
+    leaderboard = sorted(results, key=lambda r: (not r['pruned'], r['mean_score']), reverse=True)
+    for rank, result in enumerate(leaderboard, start=1):
+        result['rank'] = rank
+    best = leaderboard[0]
+
+    trial_seconds = sum(result['seconds'] for result in results)
+    logger.info("Arama tamamlandı", extra=log_fields(
+        seconds=round(elapsed, 1), trial_seconds=round(trial_seconds, 1),
+        parallelism=round(trial_seconds / max(elapsed, 1e-9), 1), pruned=sum(r['pruned'] for r in results)))
+    logger.info("En iyi yapılandırma", extra=log_fields(
+        score=round(best['mean_score'], 4), std=round(best['std_score'], 4), params=best['params']))
+
+    write_leaderboard(leaderboard, output_dir, objective)
+
+    if write_config:
+        tuned = {
+            'params': {**ml_service.DEFAULT_TRAINING_CONFIG, **best['params']},
+            'objective': objective,
+            'cv_score': best['mean_score'],
+            'cv_std': best['std_score'],
+            'folds': folds,
+            'dataset_fingerprint': fingerprint,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(config_path)), exist_ok=True)
+        tmp_path = f"{config_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(tuned, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, config_path)
+        logger.info("En iyi yapılandırma yazıldı (train_model bir sonraki eğitimde kullanır)",
+                    extra=log_fields(path=config_path))
+
+    return best
+
+
+def write_leaderboard(leaderboard: List[Dict[str, Any]], output_dir: str, objective: str) -> None:
+    """Leaderboard'u JSON ve CSV olarak yazar."""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'leaderboard.json'), 'w', encoding='utf-8') as f:
+        json.dump({'objective': objective, 'trials': leaderboard}, f, indent=2, ensure_ascii=False)
+
+    param_keys = list(SEARCH_SPACE)
+    with open(os.path.join(output_dir, 'leaderboard.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'mean_score', 'std_score', 'folds_completed', 'pruned', 'seconds'] + param_keys)
+        for result in leaderboard:
+            writer.writerow([result['rank'], round(result['mean_score'], 6), round(result['std_score'], 6),
+                             result['folds_completed'], result['pruned'], result['seconds']]
+                            + [result['params'].get(key) for key in param_keys])
+    logger.info("Leaderboard yazıldı", extra=log_fields(path=output_dir))